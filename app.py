@@ -3,13 +3,31 @@
 import streamlit as st
 import pandas as pd
 from pathlib import Path
-from typing import List, Optional, cast
-from enum import Enum
-import os
+from typing import Optional
+import io
 import logging
+import threading
 from datetime import datetime
 
-from src.config import DOWNLOAD_FOLDER
+from src.catalog import Catalog, load_or_build_catalog
+from src.config import APP_REFRESH_SECONDS, BANKE, DOWNLOAD_FOLDER
+from src.export import EXPORT_FORMATS, export_data, parse_period
+from src.search_index import SearchIndex, load_or_build_index
+from src.bank_data import BankData, build_bank_data
+from src.validation import failing_reports
+from src.metrics import MetricsStore
+from src.profiling import StageTimer
+from src.charts import (
+    CATEGORY_COLORS,
+    CATEGORY_COLORS_2,
+    CATEGORY_ORDER,
+    CATEGORY_ORDER_2,
+    build_category_figure,
+    build_ratio_figure,
+    figure_cache,
+    figure_key,
+    prepare_chart_frame,
+)
 
 # Konfiguracija logovanja
 LOG_DIR = Path("logs")
@@ -34,109 +52,102 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Default folder za CSV fajlove
-CSV_FOLDER = "data/csv_output/slike_i_fajlovi/fajlovi/fajlovi_kontrola_banaka/pokazatelji/banke"
-
-
-def get_all_csv_files(csv_folder: str = CSV_FOLDER) -> List[Path]:
-    """Pronalazi sve CSV fajlove u folderu (rekurzivno)."""
-    csv_dir = Path(csv_folder)
-    # Pokušaj relativno od root-a ako ne postoji
-    if not csv_dir.exists():
-        csv_dir = Path(".") / csv_folder
-    if not csv_dir.exists():
-        return []
-    csv_files = list(csv_dir.rglob("*.csv"))
-    return csv_files
-
-
-def load_csv_file(
-    csv_path: Path,
-    *,
-    column_names: Optional[List[str]] = None,
-    skip_header: bool = False,
-) -> Optional[pd.DataFrame]:
-    """Učitava CSV fajl u pandas DataFrame."""
-    try:
-        # Pokušaj sa različitim encoding-ima
-        encodings = ["utf-8", "utf-8-sig", "latin-1", "cp1252", "iso-8859-1"]
-
-        read_kwargs = {
-            "header": 0 if column_names is None else None,
-            "names": column_names,
-            "skiprows": 1 if skip_header and column_names is not None else 0,
-        }
-
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(csv_path, encoding=encoding, **read_kwargs)
-                
-                # Preskoči fajlove koji imaju kolonu "R. br."
-                if df is not None and "R. br." in df.columns:
-                    return None
-                
-                # Ukloni sekcijske headere (Aktiva, Obaveze, Kapital) koji se pojavljuju kao redovi
-                # Ovi redovi imaju istu vrednost u prvoj koloni kao header
-                if df is not None and len(df.columns) > 0:
-                    first_col = df.columns[0]
-                    # Filtriraj redove gde je prva kolona jednaka imenu sekcije (Aktiva, Obaveze, Kapital)
-                    # ali samo ako je to tačno ta vrednost (ne deo teksta)
-                    section_headers = ["Aktiva", "Obaveze", "Kapital"]
-                    df = df[~df[first_col].isin(section_headers)]
-                    
-                    # Preimenuj AKTIVA ili IZNOS kolonu u Amount pre nego što preimenujemo prvu kolonu u Pozicija
-                    # (ako postoji kolona 'AKTIVA' ili 'IZNOS' koja sadrži iznose)
-                    # Prioritet: IZNOS > AKTIVA (jer IZNOS je verovatnije tačan naziv)
-                    if 'IZNOS' in df.columns:
-                        df = df.rename(columns={'IZNOS': 'Amount'})
-                        # Ukloni AKTIVA ako postoji (da ne bude duplikat)
-                        if 'AKTIVA' in df.columns:
-                            df = df.drop(columns=['AKTIVA'])
-                    elif 'AKTIVA' in df.columns:
-                        df = df.rename(columns={'AKTIVA': 'Amount'})
-                    
-                    df = df.rename(columns={first_col: "Pozicija"})
-                    
-                    # Osiguraj da nema duplikata kolona
-                    df = df.loc[:, ~df.columns.duplicated()]
-                
-                #df = df.fillna({"Amount": 0})
-                return df
-            except UnicodeDecodeError:
-                continue
 
-        # Ako ništa ne radi, probaj bez encoding-a
-        df = pd.read_csv(csv_path, **read_kwargs)
-        
-        # Preskoči fajlove koji imaju kolonu "R. br."
-        if df is not None and "R. br." in df.columns:
-            return None
-        
-        # Ukloni sekcijske headere i ovde
-        if df is not None and len(df.columns) > 0:
-            first_col = df.columns[0]
-            section_headers = ["Aktiva", "Obaveze", "Kapital"]
-            df = df[~df[first_col].isin(section_headers)]
-            
-            # Preimenuj AKTIVA ili IZNOS kolonu u Amount pre nego što preimenujemo prvu kolonu u Pozicija
-            # Prioritet: IZNOS > AKTIVA (jer IZNOS je verovatnije tačan naziv)
-            if 'IZNOS' in df.columns:
-                df = df.rename(columns={'IZNOS': 'Amount'})
-                # Ukloni AKTIVA ako postoji (da ne bude duplikat)
-                if 'AKTIVA' in df.columns:
-                    df = df.drop(columns=['AKTIVA'])
-            elif 'AKTIVA' in df.columns:
-                df = df.rename(columns={'AKTIVA': 'Amount'})
-            
-            df = df.rename(columns={first_col: "Pozicija"})
-            
-            # Osiguraj da nema duplikata kolona
-            df = df.loc[:, ~df.columns.duplicated()]
-        
-        return df
-    except Exception as e:
-        st.error(f"Greška pri učitavanju fajla: {e}")
-        return None
+@st.cache_resource(show_spinner="Učitavam katalog podataka...")
+def _catalog_holder() -> dict:
+    """Trenutni katalog pod ključem "catalog"; ponovo učitan katalog se samo zamijeni."""
+    return {"catalog": load_or_build_catalog()}
+
+
+@st.cache_resource
+def _catalog_lock() -> threading.Lock:
+    return threading.Lock()
+
+
+def get_catalog() -> Catalog:
+    """
+    Katalog CSV fajlova (vidi src/catalog.py), zajednički za sve sesije.
+    Na svakom rerun-u se provjerava samo da li je pipeline prepisao fajl kataloga;
+    ako jeste, učitava se novi objekat i atomski zamjenjuje stari (sesije koje još
+    čitaju stari ga ne vide izmijenjenog), a iz keševa se izbacuju samo banke čija
+    se verzija podataka promijenila.
+    """
+    holder = _catalog_holder()
+    catalog = holder["catalog"]
+    if catalog.is_stale():
+        with _catalog_lock():
+            catalog = holder["catalog"]
+            if catalog.is_stale():
+                fresh = catalog.reloaded()
+                holder["catalog"] = fresh
+                invalidate_changed_banks(
+                    catalog.bank_versions("bs", min_year=2020),
+                    fresh.bank_versions("bs", min_year=2020),
+                )
+                catalog = fresh
+    return catalog
+
+
+def invalidate_changed_banks(before: dict, after: dict):
+    """Briše keširane podatke i figure banaka čija se verzija podataka promijenila."""
+    changed = sorted(bank for bank in set(before) | set(after) if before.get(bank) != after.get(bank))
+    for bank in changed:
+        if bank in before:
+            get_bank_data.clear(bank, before[bank])
+        figure_cache.invalidate(bank)
+    if changed:
+        # Indeks pretrage je jedan za sve banke; sam se ponovo pravi ako je zastario
+        get_search_index.clear()
+        logger.info(f"Novi podaci objavljeni za: {', '.join(changed)}")
+
+
+@st.cache_resource(max_entries=2 * len(BANKE), show_spinner="Učitavam podatke banke...")
+def get_bank_data(bank_code: str, data_version: str) -> BankData:
+    """
+    Podaci banke (od 2020.) jednom po procesu i verziji podataka; dijele ih sve sesije
+    i ne smiju se mijenjati. Nova verzija podataka je novi ključ, a stare verzije
+    ispadaju iz keša (najviše dvije po banci).
+    """
+    files = get_catalog().files(bank_code, "bs", min_year=2020)
+    return build_bank_data(bank_code, files, data_version, min_year=2020)
+
+
+@st.cache_resource(show_spinner="Učitavam indeks pozicija...")
+def get_search_index() -> SearchIndex:
+    """Indeks se učitava jednom po procesu i dijele ga sve sesije."""
+    return load_or_build_index()
+
+
+@st.cache_resource(show_spinner="Učitavam pokazatelje...")
+def get_metrics_store() -> MetricsStore:
+    """Tabela pokazatelja se učitava jednom po procesu i dijele je sve sesije."""
+    return MetricsStore.load()
+
+
+@st.fragment(run_every=APP_REFRESH_SECONDS)
+def data_freshness(bank_code: str, data_version: str):
+    """
+    Periodično (bez akcije korisnika) provjerava da li je pipeline (npr. src/watch.py)
+    objavio nove podatke za prikazanu banku i tada ponovo pokreće cijelu stranicu.
+    """
+    catalog = get_catalog()
+    if catalog.data_version(bank_code, "bs", min_year=2020) != data_version:
+        st.rerun()
+    st.caption(f"Podaci ažurirani: {catalog.updated_at or '-'}")
+
+
+def bank_metrics(bank_code: str) -> pd.DataFrame:
+    """
+    Pokazatelji (K/D, rast, tržišno učešće) za banku, indeksirani po datumu.
+    update() čita samo nove/izmijenjene CSV fajlove, pa je poziv na svakom rerun-u jeftin.
+    Tabelu dijele sve sesije, pa se ažurira i čita pod jednim lock-om (vidi MetricsStore.updated_frame).
+    """
+    return get_metrics_store().updated_frame(bank_code, catalog=get_catalog()).set_index("balance_date")
+
+
+def format_growth(value) -> Optional[str]:
+    """Rast kao procenat sa znakom (npr. +3.2%) ili None ako nije poznat."""
+    return f"{value:+.1%}" if pd.notna(value) else None
 
 
 def format_file_size(size_bytes: int) -> str:
@@ -150,6 +161,9 @@ def format_file_size(size_bytes: int) -> str:
 
 
 def main():
+    # Vremena faza ovog rerun-a (opcioni panel na dnu sidebar-a)
+    timer = StageTimer()
+
     # Log pristup aplikaciji
     logger.info("=" * 50)
     logger.info(f"Aplikacija otvorena - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -158,243 +172,64 @@ def main():
     st.markdown("Pregled bilansa banaka u Crnoj Gori u periodu 2020-2025")
 
     
-    class Akcija(Enum):
-        PBCG = "Prva banka CG"
-        CKB = "Crnogorska komercijalna banka"
-        NLB = "NLB Montenegro banka"
-        UCB = "Universal Capital banka"
-        HB = "Hipotekarna banka"
-        ADR = "Adriatic banka"
-        ADK = "Addiko banka"
-        LOV = "Lovćen banka"
-        ERB = "Erste banka"
-        ZAP = "Zapadna banka"
-        ZIR = "Ziraat banka"
-
-    
     # Sidebar za navigaciju i filtere
     with st.sidebar:
         st.header("🔍 Navigacija")
 
-        
-        bank_chooser = st.selectbox(
+        bank_code = st.selectbox(
             "Izaberite banku:",
-            options=list(Akcija), # Daje listu [Akcija.SHOW_ALL, Akcija.ADD_NEW, ...]
-            format_func=lambda clan: clan.value # Za prikaz koristi vrijednost (npr. "Prikaži sve...")
+            options=list(BANKE),  # Šifre banaka (ime foldera na sajtu CBCG)
+            format_func=lambda code: BANKE[code]  # Za prikaz koristi naziv banke
         )
+        bank_name = BANKE[bank_code]
 
-        bank_folder_map = {
-            Akcija.PBCG: "data/csv_output/slike_i_fajlovi/fajlovi/fajlovi_kontrola_banaka/pokazatelji/banke/bs/nik",
-            Akcija.CKB: "data/csv_output/slike_i_fajlovi/fajlovi/fajlovi_kontrola_banaka/pokazatelji/banke/bs/ckb",
-            Akcija.NLB: "data/csv_output/slike_i_fajlovi/fajlovi/fajlovi_kontrola_banaka/pokazatelji/banke/bs/mnb",
-            Akcija.UCB: "data/csv_output/slike_i_fajlovi/fajlovi/fajlovi_kontrola_banaka/pokazatelji/banke/bs/ffb",
-            Akcija.HB: "data/csv_output/slike_i_fajlovi/fajlovi/fajlovi_kontrola_banaka/pokazatelji/banke/bs/hip",
-            Akcija.ADR: "data/csv_output/slike_i_fajlovi/fajlovi/fajlovi_kontrola_banaka/pokazatelji/banke/bs/azm",
-            Akcija.ADK: "data/csv_output/slike_i_fajlovi/fajlovi/fajlovi_kontrola_banaka/pokazatelji/banke/bs/hyp",
-            Akcija.LOV: "data/csv_output/slike_i_fajlovi/fajlovi/fajlovi_kontrola_banaka/pokazatelji/banke/bs/lov",
-            Akcija.ERB: "data/csv_output/slike_i_fajlovi/fajlovi/fajlovi_kontrola_banaka/pokazatelji/banke/bs/opp",
-            Akcija.ZAP: "data/csv_output/slike_i_fajlovi/fajlovi/fajlovi_kontrola_banaka/pokazatelji/banke/bs/zap",
-            Akcija.ZIR: "data/csv_output/slike_i_fajlovi/fajlovi/fajlovi_kontrola_banaka/pokazatelji/banke/bs/zir",
-        }
-
-        csv_folder = bank_folder_map.get(bank_chooser)
-        if csv_folder is None:
-            st.error("Neispravan izbor")
-            logger.warning(f"Neispravan izbor banke")
-            st.stop()
-        assert csv_folder is not None
-        csv_folder = cast(str, csv_folder)
-        
         # Log izabranu banku
-        logger.info(f"Izabrana banka: {bank_chooser.value}")
+        logger.info(f"Izabrana banka: {bank_name}")
 
-        # Folder selection
-        #csv_folder = st.text_input(
-        #    "CSV Folder",
-        #    value=CSV_FOLDER,
-        #    help="Putanja do foldera sa CSV fajlovima"
-        #)
+        # Fajlovi i verzija podataka iz kataloga (vidi src/catalog.py), bez obilaženja foldera;
+        # samo fajlovi iz 2020+ (format mmyy* gdje yy >= 20)
+        catalog = get_catalog()
+        filtered_files = catalog.files(bank_code, "bs", min_year=2020)
 
-        # Koristi folder iz mape banaka
-        # csv_folder = CSV_FOLDER
-        
-        # Debug: provjeri da li folder postoji
-        test_path = Path(csv_folder)
-        if not test_path.exists():
-            st.error(f"❌ Folder ne postoji: {csv_folder}")
-            st.error(f"Trenutna radna direktorij: {Path.cwd()}")
-            # Pokušaj da pronađeš folder relativno od root-a
-            alt_paths = [
-                Path(".") / csv_folder,
-                Path("data") / csv_folder.replace("data/", ""),
-            ]
-            for alt in alt_paths:
-                if alt.exists():
-                    st.info(f"Pronađen folder na alternativnoj putanji: {alt}")
-                    csv_folder = str(alt)
-                    break
-            else:
-                st.stop()
-        
-        # Učitaj sve CSV fajlove
-        csv_files = get_all_csv_files(csv_folder)
-        
-        if not csv_files:
-            st.warning(f"Nema CSV fajlova u folderu: {csv_folder}")
-            st.info(f"Folder postoji: {Path(csv_folder).exists()}")
-            st.info(f"Apsolutna putanja: {Path(csv_folder).absolute()}")
-            # Listaj sve CSV fajlove u parent folderu
-            parent = Path(csv_folder).parent
-            if parent.exists():
-                all_csvs = list(parent.rglob("*.csv"))
-                st.info(f"Pronađeno {len(all_csvs)} CSV fajlova u parent folderu: {parent}")
+        if not filtered_files:
+            st.warning(f"Nema CSV fajlova za banku: {bank_name}")
+            st.info(f"Katalog ({catalog.path}) ima {len(catalog)} fajlova; osvježi ga sa: python src/catalog.py")
             st.stop()
-        
-        #st.success(f"Pronađeno {len(csv_files)} CSV fajlova")
-        
-        # Pretraga fajlova
-        #search_term = st.text_input(
-        #    "🔎 Pretraži fajlove",
-        #    placeholder="Unesi ime fajla...",
-        #    help="Filtriraj CSV fajlove po imenu"
-        #)
-        
-        # Filtriraj fajlove - samo oni iz 2020+ (format mmyy* gdje yy >= 20)
-        filtered_files = []
-        for f in csv_files:
-            file_name = f.name
-            # Provjeri da li fajl ima format mmyy* (npr. 1220nik_bs.csv)
-            if len(file_name) >= 4 and file_name[:4].isdigit():
-                yy = int(file_name[2:4])  # Uzmi poslednje 2 cifre (godina)
-                if yy >= 20:  # 2020 ili novije
-                    filtered_files.append(f)
-        
-        #st.info(f"Prikazano: {len(filtered_files)} fajlova")
 
-        df = None
-        if filtered_files:
-            files_list: List[pd.DataFrame] = []
-            base_columns: Optional[List[str]] = None
-
-            for f in filtered_files:
-                try:
-                    t_df = load_csv_file(
-                        f,
-                        column_names=base_columns,
-                        skip_header=base_columns is not None,
-                    )
-                    if t_df is None:
-                        continue
-
-                    if base_columns is None:
-                        base_columns = list(t_df.columns)
-
-                    file_name = os.path.basename(f)
-                    t_df["f_source"] = file_name
-                    files_list.append(t_df)
-                except Exception as e:
-                    st.error(f"Greška pri učitavanju fajla {f}: {e}")
-                    continue
-
-            if files_list:
-                # Osiguraj da svi DataFrames imaju iste kolone i nema duplikata
-                # Prvo, ukloni duplikate kolona iz svakog DataFrame-a
-                for i, t_df in enumerate(files_list):
-                    files_list[i] = t_df.loc[:, ~t_df.columns.duplicated()]
-                
-                # Zatim, prikupi sve jedinstvene kolone iz svih DataFrames
-                all_columns = set()
-                for t_df in files_list:
-                    all_columns.update(t_df.columns)
-                
-                # Konvertuj u listu i sortiraj za konzistentnost
-                all_columns = sorted(list(all_columns))
-                
-                # Osiguraj da svi DataFrames imaju iste kolone
-                for i, t_df in enumerate(files_list):
-                    # Dodaj nedostajuće kolone sa None vrednostima
-                    for col in all_columns:
-                        if col not in t_df.columns:
-                            t_df[col] = None
-                    # Reorder kolone da budu konzistentne
-                    files_list[i] = t_df[all_columns]
-                
-                df = pd.concat(files_list, ignore_index=True)
-            else:
-                st.error("Nema CSV fajlova u folderu")
-                st.stop()
+        # Ključevi za keš grafikona
+        bank_key = bank_code
+        data_version = catalog.data_version(bank_code, "bs", min_year=2020)
+        data_freshness(bank_code, data_version)
+
+        # Podaci banke (bilansi, memorija, provjera, agregati) su jedan objekat po procesu
+        # i verziji podataka, zajednički za sve sesije (vidi src/bank_data.py)
+        bank_data = get_bank_data(bank_code, data_version)
+        df = bank_data.frame
+        if df.empty:
+            st.error("Nema CSV fajlova u folderu")
+            st.stop()
 
-        if df is not None:
-            temp_date = pd.to_datetime(
-                df["f_source"].str[0:4], format="%m%y", errors="coerce"
-            )
-            df["balance_date"] = temp_date + pd.offsets.MonthEnd(0)
-            df = df[df["balance_date"].dt.year >= 2020]
-            # Preimenuj AKTIVA, IZNOS ili Aktiva kolonu u Amount (iznosi su u jednoj od ovih kolona)
-            # Proveri sve varijante: 'AKTIVA' (sve veliko), 'Aktiva' (prvo veliko), 'IZNOS'
-            if 'Amount' not in df.columns:
-                if 'AKTIVA' in df.columns:
-                    df = df.rename(columns={'AKTIVA': 'Amount'})
-                elif 'IZNOS' in df.columns:
-                    df = df.rename(columns={'IZNOS': 'Amount'})
-                elif 'Aktiva' in df.columns:
-                    df = df.rename(columns={'Aktiva': 'Amount'})
-            df = df.fillna({'Amount': 0})
-            #st.dataframe(df)
-
-        class Kategorija(Enum):
-            AKTIVA = "Aktiva"
-            OBAVEZE = "Obaveze"
-            KAPITAL = "Kapital"
-
-        cat_mapper = {
-            Kategorija.AKTIVA: "16. UKUPNA SREDSTVA:",
-            Kategorija.OBAVEZE: "28. UKUPNE OBAVEZE:",
-            Kategorija.KAPITAL: "35. UKUPAN KAPITAL: (29. do 34.)",
-        }
-
-        # Korak 1: Učitaj sve kategorije umesto samo jedne
-        if df is not None and "Pozicija" in df.columns:
-            # Osiguraj da Amount kolona postoji (ako nije već preimenovana)
-            if 'Amount' not in df.columns:
-                # Pokušaj da pronađeš kolonu sa iznosima
-                if 'IZNOS' in df.columns:
-                    df['Amount'] = df['IZNOS']
-                elif 'AKTIVA' in df.columns:
-                    df['Amount'] = df['AKTIVA']
-                elif 'Aktiva' in df.columns:
-                    df['Amount'] = df['Aktiva']
-                else:
-                    st.warning(f"Amount kolona ne postoji. Dostupne kolone: {df.columns.tolist()}")
-            
-            # Korak 2: Učitaj sve kategorije i dodaj kolonu 'Kategorija'
-            all_categories_data = []
-            
-            for kategorija_enum, pozicija_value in cat_mapper.items():
-                df_filtered = df[df["Pozicija"] == pozicija_value].copy()
-                
-                if len(df_filtered) > 0 and 'Amount' in df_filtered.columns:
-                    # Konvertuj Amount u numerički tip pre agregacije
-                    if df_filtered['Amount'].dtype == 'object':
-                        df_filtered['Amount'] = df_filtered['Amount'].astype(str).str.replace(',', '').astype(float)
-                    else:
-                        df_filtered['Amount'] = pd.to_numeric(df_filtered['Amount'], errors='coerce').fillna(0)
-                    
-                    # Agregiraj po datumu
-                    df_agg = df_filtered.groupby('balance_date')['Amount'].sum().reset_index()
-                    # Dodaj kolonu sa imenom kategorije
-                    df_agg['Kategorija'] = kategorija_enum.value
-                    all_categories_data.append(df_agg)
-            
-            # Korak 3: Kombinuj sve kategorije u jedan DataFrame
-            if all_categories_data:
-                df_aggregated = pd.concat(all_categories_data, ignore_index=True)
-            else:
-                st.warning("Nema podataka za prikaz grafikona.")
-                df_aggregated = pd.DataFrame(columns=['balance_date', 'Amount', 'Kategorija'])
-        else:
+        total_bytes = bank_data.total_bytes
+        logger.info(f"Učitano {len(df)} redova za {bank_name} ({format_file_size(total_bytes)})")
+        with st.expander("💾 Memorija", expanded=False):
+            st.metric("Učitani podaci (dijele ih sve sesije)", format_file_size(total_bytes))
+            st.dataframe(bank_data.memory, width='stretch')
+
+        # Provjera da bilansi "se slažu" (vidi src/validation.py)
+        issues = bank_data.issues
+        if not issues.empty:
+            bad_reports = failing_reports(issues)
+            st.warning(f"⚠️ {len(bad_reports)} izvještaja ne prolazi računsku provjeru")
+            with st.expander("Detalji provjere", expanded=False):
+                st.dataframe(issues, width='stretch', hide_index=True)
+
+        timer.lap("Učitavanje i provjera")
+
+        # Korak 1: Pozicije Aktiva / Obaveze / Kapital po datumu (vidi src/aggregates.py)
+        df_aggregated = bank_data.balance
+        timer.lap("Agregacija")
+        if df_aggregated.empty:
             st.warning("Nema podataka za prikaz grafikona.")
-            df_aggregated = pd.DataFrame(columns=['balance_date', 'Amount', 'Kategorija'])
 
         # Lista fajlova za izbor
         #st.subheader("📁 Dostupni fajlovi")
@@ -404,7 +239,7 @@ def main():
         
         # Kreiraj listu opcija za selectbox
         file_options = [
-            f"{f.relative_to(Path(csv_folder))}" for f in filtered_files_sorted
+            f.name for f in filtered_files_sorted
         ]
         
         #selected_file_idx = st.selectbox(
@@ -415,14 +250,31 @@ def main():
         #)
     
     # Kreiraj tabove
-    tab1, tab2 = st.tabs([
+    tab1, tab_search, tab_export, tab2 = st.tabs([
         "📊 Analiza bilansa stanja",
+        "🔍 Pretraga pozicija",
+        "💾 Export podataka",
         "📈 Ostalo (uskoro)"
     ])
     
     # Prvi tab - Analiza bilansa stanja
     with tab1:
         if df_aggregated is not None and len(df_aggregated) > 0:
+            # Poslednji period: iznosi i rast iz tabele pokazatelja (vidi src/metrics.py)
+            metrics = bank_metrics(bank_code)
+            if not metrics.empty:
+                latest = metrics.iloc[-1]
+                st.caption(
+                    f"Stanje na dan {metrics.index[-1].strftime('%d.%m.%Y')} "
+                    "(aktiva: promjena u odnosu na prethodni kvartal; krediti i depoziti: u odnosu na isti kvartal prošle godine)"
+                )
+                col_a, col_k, col_d, col_s = st.columns(4)
+                col_a.metric("Aktiva", f"{latest['Aktiva']:,}", format_growth(latest['Aktiva QoQ']))
+                col_k.metric("Krediti klijenata", f"{latest['Krediti klijenata']:,}", format_growth(latest['Krediti klijenata YoY']))
+                col_d.metric("Depoziti klijenata", f"{latest['Depoziti klijenata']:,}", format_growth(latest['Depoziti klijenata YoY']))
+                share = latest['Tržišno učešće']
+                col_s.metric("Tržišno učešće (aktiva)", f"{share:.1%}" if pd.notna(share) else "-")
+
             only_year_end = st.checkbox(
                 "Prikaži samo stanje na kraju godine",
                 value=True,
@@ -447,76 +299,28 @@ def main():
                     help="Možeš ukloniti ili dodati kategorije na grafikonu"
                 )
                 
-                #st.write("### Vertikalni Bar Chart (Datum na X osi)")
-                
-                # Filtriraj df_chart_source prema izabranim kategorijama
-                if selected_categories:
-                    df_chart = df_chart_source[df_chart_source['Kategorija'].isin(selected_categories)].copy()
-                else:
+                if not selected_categories:
                     st.warning("Nijedna kategorija nije izabrana. Prikazujem sve kategorije.")
-                    df_chart = df_chart_source.copy()
-                
-                # Konvertuj Amount u numerički tip (ukloni zareze i druge karaktere ako postoje)
-                # Napomena: Amount je već u hiljadama u CSV-u
-                if df_chart['Amount'].dtype == 'object':
-                    # Ukloni zareze i konvertuj u float
-                    df_chart['Amount'] = df_chart['Amount'].astype(str).str.replace(',', '').astype(float)
-                else:
-                    # Osiguraj da je numerički tip
-                    df_chart['Amount'] = pd.to_numeric(df_chart['Amount'], errors='coerce').fillna(0)
-                
-                # Amount je već u hiljadama u CSV-u, samo ga konvertuj u ceo broj
-                df_chart['Amount_in_thousands'] = df_chart['Amount'].astype(int)
-                
-                # Osiguraj da balance_date je datetime tip
-                if df_chart['balance_date'].dtype != 'datetime64[ns]':
-                    df_chart['balance_date'] = pd.to_datetime(df_chart['balance_date'])
-                
-                df_chart = df_chart.sort_values(['balance_date', 'Kategorija']).reset_index(drop=True)
-                
+
                 # Korak 4: Koristi Plotly za grupisanje barova (najbolje rešenje za grouped bars)
+                # Figura se kešira po (banka, kraj godine, kategorije, verzija podataka)
                 try:
-                    import plotly.graph_objects as go
-                    import plotly.express as px
-                    
-                    # Konvertuj datum u string za bolje prikazivanje
-                    df_chart['datum_str'] = df_chart['balance_date'].dt.strftime('%d.%m.%Y')
-                    
-                    # Kreiraj grouped bar chart sa Plotly
-                    fig = go.Figure()
-                    
-                    # Sortiraj kategorije u željenom redosledu (samo one koje su izabrane)
-                    category_order = ['Aktiva', 'Obaveze', 'Kapital',]
-                    colors = {'Aktiva': '#1f77b4', 'Obaveze': '#ff7f0e', 'Kapital': '#2ca02c', }
-                    
-                    # Filtriraj category_order da uključi samo izabrane kategorije
-                    filtered_category_order = [cat for cat in category_order if cat in selected_categories] if selected_categories else category_order
-                    
-                    for kategorija in filtered_category_order:
-                        df_cat = df_chart[df_chart['Kategorija'] == kategorija].sort_values('balance_date')
-                        if len(df_cat) > 0:
-                            fig.add_trace(go.Bar(
-                                x=df_cat['datum_str'],
-                                y=df_cat['Amount_in_thousands'],
-                                name=kategorija,
-                                marker_color=colors.get(kategorija, '#808080')  # Siva ako kategorija nema definisanu boju
-                            ))
-                    
-                    fig.update_layout(
-                        title='Pregled kategorija po datumu',
-                        xaxis_title='Datum',
-                        yaxis_title='Iznos (u hiljadama)',
-                        barmode='group',  # Ovo je ključno - grupiše barove jedan pored drugog
-                        xaxis=dict(tickangle=-45),
-                        height=500,
-                        showlegend=True
+                    fig = figure_cache.get_or_build(
+                        figure_key("kategorije", bank_key, only_year_end, selected_categories, data_version),
+                        lambda: build_category_figure(
+                            prepare_chart_frame(df_chart_source, selected_categories),
+                            selected_categories,
+                            CATEGORY_ORDER,
+                            CATEGORY_COLORS,
+                            title='Pregled kategorija po datumu',
+                        ),
                     )
-                    
                     st.plotly_chart(fig, use_container_width=True)
                     
                 except ImportError:
                     st.warning("Plotly nije instaliran. Koristim st.bar_chart kao fallback.")
                     # Fallback: st.bar_chart sa pivot tabelom
+                    df_chart = prepare_chart_frame(df_chart_source, selected_categories)
                     pivot_df = df_chart.pivot_table(
                         index='balance_date',
                         columns='Kategorija',
@@ -524,8 +328,7 @@ def main():
                         aggfunc='sum'
                     ).fillna(0)
                     pivot_df = pivot_df.sort_index()
-                    category_order = ['Aktiva', 'Obaveze', 'Kapital']
-                    existing_categories = [cat for cat in category_order if cat in pivot_df.columns]
+                    existing_categories = [cat for cat in CATEGORY_ORDER if cat in pivot_df.columns]
                     if existing_categories:
                         pivot_df = pivot_df[existing_categories]
                     st.bar_chart(pivot_df, height=400)
@@ -533,42 +336,11 @@ def main():
                 st.divider()
             
             # Drugi graf - sa drugim kategorijama (analogno prvom)
-            if df is not None and "Pozicija" in df.columns and len(df_aggregated) > 0:
-                class Kategorija_2(Enum):
-                    KREDITI_KLIJENATA = "Krediti klijenata"
-                    HoV = "Hartije od vrijednosti"
-                    DEPOZITI_KLIJENATA = "Depoziti klijenata"
-
-                cat_mapper_2 = {
-                    Kategorija_2.KREDITI_KLIJENATA: ["2.b. Krediti i potrazivanja od klijenata","2.a. Krediti i potrazivanja od banaka"],
-                    Kategorija_2.HoV: ["2.c. Hartije od vrijednosti","3.c. Hartije od vrijednosti","4.c. Hartije od vrijednosti"],
-                    Kategorija_2.DEPOZITI_KLIJENATA: "17.b. Depoziti klijenata",
-                }
-                
-                # Učitaj sve kategorije za drugi graf (analogno prvom)
-                all_categories_data_2 = []
-                
-                for kategorija_enum_2, pozicije_values in cat_mapper_2.items():
-                    for pozicija_value_2 in (pozicije_values if isinstance(pozicije_values, list) else [pozicije_values]):
-                        df_filtered_2 = df[df["Pozicija"] == pozicija_value_2].copy()
-                        
-                        if len(df_filtered_2) > 0 and 'Amount' in df_filtered_2.columns:
-                            # Konvertuj Amount u numerički tip pre agregacije
-                            if df_filtered_2['Amount'].dtype == 'object':
-                                df_filtered_2['Amount'] = df_filtered_2['Amount'].astype(str).str.replace(',', '').astype(float)
-                            else:
-                                df_filtered_2['Amount'] = pd.to_numeric(df_filtered_2['Amount'], errors='coerce').fillna(0)
-                            
-                            # Agregiraj po datumu
-                            df_agg_2 = df_filtered_2.groupby('balance_date')['Amount'].sum().reset_index()
-                            # Dodaj kolonu sa imenom kategorije (koristi Enum vrednost)
-                            df_agg_2['Kategorija'] = kategorija_enum_2.value
-                            all_categories_data_2.append(df_agg_2)
-                
-                # Kombinuj sve kategorije u jedan DataFrame
-                if all_categories_data_2:
-                    df_aggregated_2 = pd.concat(all_categories_data_2, ignore_index=True)
+            if "Pozicija" in df.columns and len(df_aggregated) > 0:
+                # Krediti, HoV i depoziti klijenata po datumu (analogno prvom)
+                df_aggregated_2 = bank_data.credit_deposit
 
+                if not df_aggregated_2.empty:
                     df_chart_2_source = df_aggregated_2.copy()
                     if only_year_end:
                         df_chart_2_source = df_chart_2_source[df_chart_2_source['balance_date'].dt.month == 12]
@@ -576,12 +348,6 @@ def main():
                     if df_chart_2_source.empty:
                         st.warning("Nema podataka za prikaz kredita i depozita sa trenutno odabranim filterom (kraj godine).")
                     else:
-                        ratio_source = df_chart_2_source.copy()
-                        if ratio_source['Amount'].dtype == 'object':
-                            ratio_source['Amount'] = ratio_source['Amount'].astype(str).str.replace(',', '').astype(float)
-                        else:
-                            ratio_source['Amount'] = pd.to_numeric(ratio_source['Amount'], errors='coerce').fillna(0)
-                        ratio_source['Amount_in_thousands'] = ratio_source['Amount'].astype(int)
                         st.subheader(f"Pregled kredita i depozita u periodu: {df_chart_2_source['balance_date'].min().strftime('%d.%m.%Y')} - {df_chart_2_source['balance_date'].max().strftime('%d.%m.%Y')}")
                     
                     # Dodaj kontrolu za izbor kategorija (analogno prvom)
@@ -593,76 +359,28 @@ def main():
                         help="Možeš ukloniti ili dodati kategorije na grafikonu"
                     )
                     
-                    #st.write("### Vertikalni Bar Chart (Datum na X osi)")
-                    
-                    # Filtriraj df_aggregated_2 prema izabranim kategorijama
-                    if selected_categories_2:
-                        df_chart_2 = df_chart_2_source[df_chart_2_source['Kategorija'].isin(selected_categories_2)].copy()
-                    else:
+                    if not selected_categories_2:
                         st.warning("Nijedna kategorija nije izabrana. Prikazujem sve kategorije.")
-                        df_chart_2 = df_chart_2_source.copy()
-                    
-                    # Konvertuj Amount u numerički tip (ukloni zareze i druge karaktere ako postoje)
-                    # Napomena: Amount je već u hiljadama u CSV-u
-                    if df_chart_2['Amount'].dtype == 'object':
-                        df_chart_2['Amount'] = df_chart_2['Amount'].astype(str).str.replace(',', '').astype(float)
-                    else:
-                        df_chart_2['Amount'] = pd.to_numeric(df_chart_2['Amount'], errors='coerce').fillna(0)
-                    
-                    # Amount je već u hiljadama u CSV-u, samo ga konvertuj u ceo broj
-                    df_chart_2['Amount_in_thousands'] = df_chart_2['Amount'].astype(int)
-                    
-                    # Osiguraj da balance_date je datetime tip
-                    if df_chart_2['balance_date'].dtype != 'datetime64[ns]':
-                        df_chart_2['balance_date'] = pd.to_datetime(df_chart_2['balance_date'])
-                    
-                    df_chart_2 = df_chart_2.sort_values(['balance_date', 'Kategorija']).reset_index(drop=True)
                     
                     # Koristi Plotly za grupisanje barova (analogno prvom)
                     try:
-                        import plotly.graph_objects as go
-                        import plotly.express as px
-                        
-                        # Konvertuj datum u string za bolje prikazivanje
-                        df_chart_2['datum_str'] = df_chart_2['balance_date'].dt.strftime('%d.%m.%Y')
-                        
-                        # Kreiraj grouped bar chart sa Plotly
-                        fig2 = go.Figure()
-                        
-                        # Sortiraj kategorije u željenom redosledu (samo one koje su izabrane)
-                        category_order_2 = ['Krediti klijenata','Hartije od vrijednosti', 'Depoziti klijenata']
-                        colors_2 = {'Krediti klijenata': '#1f77b4', 'Hartije od vrijednosti': '#ff7f0e', 'Depoziti klijenata': '#2ca02c'}
-                        
-                        # Filtriraj category_order_2 da uključi samo izabrane kategorije
-                        filtered_category_order_2 = [cat for cat in category_order_2 if cat in selected_categories_2] if selected_categories_2 else category_order_2
-                        
-                        for kategorija in filtered_category_order_2:
-                            df_cat_2 = df_chart_2[df_chart_2['Kategorija'] == kategorija].sort_values('balance_date')
-                            if len(df_cat_2) > 0:
-                                fig2.add_trace(go.Bar(
-                                    x=df_cat_2['datum_str'],
-                                    y=df_cat_2['Amount_in_thousands'],
-                                    name=kategorija,
-                                    marker_color=colors_2.get(kategorija, '#808080'),  # Siva ako kategorija nema definisanu boju
-                                    offsetgroup=kategorija,
-                                    legendgroup=kategorija
-                                ))
-                        
-                        fig2.update_layout(
-                            title='Pregled kredita, HoV i depozita po datumu',
-                            xaxis_title='Datum',
-                            yaxis_title='Iznos (u hiljadama)',
-                            barmode='group',  # Ovo je ključno - grupiše barove jedan pored drugog
-                            xaxis=dict(tickangle=-45),
-                            height=500,
-                            showlegend=True
+                        fig2 = figure_cache.get_or_build(
+                            figure_key("krediti_depoziti", bank_key, only_year_end, selected_categories_2, data_version),
+                            lambda: build_category_figure(
+                                prepare_chart_frame(df_chart_2_source, selected_categories_2),
+                                selected_categories_2,
+                                CATEGORY_ORDER_2,
+                                CATEGORY_COLORS_2,
+                                title='Pregled kredita, HoV i depozita po datumu',
+                                group_traces=True,
+                            ),
                         )
-                        
                         st.plotly_chart(fig2, use_container_width=True)
                         
                     except ImportError:
                         st.warning("Plotly nije instaliran. Koristim st.bar_chart kao fallback.")
                         # Fallback: st.bar_chart sa pivot tabelom
+                        df_chart_2 = prepare_chart_frame(df_chart_2_source, selected_categories_2)
                         pivot_df_2 = df_chart_2.pivot_table(
                             index='balance_date',
                             columns='Kategorija',
@@ -670,71 +388,135 @@ def main():
                             aggfunc='sum'
                         ).fillna(0)
                         pivot_df_2 = pivot_df_2.sort_index()
-                        category_order_2 = ['Krediti klijenata','Hartije od vrijednosti', 'Depoziti klijenata']
-                        existing_categories_2 = [cat for cat in category_order_2 if cat in pivot_df_2.columns]
+                        existing_categories_2 = [cat for cat in CATEGORY_ORDER_2 if cat in pivot_df_2.columns]
                         if existing_categories_2:
                             pivot_df_2 = pivot_df_2[existing_categories_2]
                         st.bar_chart(pivot_df_2, height=400)
 
-                    # Dodatni graf: odnos kredita i depozita (K/D ratio) baziran na kompletnim podacima
-                    ratio_pivot = ratio_source.pivot_table(
-                        index='balance_date',
-                        columns='Kategorija',
-                        values='Amount_in_thousands',
-                        aggfunc='sum'
-                    ).fillna(0)
-                    ratio_pivot = ratio_pivot.sort_index()
-
-                    if {'Krediti klijenata', 'Depoziti klijenata'}.issubset(ratio_pivot.columns):
-                        ratio_pivot['K/D odnos'] = ratio_pivot['Krediti klijenata'] / ratio_pivot['Depoziti klijenata'].replace({0: pd.NA})
-                        ratio_pivot = ratio_pivot.dropna(subset=['K/D odnos'])
-
-                        if not ratio_pivot.empty:
-                            st.write("### Odnos kredita i depozita (K/D)")
-                            try:
-                                import plotly.graph_objects as go
-                                ratio_pivot['datum_str'] = ratio_pivot.index.strftime('%d.%m.%Y')
-
-                                fig_ratio = go.Figure(
-                                    data=[
-                                        go.Bar(
-                                            x=ratio_pivot['datum_str'],
-                                            y=(ratio_pivot['K/D odnos'] * 100).round(2),
-                                            text=(ratio_pivot['K/D odnos'] * 100).round(2).astype(str) + '%',
-                                            textposition='outside',
-                                            width=0.6
-                                        )
-                                    ]
-                                )
-
-                                fig_ratio.update_layout(
-                                    title='Odnos kredita i depozita (K/D) u %',
-                                    xaxis_title='Datum',
-                                    yaxis_title='K/D (%)',
-                                    yaxis=dict(ticksuffix='%', tickformat='.2f'),
-                                    height=400,
-                                    bargap=0.3
-                                )
-                                fig_ratio.update_traces(
-                                    hovertemplate='Datum: %{x}<br>K/D: %{y:.2f}%<extra></extra>'
-                                )
-
-                                st.plotly_chart(fig_ratio, use_container_width=True)
-                            except ImportError:
-                                st.bar_chart((ratio_pivot['K/D odnos'] * 100).round(2), height=300)
-                        else:
-                            st.info("Nije moguće izračunati odnos K/D (nedostaju podaci ili su depoziti 0).")
+                    # Dodatni graf: odnos kredita i depozita (K/D) iz tabele pokazatelja (vidi src/metrics.py)
+                    ratio_pivot = bank_metrics(bank_code)
+                    ratio_pivot = ratio_pivot[ratio_pivot.index.year >= 2020]
+                    if only_year_end:
+                        ratio_pivot = ratio_pivot[ratio_pivot.index.month == 12]
+                    ratio_pivot = ratio_pivot.dropna(subset=['K/D odnos'])
+
+                    if not ratio_pivot.empty:
+                        st.write("### Odnos kredita i depozita (K/D)")
+                        try:
+                            fig_ratio = figure_cache.get_or_build(
+                                figure_key("kd_odnos", bank_key, only_year_end, (), data_version),
+                                lambda: build_ratio_figure(ratio_pivot),
+                            )
+                            st.plotly_chart(fig_ratio, use_container_width=True)
+                        except ImportError:
+                            st.bar_chart((ratio_pivot['K/D odnos'] * 100).round(2), height=300)
                     else:
-                        st.info("Za prikaz odnosa K/D neophodno je imati i kredite i depozite u podacima.")
+                        st.info("Nije moguće izračunati odnos K/D (nedostaju podaci ili su depoziti 0).")
             else:
                 st.warning("Nema podataka za prikaz drugog grafikona.")
     
+    # Pretraga pozicija preko indeksa (vidi src/search_index.py)
+    with tab_search:
+        st.subheader("Pretraga pozicija")
+        search_text = st.text_input(
+            "Tekst za pretragu",
+            placeholder="npr. potrazivanja od klijenata",
+            help="Pretraga ne zavisi od velikih slova i dijakritika (potrazivanja = potraživanja)"
+        )
+
+        if search_text:
+            search_index = get_search_index()
+            matches = search_index.search(search_text)
+
+            if not matches:
+                st.info("Nema pozicija za dati upit.")
+            else:
+                st.caption(f"Pronađeno {len(matches)} pozicija")
+                match_labels = {m["id"]: f"[{m['report_type']}] {m['Pozicija']}" for m in matches}
+                selected_position = st.selectbox(
+                    "Pozicija",
+                    options=list(match_labels),
+                    format_func=lambda pid: match_labels[pid]
+                )
+
+                series_df = search_index.series(selected_position)
+                series_pivot = series_df.pivot_table(
+                    index='balance_date',
+                    columns='banka',
+                    values='Amount',
+                    aggfunc='sum'
+                ).astype(float).sort_index()
+                series_pivot = series_pivot.rename(columns=lambda code: BANKE.get(code, code))
+
+                st.line_chart(series_pivot, height=400)
+                st.dataframe(series_pivot, width='stretch')
+
+    # Export tab - podaci se čitaju i upisuju u chunk-ovima (vidi src/export.py)
+    with tab_export:
+        st.subheader("Export podataka")
+
+        export_banks = st.multiselect(
+            "Banke",
+            options=list(BANKE),
+            default=[bank_code],
+            format_func=lambda code: BANKE[code],
+        )
+        current_year = datetime.now().year
+        export_years = st.select_slider(
+            "Period (godine)",
+            options=list(range(2005, current_year + 1)),
+            value=(2020, current_year),
+        )
+        export_format_label = st.radio(
+            "Format za export",
+            options=["CSV", "Excel", "JSON Lines"],
+            horizontal=True
+        )
+        export_format = {"CSV": "csv", "Excel": "xlsx", "JSON Lines": "jsonl"}[export_format_label]
+
+        if st.button("💾 Pripremi fajl", disabled=not export_banks):
+            extension, mime = EXPORT_FORMATS[export_format]
+            # Redovi se upisuju direktno u bafer, bez pravljenja DataFrame-a
+            buffer = io.BytesIO()
+            try:
+                with st.spinner("Pripremam fajl..."):
+                    row_count = export_data(
+                        buffer,
+                        export_format,
+                        export_banks,
+                        parse_period(str(export_years[0])),
+                        parse_period(str(export_years[1]), end=True),
+                    )
+                buffer.seek(0)
+                logger.info(f"Export: {row_count} redova, format {export_format}, banke {export_banks}")
+                st.download_button(
+                    label=f"Preuzmi {export_format_label} ({row_count} redova)",
+                    data=buffer,
+                    file_name=f"bilansi_{export_years[0]}_{export_years[1]}{extension}",
+                    mime=mime
+                )
+            except ImportError:
+                st.error("Za Excel export instaliraj: pip install openpyxl")
+
+    timer.lap("Prikaz (grafikoni, pretraga, export)")
+
+    with st.sidebar:
+        if st.checkbox("⏱️ Prikaži vremena izvršavanja", value=False):
+            st.dataframe(
+                pd.DataFrame(
+                    [(name, round(seconds * 1000, 1)) for name, seconds in timer.laps]
+                    + [("Ukupno", round(timer.total() * 1000, 1))],
+                    columns=["Faza", "ms"],
+                ),
+                width='stretch',
+                hide_index=True,
+            )
+
     # Drugi tab - Placeholder za buduće funkcionalnosti
     with tab2:
         st.info("Ovo je placeholder za buduće funkcionalnosti aplikacije.")
         st.markdown("### Uskoro će biti dostupno:")
         st.markdown("- Dodatne analize")
-        st.markdown("- Eksport podataka")
         st.markdown("- Dodatni izvještaji")
     
     # Glavni sadržaj (komentarisano)
@@ -0,0 +1,103 @@
+# src/aggregates.py
+
+from typing import Dict, List, Mapping
+
+import pandas as pd
+
+
+# Kategorija -> pozicije iz bilansa stanja koje ulaze u nju
+BALANCE_CATEGORIES: Dict[str, List[str]] = {
+    "Aktiva": ["16. UKUPNA SREDSTVA:"],
+    "Obaveze": ["28. UKUPNE OBAVEZE:"],
+    "Kapital": ["35. UKUPAN KAPITAL: (29. do 34.)"],
+}
+
+CREDIT_DEPOSIT_CATEGORIES: Dict[str, List[str]] = {
+    "Krediti klijenata": ["2.b. Krediti i potrazivanja od klijenata", "2.a. Krediti i potrazivanja od banaka"],
+    "Hartije od vrijednosti": ["2.c. Hartije od vrijednosti", "3.c. Hartije od vrijednosti", "4.c. Hartije od vrijednosti"],
+    "Depoziti klijenata": ["17.b. Depoziti klijenata"],
+}
+
+AGGREGATE_COLUMNS = ["balance_date", "Amount", "Kategorija"]
+
+
+def aggregate_categories(df: pd.DataFrame, categories: Mapping[str, List[str]]) -> pd.DataFrame:
+    """
+    Sabira iznose pozicija po datumu bilansa.
+    Vraća jedan red po (kategorija, pozicija, datum) sa kolonama balance_date, Amount, Kategorija.
+    """
+    if df is None or df.empty or "Pozicija" not in df.columns:
+        return pd.DataFrame(columns=AGGREGATE_COLUMNS)
+
+    all_positions = [p for positions in categories.values() for p in positions]
+    # Jedan prolaz kroz podatke za sve pozicije umjesto jednog filtera po poziciji
+    selected = df[df["Pozicija"].isin(all_positions)]
+    if selected.empty:
+        return pd.DataFrame(columns=AGGREGATE_COLUMNS)
+
+    # Prazne pozicije računaj kao 0
+    grouped = (
+        selected.assign(Amount=selected["Amount"].fillna(0))
+        .groupby(["Pozicija", "balance_date"], observed=True)["Amount"]
+        .sum()
+    )
+
+    parts = []
+    for kategorija, positions in categories.items():
+        for pozicija in positions:
+            if pozicija not in grouped.index.get_level_values(0):
+                continue
+            df_agg = grouped.loc[pozicija].reset_index()
+            df_agg["Kategorija"] = kategorija
+            parts.append(df_agg)
+
+    if not parts:
+        return pd.DataFrame(columns=AGGREGATE_COLUMNS)
+    return pd.concat(parts, ignore_index=True)[AGGREGATE_COLUMNS]
+
+
+def category_table(df: pd.DataFrame, only_year_end: bool = False) -> pd.DataFrame:
+    """
+    Široka tabela za jednu banku: red po datumu, kolona po kategoriji
+    (Aktiva, Obaveze, Kapital, krediti, HoV, depoziti) i K/D odnos.
+    """
+    aggregated = pd.concat([
+        aggregate_categories(df, BALANCE_CATEGORIES),
+        aggregate_categories(df, CREDIT_DEPOSIT_CATEGORIES),
+    ], ignore_index=True)
+    return _wide_table(aggregated, only_year_end)
+
+
+def sector_table(category_tables: Mapping[str, pd.DataFrame]) -> pd.DataFrame:
+    """Sabira široke tabele svih banaka po datumu i ponovo računa K/D odnos."""
+    tables = [t.drop(columns=["K/D odnos"], errors="ignore") for t in category_tables.values() if not t.empty]
+    if not tables:
+        return pd.DataFrame()
+    total = pd.concat(tables).groupby(level=0).sum().sort_index()
+    return _add_kd_ratio(total)
+
+
+def _wide_table(aggregated: pd.DataFrame, only_year_end: bool) -> pd.DataFrame:
+    if aggregated.empty:
+        return pd.DataFrame()
+    if only_year_end:
+        aggregated = aggregated[aggregated["balance_date"].dt.month == 12]
+
+    wide = aggregated.pivot_table(
+        index="balance_date",
+        columns="Kategorija",
+        values="Amount",
+        aggfunc="sum"
+    ).fillna(0).astype("int64").sort_index()
+    wide.columns.name = None
+
+    ordered = [c for c in [*BALANCE_CATEGORIES, *CREDIT_DEPOSIT_CATEGORIES] if c in wide.columns]
+    return _add_kd_ratio(wide[ordered])
+
+
+def _add_kd_ratio(wide: pd.DataFrame) -> pd.DataFrame:
+    wide = wide.copy()
+    if {"Krediti klijenata", "Depoziti klijenata"}.issubset(wide.columns):
+        deposits = wide["Depoziti klijenata"].astype(float).where(wide["Depoziti klijenata"] != 0)
+        wide["K/D odnos"] = wide["Krediti klijenata"] / deposits
+    return wide
@@ -0,0 +1,333 @@
+# src/api.py
+
+import gzip
+import hashlib
+import json
+import math
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+try:
+    from aggregates import category_table, sector_table
+    from config import BANKE, BANKE_CSV_FOLDER
+    from dataset import bank_csv_files, compute_data_version, load_bank_frame
+    from partitions import PartitionView, split_key
+except ImportError:  # Uvezeno kao paket
+    from src.aggregates import category_table, sector_table
+    from src.config import BANKE, BANKE_CSV_FOLDER
+    from src.dataset import bank_csv_files, compute_data_version, load_bank_frame
+    from src.partitions import PartitionView, split_key
+
+
+# Odgovori manji od ovoga se ne kompresuju (gzip bi ih samo uvećao)
+GZIP_MIN_SIZE = 512
+
+
+def table_to_records(table: pd.DataFrame) -> list:
+    """Široku tabelu (indeks = datum) pretvara u listu JSON objekata."""
+    records = []
+    for date, row in table.iterrows():
+        record = {"date": date.strftime("%Y-%m-%d")}
+        for column, value in row.items():
+            if isinstance(value, float) and math.isnan(value):
+                record[column] = None
+            elif column == "K/D odnos":
+                record[column] = round(float(value), 4)
+            else:
+                record[column] = int(value)
+        records.append(record)
+    return records
+
+
+def _year_end(query: Dict[str, list]) -> bool:
+    return query.get("year_end", ["0"])[0] in ("1", "true", "da")
+
+
+class Snapshot:
+    """
+    Sve agregacije za jednu verziju podataka. Računa se jednom po verziji.
+    frames sadrži sve banke, i one koje više ne postoje (ulaze u zbir sektora),
+    a API prikazuje samo banke iz BANKE.
+    Sa previous i changed_banks se tabele banaka koje se nisu promijenile
+    uzimaju iz prethodnog snapshot-a, a računaju se samo za izmijenjene banke.
+    """
+
+    def __init__(
+        self,
+        data_version: str,
+        frames: Dict[str, pd.DataFrame],
+        previous: Optional["Snapshot"] = None,
+        changed_banks: Optional[Set[str]] = None,
+    ):
+        self.data_version = data_version
+        self.frames = frames
+        reuse: Set[str] = set()
+        if previous is not None and changed_banks is not None:
+            reuse = (set(frames) & set(previous.tables)) - changed_banks
+        self.tables = {
+            code: previous.tables[code] if code in reuse else category_table(df)
+            for code, df in self.frames.items()
+        }
+        self.year_end_tables = {
+            code: previous.year_end_tables[code] if code in reuse else category_table(df, only_year_end=True)
+            for code, df in self.frames.items()
+        }
+        self.sector = sector_table(self.tables)
+        self.year_end_sector = sector_table(self.year_end_tables)
+        # Gotovi odgovori: (ruta, year_end) -> (etag, telo, gzip telo). Čuvaju se samo
+        # postojeće rute, pa broj unosa ne zavisi od onoga što klijenti pošalju u upitu
+        self._responses: Dict[Tuple[str, bool], Tuple[str, bytes, Optional[bytes]]] = {}
+        self._lock = threading.Lock()
+
+    def payload(self, path: str, query: Dict[str, list]) -> Optional[dict]:
+        year_end = _year_end(query)
+        parts = [p for p in path.split("/") if p]
+
+        if parts == ["api", "version"]:
+            return {"data_version": self.data_version}
+
+        if parts == ["api", "banks"]:
+            banks = []
+            for code, name in BANKE.items():
+                table = self.tables[code]
+                banks.append({
+                    "code": code,
+                    "name": name,
+                    "periods": len(table),
+                    "first": table.index.min().strftime("%Y-%m-%d") if len(table) else None,
+                    "last": table.index.max().strftime("%Y-%m-%d") if len(table) else None,
+                })
+            return {"data_version": self.data_version, "banks": banks}
+
+        if len(parts) == 4 and parts[:2] == ["api", "banks"] and parts[3] == "series":
+            code = parts[2]
+            if code not in BANKE:
+                return None
+            table = (self.year_end_tables if year_end else self.tables)[code]
+            return {
+                "data_version": self.data_version,
+                "bank": code,
+                "name": BANKE[code],
+                "year_end": year_end,
+                "series": table_to_records(table),
+            }
+
+        if parts == ["api", "sector", "series"]:
+            table = self.year_end_sector if year_end else self.sector
+            return {
+                "data_version": self.data_version,
+                "year_end": year_end,
+                "series": table_to_records(table),
+            }
+
+        return None
+
+    def response(self, path: str, query_string: str) -> Optional[Tuple[str, bytes, Optional[bytes]]]:
+        """Vraća (etag, json telo, gzip telo) i pamti ih za sledeće zahtjeve."""
+        query = parse_qs(query_string)
+        cache_key = ("/".join(p for p in path.split("/") if p), _year_end(query))
+        with self._lock:
+            cached = self._responses.get(cache_key)
+        if cached is not None:
+            return cached
+
+        payload = self.payload(path, query)
+        if payload is None:
+            return None
+
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        compressed = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+        digest = hashlib.sha1(body).hexdigest()[:12]
+        etag = f'W/"{self.data_version}-{digest}"'
+
+        with self._lock:
+            self._responses[cache_key] = (etag, body, compressed)
+        return etag, body, compressed
+
+
+class AggregateStore:
+    """
+    Drži agregacije za trenutnu verziju podataka.
+    Verziju provjerava najviše jednom u check_interval sekundi; nova verzija
+    znači novi Snapshot, inače se svi zahtjevi služe iz postojećeg.
+
+    Za podrazumijevani folder podaci se čitaju iz particija (vidi partitions.py):
+    nova verzija manifesta znači čitanje samo izmijenjenih particija i računanje
+    samo izmijenjenih banaka. Bez manifesta (ili za drugi folder) čitaju se CSV fajlovi.
+    """
+
+    def __init__(self, csv_folder: str = BANKE_CSV_FOLDER, check_interval: float = 5.0):
+        self.csv_folder = csv_folder
+        self.check_interval = check_interval
+        self._snapshot: Optional[Snapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._view = PartitionView(report_types=("bs",)) if csv_folder == BANKE_CSV_FOLDER else None
+        self._from_partitions = False
+
+    def _csv_banks(self) -> List[str]:
+        """Banke iz BANKE i sve ostale sa folderom bilansa stanja (npr. ugašene banke)."""
+        bs_dir = Path(self.csv_folder) / "bs"
+        found = {path.name for path in bs_dir.iterdir() if path.is_dir()} if bs_dir.exists() else set()
+        return sorted(found | set(BANKE))
+
+    def current_version(self) -> str:
+        files = []
+        for code in self._csv_banks():
+            files.extend(bank_csv_files(code, csv_folder=self.csv_folder))
+        return compute_data_version(files)
+
+    def _partition_snapshot(self) -> Optional[Snapshot]:
+        """Snapshot iz particija; None ako manifesta nema."""
+        changed = self._view.refresh()
+        if changed is None:
+            return None
+        version = self._view.data_version
+        if self._from_partitions and self._snapshot is not None and self._snapshot.data_version == version:
+            return self._snapshot
+        previous = self._snapshot if self._from_partitions and not self._view.full_reload else None
+        banks = sorted(set(self._view.banks()) | set(BANKE))
+        changed_banks = {split_key(key)[1] for key in changed} if previous is not None else set(banks)
+        frames = {
+            code: previous.frames[code] if code not in changed_banks and code in previous.frames
+            else self._view.bank_frame(code)
+            for code in banks
+        }
+        print(
+            f"Računam agregacije za verziju podataka {version} "
+            f"({self._view.partitions_read} particija pročitano, banke: {len(changed_banks & set(banks))})..."
+        )
+        return Snapshot(version, frames, previous, changed_banks)
+
+    def snapshot(self) -> Snapshot:
+        with self._lock:
+            now = time.monotonic()
+            if self._snapshot is None or now - self._checked_at >= self.check_interval:
+                self._checked_at = now
+                snapshot = self._partition_snapshot() if self._view is not None else None
+                if snapshot is not None:
+                    self._snapshot, self._from_partitions = snapshot, True
+                    return self._snapshot
+                version = self.current_version()
+                if self._snapshot is None or self._from_partitions or self._snapshot.data_version != version:
+                    print(f"Računam agregacije za verziju podataka {version}...")
+                    frames = {
+                        code: load_bank_frame(bank_csv_files(code, csv_folder=self.csv_folder))
+                        for code in self._csv_banks()
+                    }
+                    self._snapshot, self._from_partitions = Snapshot(version, frames), False
+            return self._snapshot
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "BilansiAPI/1.0"
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def _handle(self, send_body: bool):
+        parsed = urlparse(self.path)
+        server: "ApiServer" = self.server  # type: ignore[assignment]
+        snapshot = server.store.snapshot()
+        response = snapshot.response(parsed.path, parsed.query)
+
+        if response is None:
+            self._send_error_json(HTTPStatus.NOT_FOUND, "Nepoznata putanja ili banka")
+            return
+
+        etag, body, compressed = response
+        if etag in self._if_none_match():
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._send_cache_headers(etag, server.max_age)
+            self.end_headers()
+            return
+
+        use_gzip = compressed is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+        payload = compressed if use_gzip else body
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        self._send_cache_headers(etag, server.max_age)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(payload)
+
+    def _if_none_match(self) -> set:
+        header = self.headers.get("If-None-Match", "")
+        return {tag.strip() for tag in header.split(",") if tag.strip()}
+
+    def _send_cache_headers(self, etag: str, max_age: int):
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", f"public, max-age={max_age}")
+        self.send_header("Vary", "Accept-Encoding")
+
+    def _send_error_json(self, status: HTTPStatus, message: str):
+        body = json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, store: AggregateStore, max_age: int = 60):
+        super().__init__(address, ApiHandler)
+        self.store = store
+        self.max_age = max_age
+
+
+def main():
+    """Pokreće lokalni read-only JSON API."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Lokalni JSON API sa agregacijama bilansa po bankama i za sektor"
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Adresa (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8502, help="Port (default: 8502)")
+    parser.add_argument(
+        "--csv-folder",
+        type=str,
+        default=BANKE_CSV_FOLDER,
+        help=f"Folder sa CSV bilansima (default: {BANKE_CSV_FOLDER})"
+    )
+    parser.add_argument(
+        "--max-age",
+        type=int,
+        default=60,
+        help="Cache-Control max-age u sekundama (default: 60)"
+    )
+    args = parser.parse_args()
+
+    store = AggregateStore(args.csv_folder)
+    store.snapshot()  # Izračunaj agregacije odmah, ne na prvi zahtjev
+
+    server = ApiServer((args.host, args.port), store, max_age=args.max_age)
+    print(f"API radi na http://{args.host}:{args.port}/api/banks")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nZaustavljam API...")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
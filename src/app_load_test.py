@@ -0,0 +1,338 @@
+# src/app_load_test.py
+#
+# Test opterećenja za app.py: za svaki nivo se pokrene pravi `streamlit run`
+# server, a N istovremenih sesija (svaka sa svojom websocket konekcijom, kao
+# tab u browseru) nasumično mijenja banke. Mjeri se trajanje svakog rerun-a
+# (p50/p95/max) i RSS server procesa tokom testa, pa se vidi da li memorija raste
+# sa brojem korisnika i kako se sesije takmiče za CPU.
+
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+from typing import List, Optional
+
+from config import BANKE, BENCHMARKS_FILE
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+APP_PATH = ROOT_DIR / "app.py"
+
+# Labela selectbox-a za izbor banke u app.py
+BANK_SELECTBOX_LABEL = "Izaberite banku:"
+
+_MB = 1024 * 1024
+
+
+def process_rss_bytes(pid: int) -> Optional[int]:
+    """RSS drugog procesa u bajtovima (samo Linux, iz /proc); drugdje None."""
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class RssSampler:
+    """Periodično bilježi RSS server procesa u pozadinskoj niti."""
+
+    def __init__(self, pid: int, interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[int] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = process_rss_bytes(self.pid)
+            if rss:
+                self.samples.append(rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def peak(self) -> int:
+        return max(self.samples, default=0)
+
+
+def percentile(values: List[float], pct: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class StreamlitServer:
+    """
+    `streamlit run app.py` u posebnom procesu, na slobodnom portu.
+    Svaka websocket konekcija na server je zasebna sesija sa svojim session_state-om,
+    dok keševi (st.cache_resource) važe za cijeli server, kao u produkciji.
+    """
+
+    def __init__(self, startup_timeout: float = 60.0):
+        self.port = free_port()
+        self.startup_timeout = startup_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self._log = tempfile.TemporaryFile()
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/_stcore/stream"
+
+    def __enter__(self) -> "StreamlitServer":
+        self.process = subprocess.Popen(
+            [
+                sys.executable, "-m", "streamlit", "run", str(APP_PATH),
+                "--server.headless", "true",
+                "--server.address", "127.0.0.1",
+                "--server.port", str(self.port),
+                "--server.fileWatcherType", "none",
+                "--browser.gatherUsageStats", "false",
+            ],
+            cwd=ROOT_DIR,
+            stdout=self._log,
+            stderr=subprocess.STDOUT,
+        )
+        try:
+            self._wait_until_healthy()
+        except Exception:
+            self.__exit__()
+            raise
+        return self
+
+    def _wait_until_healthy(self):
+        health_url = f"http://127.0.0.1:{self.port}/_stcore/health"
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                self._log.seek(0)
+                output = self._log.read().decode("utf-8", errors="replace")
+                raise RuntimeError(f"Streamlit server se ugasio pri pokretanju:\n{output[-2000:]}")
+            try:
+                with urllib.request.urlopen(health_url, timeout=1) as response:
+                    if response.status == 200:
+                        return
+            except OSError:
+                pass
+            time.sleep(0.2)
+        raise TimeoutError(f"Streamlit server nije odgovorio za {self.startup_timeout:.0f} s")
+
+    def __exit__(self, *exc):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self._log.close()
+
+
+class BrowserSession:
+    """
+    Jedna sesija app.py preko websocket-a, onako kako je vodi browser:
+    BackMsg rerun_script sa stanjem widget-a, pa ForwardMsg poruke do script_finished.
+    """
+
+    def __init__(self, connection, timeout: float):
+        self.connection = connection
+        self.timeout = timeout
+        self.selectbox_id: Optional[str] = None
+
+    def rerun(self, bank_label: Optional[str] = None) -> List[str]:
+        """Pokrene skriptu (opciono sa izabranom bankom) i vrati poruke izuzetaka iz app-a."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        back_msg = BackMsg()
+        back_msg.rerun_script.query_string = ""
+        back_msg.rerun_script.page_script_hash = ""
+        if bank_label is not None:
+            widget = back_msg.rerun_script.widget_states.widgets.add()
+            widget.id = self.selectbox_id
+            widget.string_value = bank_label
+        self.connection.send(back_msg.SerializeToString())
+
+        errors: List[str] = []
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"rerun nije završen za {self.timeout:.0f} s")
+            msg = ForwardMsg()
+            msg.ParseFromString(self.connection.recv(timeout=remaining))
+            msg_type = msg.WhichOneof("type")
+
+            if msg_type == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type == "selectbox" and element.selectbox.label == BANK_SELECTBOX_LABEL:
+                    self.selectbox_id = element.selectbox.id
+                elif element_type == "exception":
+                    errors.append(f"{element.exception.type}: {element.exception.message}")
+            elif msg_type == "script_finished":
+                if msg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    errors.append("greška pri kompajliranju app.py")
+                return errors
+
+
+def run_session(session_id: int, url: str, switches: int, seed: Optional[int], timeout: float,
+                latencies: List[float], errors: List[str], lock: threading.Lock):
+    """Jedna sesija: otvori aplikaciju pa `switches` puta izaberi nasumičnu banku."""
+    from websockets.sync.client import connect
+
+    rng = random.Random(None if seed is None else seed + session_id)
+    banks = list(BANKE)
+
+    def rerun(bank_code: Optional[str] = None) -> bool:
+        start = time.perf_counter()
+        try:
+            app_errors = session.rerun(None if bank_code is None else BANKE[bank_code])
+        except Exception as e:
+            with lock:
+                errors.append(f"sesija {session_id}: {type(e).__name__}: {e}")
+            return False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            errors.extend(f"sesija {session_id}: {e}" for e in app_errors)
+        return True
+
+    try:
+        with connect(url, subprotocols=["streamlit"], max_size=None, open_timeout=timeout) as connection:
+            session = BrowserSession(connection, timeout)
+            if not rerun():
+                return
+            if session.selectbox_id is None:
+                with lock:
+                    errors.append(f"sesija {session_id}: selectbox \"{BANK_SELECTBOX_LABEL}\" nije pronađen")
+                return
+            for _ in range(switches):
+                if not rerun(rng.choice(banks)):
+                    return
+    except Exception as e:
+        with lock:
+            errors.append(f"sesija {session_id}: konekcija: {type(e).__name__}: {e}")
+
+
+def run_load_test(sessions: int, switches: int, seed: Optional[int] = None, timeout: float = 120.0) -> dict:
+    latencies: List[float] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+
+    with StreamlitServer() as server:
+        rss_start = process_rss_bytes(server.process.pid) or 0
+        start = time.perf_counter()
+        with RssSampler(server.process.pid) as sampler:
+            threads = [
+                threading.Thread(
+                    target=run_session,
+                    args=(i, server.url, switches, seed, timeout, latencies, errors, lock),
+                )
+                for i in range(sessions)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        elapsed = time.perf_counter() - start
+        rss_end = process_rss_bytes(server.process.pid) or 0
+
+    return {
+        "sessions": sessions,
+        "switches": switches,
+        "reruns": len(latencies),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "seconds": round(elapsed, 2),
+        "reruns_per_s": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "max_ms": round(max(latencies, default=0.0) * 1000, 1),
+        "rss_start_mb": round(rss_start / _MB, 1),
+        "rss_peak_mb": round(sampler.peak / _MB, 1),
+        "rss_end_mb": round(rss_end / _MB, 1),
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Simulira više istovremenih korisnika app.py i mjeri trajanje rerun-a i memoriju"
+    )
+    parser.add_argument(
+        "--sessions",
+        type=str,
+        default="1,4,8",
+        help="Broj istovremenih sesija; više nivoa odvojenih zarezom (default: 1,4,8)"
+    )
+    parser.add_argument(
+        "--switches",
+        type=int,
+        default=10,
+        help="Koliko puta svaka sesija mijenja banku (default: 10)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed za izbor banaka (za ponovljive scenarije)"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=120.0,
+        help="Najduže trajanje jednog rerun-a u sekundama (default: 120)"
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path(BENCHMARKS_FILE),
+        help=f"JSONL fajl u koji se dopisuju rezultati (default: {BENCHMARKS_FILE})"
+    )
+    args = parser.parse_args()
+
+    # Svaki nivo dobija svoj server, pa i prazan keš: prvi rerun-ovi plaćaju učitavanje
+    print(f"{'sesija':>6} {'rerun-ova':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'RSS vrh MB':>10} {'greške':>6}")
+    for sessions in [int(s) for s in args.sessions.split(",") if s.strip()]:
+        result = run_load_test(sessions, args.switches, args.seed, args.timeout)
+        print(
+            f"{result['sessions']:>6} {result['reruns']:>9} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+            f"{result['max_ms']:>8.1f} {result['rss_peak_mb']:>10.1f} {result['errors']:>6}"
+        )
+        for error in result["error_samples"]:
+            print(f"    {error}")
+
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with args.output.open("a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "benchmark": "app_load",
+                **result,
+            }, ensure_ascii=False) + "\n")
+    print(f"Rezultati dopisani u {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# src/bank_data.py
+#
+# Podaci jedne banke pripremljeni za prikaz (bilansi, memorija, računska provjera,
+# agregati za grafikone). Računaju se jednom po verziji podataka i dijele između
+# svih Streamlit sesija na serveru (app.py ih drži u st.cache_resource), pa
+# memorija ne raste sa brojem korisnika.
+#
+# Objekti su samo za čitanje: sesije ih ne smiju mijenjati. Ko želi da ih
+# filtrira ili dopuni kolonama, prvo napravi kopiju (.copy(), kao app.py i
+# charts.prepare_chart_frame).
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pandas as pd
+
+try:
+    from aggregates import BALANCE_CATEGORIES, CREDIT_DEPOSIT_CATEGORIES, aggregate_categories
+    from dataset import load_bank_frame, memory_report
+    from validation import validate_balance_sheets
+except ImportError:  # Uvezeno kao paket (npr. iz app.py)
+    from src.aggregates import BALANCE_CATEGORIES, CREDIT_DEPOSIT_CATEGORIES, aggregate_categories
+    from src.dataset import load_bank_frame, memory_report
+    from src.validation import validate_balance_sheets
+
+
+@dataclass(frozen=True)
+class BankData:
+    bank: str
+    data_version: str
+    frame: pd.DataFrame
+    memory: pd.DataFrame
+    issues: pd.DataFrame
+    # Aktiva / Obaveze / Kapital i krediti / HoV / depoziti po datumu (vidi aggregates.py)
+    balance: pd.DataFrame
+    credit_deposit: pd.DataFrame
+
+    @property
+    def total_bytes(self) -> int:
+        """Memorija koju podaci banke zauzimaju (jednom po procesu, ne po sesiji)."""
+        return int(self.memory.loc["UKUPNO", "bajtova"])
+
+
+def build_bank_data(
+    bank: str,
+    csv_files: Iterable[Path],
+    data_version: str,
+    min_year: Optional[int] = None,
+) -> BankData:
+    """Učitava CSV bilanse banke i računa sve što app.py prikazuje za nju."""
+    frame = load_bank_frame(csv_files, min_year=min_year)
+    return BankData(
+        bank=bank,
+        data_version=data_version,
+        frame=frame,
+        memory=memory_report(frame),
+        issues=validate_balance_sheets(frame),
+        balance=aggregate_categories(frame, BALANCE_CATEGORIES),
+        credit_deposit=aggregate_categories(frame, CREDIT_DEPOSIT_CATEGORIES),
+    )
@@ -0,0 +1,163 @@
+# src/benchmark_crawl.py
+#
+# Mjerenje protoka main.py (lista + preuzimanje) protiv lokalnog standin_server.py
+# za više nivoa paralelizma. Svako mjerenje se dopisuje u data/benchmarks.jsonl
+# (vrijeme, commit, scenario, rezultat), pa se promjene protoka mogu pratiti kroz vrijeme.
+
+import contextlib
+import io
+import json
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from config import BENCHMARKS_FILE, HTTP_CACHE_TTL
+from main import crawl
+from retry import BREAKERS, STATS as retry_stats
+from standin_server import StandinServer, config_arguments, config_from_args, describe
+
+BENCHMARKS_PATH = Path(BENCHMARKS_FILE)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=10, check=True,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def previous_runs(path: Path, scenario: dict, workers: int) -> List[dict]:
+    """Ranija mjerenja istog scenarija i istog broja niti (najstarije prvo)."""
+    if not path.is_file():
+        return []
+    runs = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                run = json.loads(line)
+            except ValueError:
+                continue
+            if run.get("scenario") == scenario and run.get("workers") == workers:
+                runs.append(run)
+    return runs
+
+
+def run_once(server: StandinServer, workers: int, delay: float, verbose: bool) -> dict:
+    """Jedno preuzimanje cijele liste u prazan privremeni folder."""
+    retry_stats.reset()
+    BREAKERS.reset()
+    server.stats.reset()
+
+    with tempfile.TemporaryDirectory(prefix="cbcg_bench_") as folder:
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        with output:
+            result = crawl(server.listing_url, folder, workers=workers, delay=delay,
+                           use_cache=False, ttl=HTTP_CACHE_TTL)
+
+    if result is None:
+        return {"workers": workers, "error": "lista fajlova nije dostupna"}
+    seconds = max(result.seconds, 1e-9)
+    return {
+        "workers": workers,
+        "found": result.found,
+        "downloaded": result.downloaded,
+        "failed": result.failed,
+        "bytes": result.bytes,
+        "seconds": round(result.seconds, 3),
+        "files_per_s": round(result.downloaded / seconds, 2),
+        "mb_per_s": round(result.bytes / (1024 * 1024) / seconds, 2),
+        "http_requests": retry_stats.requests,
+        "retries": retry_stats.retries,
+        "server": server.stats.as_dict(),
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Mjeri protok preuzimanja protiv lokalne zamjene za sajt CBCG"
+    )
+    parser.add_argument(
+        "--workers",
+        type=str,
+        default="1,4,16",
+        help="Nivoi paralelizma koje treba izmjeriti, odvojeni zarezom (default: 1,4,16)"
+    )
+    parser.add_argument(
+        "--delay",
+        type=float,
+        default=0.0,
+        help="Pauza posle svakog fajla po niti, kao --delay u main.py (default: 0)"
+    )
+    parser.add_argument(
+        "--label",
+        type=str,
+        default=None,
+        help="Proizvoljna oznaka mjerenja (npr. opis izmjene)"
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=BENCHMARKS_PATH,
+        help=f"JSONL fajl u koji se dopisuju rezultati (default: {BENCHMARKS_PATH})"
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Prikaži i ispis main.py tokom mjerenja"
+    )
+    config_arguments(parser)
+    parser.set_defaults(files=200)
+    args = parser.parse_args()
+
+    levels = [int(w) for w in args.workers.split(",") if w.strip()]
+    site, config = config_from_args(args)
+    scenario = {**describe(site, config), "delay": args.delay}
+
+    server = StandinServer(("127.0.0.1", 0), site, config)
+    server.start_in_thread()
+    print(f"Lokalni server: {server.listing_url} ({len(site.files)} PDF-ova, izvor: {site.source})")
+
+    commit = git_commit()
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        for workers in levels:
+            history = previous_runs(args.output, scenario, workers)
+            run = run_once(server, workers, args.delay, args.verbose)
+            record = {
+                "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "commit": commit,
+                "label": args.label,
+                "scenario": scenario,
+                **run,
+            }
+            with args.output.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+            if "error" in run:
+                print(f"  {workers:>3} niti: {run['error']}")
+                continue
+            line = (
+                f"  {workers:>3} niti: {run['downloaded']}/{run['found']} fajlova za {run['seconds']:.2f}s "
+                f"-> {run['files_per_s']:.1f} fajlova/s, {run['mb_per_s']:.2f} MB/s "
+                f"(neuspjelo {run['failed']}, ponovljeno {run['retries']})"
+            )
+            if history and history[-1].get("files_per_s"):
+                change = run["files_per_s"] / history[-1]["files_per_s"] - 1
+                line += f" [{change:+.0%} u odnosu na {history[-1].get('commit') or '?'}]"
+            print(line)
+    finally:
+        server.shutdown()
+        server.server_close()
+    print(f"Rezultati dopisani u {args.output}")
+
+
+if __name__ == "__main__":
+    main()
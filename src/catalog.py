@@ -0,0 +1,269 @@
+# src/catalog.py
+#
+# Katalog CSV bilansa: za svaki fajl šifra banke, period, tip izvještaja (bs/bu),
+# putanja, veličina, hash sadržaja i verzija formata CSV-a.
+# Katalog ažurira pipeline (pdf_to_csv.py, ili ručno: python src/catalog.py),
+# a aplikacija iz njega bira fajlove i periode bez obilaženja foldera.
+
+import hashlib
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from config import BANKE_CSV_FOLDER, CSV_OUTPUT_FOLDER
+    from dataset import report_date
+except ImportError:  # Uvezeno kao paket (npr. iz app.py)
+    from src.config import BANKE_CSV_FOLDER, CSV_OUTPUT_FOLDER
+    from src.dataset import report_date
+
+
+CATALOG_PATH = Path(CSV_OUTPUT_FOLDER) / "catalog.json"
+
+# Verzija formata samog kataloga; povećaj kada se promijene polja
+CATALOG_FORMAT = 1
+
+# Verzija formata CSV fajla: 1 = stari izvoz sa kolonom "R. br." (dataset.read_report
+# ga preskače), 2 = tabela sa kolonom IZNOS/AKTIVA ili bez zaglavlja iznosa
+SCHEMA_OLD = 1
+SCHEMA_CURRENT = 2
+
+ENTRY_FIELDS = ("bank", "report_type", "period", "size", "mtime_ns", "sha1", "schema")
+
+
+def _csv_schema(first_line: bytes) -> int:
+    return SCHEMA_OLD if b"R. br." in first_line else SCHEMA_CURRENT
+
+
+def _hash_and_schema(path: Path) -> Tuple[str, int]:
+    data = path.read_bytes()
+    return hashlib.sha1(data).hexdigest(), _csv_schema(data.split(b"\n", 1)[0])
+
+
+class Catalog:
+    """
+    entries: putanja relativna u odnosu na csv_folder (npr. "bs/ckb/0925ckb_bs.csv")
+    -> {bank, report_type, period (yyyymm), size, mtime_ns, sha1, schema}.
+    Za upite se drži i indeks (tip, banka) -> putanje sortirane po periodu.
+    """
+
+    def __init__(self, csv_folder: str = BANKE_CSV_FOLDER, path: Path = CATALOG_PATH):
+        self.csv_folder = csv_folder
+        self.path = Path(path)
+        self.entries: Dict[str, dict] = {}
+        self.updated_at: Optional[str] = None
+        # Fajlovi kojima je poslednji update() osvježio samo stat (isti sadržaj)
+        self.stat_refreshed = 0
+        self._by_bank: Dict[Tuple[str, str], List[str]] = {}
+        self._loaded_mtime_ns: Optional[int] = None
+
+    @classmethod
+    def load(cls, csv_folder: str = BANKE_CSV_FOLDER, path: Path = CATALOG_PATH) -> "Catalog":
+        """Učitava katalog sa diska; ako ga nema (ili je drugi format) vraća prazan."""
+        catalog = cls(csv_folder, path)
+        catalog._read()
+        return catalog
+
+    def _read(self):
+        self.entries = {}
+        self.updated_at = None
+        self._loaded_mtime_ns = None
+        if self.path.is_file():
+            self._loaded_mtime_ns = self.path.stat().st_mtime_ns
+            with self.path.open("r", encoding="utf-8") as f:
+                raw = json.load(f)
+            if raw.get("format") == CATALOG_FORMAT and raw.get("csv_folder") == self.csv_folder:
+                self.entries = {
+                    rel: dict(zip(ENTRY_FIELDS, values)) for rel, values in raw["files"].items()
+                }
+                self.updated_at = raw.get("updated_at")
+        self._reindex()
+
+    def _reindex(self):
+        by_bank: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+        for rel, entry in self.entries.items():
+            by_bank[(entry["report_type"], entry["bank"])].append(rel)
+        for rels in by_bank.values():
+            rels.sort(key=lambda rel: (self.entries[rel]["period"], rel))
+        self._by_bank = dict(by_bank)
+
+    def is_stale(self) -> bool:
+        """Da li je pipeline u međuvremenu prepisao fajl kataloga (jedan stat poziv)."""
+        try:
+            return self.path.stat().st_mtime_ns != self._loaded_mtime_ns
+        except OSError:
+            return False
+
+    def reloaded(self) -> "Catalog":
+        """
+        Novi objekat sa katalogom sa diska (npr. posle is_stale()). Ovaj objekat se
+        ne mijenja, pa ga čitaoci koji ga već drže mogu bezbjedno koristiti dalje.
+        """
+        return Catalog.load(self.csv_folder, self.path)
+
+    def save(self):
+        self.updated_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        raw = {
+            "format": CATALOG_FORMAT,
+            "csv_folder": self.csv_folder,
+            "updated_at": self.updated_at,
+            "fields": list(ENTRY_FIELDS),
+            "files": {
+                rel: [self.entries[rel][f] for f in ENTRY_FIELDS] for rel in sorted(self.entries)
+            },
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(raw, f, ensure_ascii=False, separators=(",", ":"))
+        tmp_path.replace(self.path)
+        self._loaded_mtime_ns = self.path.stat().st_mtime_ns
+
+    def update(self) -> Tuple[int, int]:
+        """
+        Sinhronizuje katalog sa folderom (<csv_folder>/<bs|bu>/<banka>/<mmyy...>.csv).
+        Hash se računa samo za nove fajlove i fajlove kojima su se promijenili
+        veličina ili mtime. Vraća (broj dodatih/izmijenjenih, broj uklonjenih);
+        fajlovi sa istim sadržajem a novim stat-om se broje u self.stat_refreshed
+        (katalog treba sačuvati, ali se verzije podataka ne mijenjaju).
+        """
+        root = Path(self.csv_folder)
+        seen = set()
+        changed = 0
+        self.stat_refreshed = 0
+        for csv_path in sorted(root.glob("*/*/*.csv")) if root.exists() else []:
+            date = report_date(csv_path.name)
+            if date is None:
+                continue
+            rel = csv_path.relative_to(root).as_posix()
+            report_type, bank = csv_path.relative_to(root).parts[:2]
+            seen.add(rel)
+            stat = csv_path.stat()
+            entry = self.entries.get(rel)
+            if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                continue
+            sha1, schema = _hash_and_schema(csv_path)
+            if entry is not None and entry["sha1"] == sha1:
+                # Isti sadržaj (npr. ponovo upisan fajl): samo osvježi stat
+                entry["size"], entry["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+                self.stat_refreshed += 1
+                continue
+            self.entries[rel] = {
+                "bank": bank,
+                "report_type": report_type,
+                "period": date.year * 100 + date.month,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha1": sha1,
+                "schema": schema,
+            }
+            changed += 1
+
+        removed = [rel for rel in self.entries if rel not in seen]
+        for rel in removed:
+            del self.entries[rel]
+        self._reindex()
+        return changed, len(removed)
+
+    def _rels(self, bank: str, report_type: str, min_year: Optional[int]) -> List[str]:
+        rels = self._by_bank.get((report_type, bank), [])
+        if min_year is None:
+            return rels
+        return [rel for rel in rels if self.entries[rel]["period"] >= min_year * 100]
+
+    def files(self, bank: str, report_type: str = "bs", min_year: Optional[int] = None) -> List[Path]:
+        """CSV fajlovi banke sortirani po periodu, bez pristupa disku."""
+        root = Path(self.csv_folder)
+        return [root / rel for rel in self._rels(bank, report_type, min_year)]
+
+    def entries_for(self, bank: str, report_type: str = "bs", min_year: Optional[int] = None) -> List[Tuple[Path, dict]]:
+        root = Path(self.csv_folder)
+        return [(root / rel, self.entries[rel]) for rel in self._rels(bank, report_type, min_year)]
+
+    def periods(self, bank: str, report_type: str = "bs") -> List[int]:
+        return sorted({self.entries[rel]["period"] for rel in self._rels(bank, report_type, None)})
+
+    def banks(self, report_type: str = "bs") -> List[str]:
+        return sorted(bank for rt, bank in self._by_bank if rt == report_type)
+
+    def data_version(self, bank: str, report_type: str = "bs", min_year: Optional[int] = None) -> str:
+        """Verzija podataka banke iz hash-eva sadržaja (mijenja se samo kada se sadržaj promijeni)."""
+        digest = hashlib.sha1()
+        for rel in self._rels(bank, report_type, min_year):
+            digest.update(f"{rel}:{self.entries[rel]['sha1']};".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def bank_versions(self, report_type: str = "bs", min_year: Optional[int] = None) -> Dict[str, str]:
+        """Verzija podataka za svaku banku iz kataloga (za poređenje prije i posle ažuriranja)."""
+        return {bank: self.data_version(bank, report_type, min_year) for bank in self.banks(report_type)}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def load_or_build_catalog(csv_folder: str = BANKE_CSV_FOLDER, path: Path = CATALOG_PATH) -> Catalog:
+    """Učitava katalog; ako ga još nema, napravi ga jednom iz foldera i sačuvaj."""
+    catalog = Catalog.load(csv_folder, path)
+    if not catalog.entries:
+        catalog.update()
+        catalog.save()
+    return catalog
+
+
+def update_catalog(csv_folder: str = BANKE_CSV_FOLDER, path: Path = CATALOG_PATH) -> Catalog:
+    """
+    Dopunjava katalog posle promjena u CSV fajlovima; čuva ga samo ako je bilo promjena.
+    Osvježen stat (npr. ponovo upisan fajl istog sadržaja) se takođe čuva, inače bi se
+    takav fajl ponovo hash-ovao pri svakom učitavanju.
+    """
+    catalog = Catalog.load(csv_folder, path)
+    changed, removed = catalog.update()
+    if changed or removed or catalog.stat_refreshed or not catalog.path.is_file():
+        catalog.save()
+    print(
+        f"Katalog: {changed} novih/izmijenjenih, {removed} uklonjenih, "
+        f"{catalog.stat_refreshed} osvježenih (isti sadržaj), ukupno {len(catalog)} fajlova ({catalog.path})"
+    )
+    return catalog
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Ažurira katalog CSV bilansa (banka, period, tip, hash, verzija formata)"
+    )
+    parser.add_argument(
+        "--csv-folder",
+        type=str,
+        default=BANKE_CSV_FOLDER,
+        help=f"Folder sa CSV bilansima (default: {BANKE_CSV_FOLDER})"
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Zanemari postojeći katalog i izračunaj hash-eve svih fajlova ponovo"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.rebuild:
+        catalog = Catalog(args.csv_folder)
+        catalog.update()
+        catalog.save()
+        print(f"Katalog: {len(catalog)} fajlova ({catalog.path})")
+    else:
+        catalog = update_catalog(args.csv_folder)
+    print(f"Trajanje: {time.perf_counter() - start:.2f}s")
+
+    for report_type in ("bs", "bu"):
+        for bank in catalog.banks(report_type):
+            periods = catalog.periods(bank, report_type)
+            old = sum(1 for _, e in catalog.entries_for(bank, report_type) if e["schema"] == SCHEMA_OLD)
+            print(f"  {report_type}/{bank}: {len(periods)} perioda ({periods[0]}-{periods[-1]}), stari format: {old}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# src/charts.py
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Sequence
+
+import pandas as pd
+
+try:
+    import plotly.graph_objects as go
+except ImportError:  # Plotly nije instaliran; app.py tada koristi st.bar_chart
+    go = None  # type: ignore[assignment]
+
+
+# Redosled i boje kategorija za prvi grafikon (Aktiva / Obaveze / Kapital)
+CATEGORY_ORDER = ['Aktiva', 'Obaveze', 'Kapital']
+CATEGORY_COLORS = {'Aktiva': '#1f77b4', 'Obaveze': '#ff7f0e', 'Kapital': '#2ca02c'}
+
+# Redosled i boje kategorija za drugi grafikon (krediti, HoV, depoziti)
+CATEGORY_ORDER_2 = ['Krediti klijenata', 'Hartije od vrijednosti', 'Depoziti klijenata']
+CATEGORY_COLORS_2 = {
+    'Krediti klijenata': '#1f77b4',
+    'Hartije od vrijednosti': '#ff7f0e',
+    'Depoziti klijenata': '#2ca02c',
+}
+
+
+class FigureCache:
+    """
+    LRU keš za gotove Plotly figure.
+    Ključ je tuple (grafikon, banka, samo kraj godine, izabrane kategorije, verzija podataka),
+    pa se figura gradi samo kada se neki od tih parametara promijeni.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], object]) -> object:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        # Gradi van lock-a da paralelne sesije ne čekaju jedna drugu
+        value = builder()
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def invalidate(self, bank: str) -> int:
+        """Izbacuje figure jedne banke (npr. kada stigne novi kvartal); vraća broj izbačenih."""
+        with self._lock:
+            keys = [key for key in self._entries if isinstance(key, tuple) and len(key) > 1 and key[1] == bank]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Jedan keš po procesu - dijele ga sve Streamlit sesije i svi rerun-ovi
+figure_cache = FigureCache()
+
+
+def figure_key(
+    chart: str,
+    bank: str,
+    only_year_end: bool,
+    selected_categories: Sequence[str],
+    data_version: str,
+) -> tuple:
+    """Pravi ključ za keš; redosled izabranih kategorija ne utiče na figuru."""
+    return (chart, bank, only_year_end, tuple(sorted(selected_categories)), data_version)
+
+
+def prepare_chart_frame(
+    df_chart_source: pd.DataFrame,
+    selected_categories: Sequence[str],
+) -> pd.DataFrame:
+    """
+    Filtrira agregirane podatke po izabranim kategorijama i priprema kolone za grafikon
+    (Amount_in_thousands kao ceo broj, sortirano po datumu i kategoriji).
+    """
+    if selected_categories:
+        df_chart = df_chart_source[df_chart_source['Kategorija'].isin(selected_categories)].copy()
+    else:
+        df_chart = df_chart_source.copy()
+
+    # Konvertuj Amount u numerički tip (ukloni zareze i druge karaktere ako postoje)
+    # Napomena: Amount je već u hiljadama u CSV-u
+    if df_chart['Amount'].dtype == 'object':
+        df_chart['Amount'] = df_chart['Amount'].astype(str).str.replace(',', '').astype(float)
+    else:
+        df_chart['Amount'] = pd.to_numeric(df_chart['Amount'], errors='coerce').fillna(0)
+
+    # Amount je već u hiljadama u CSV-u, samo ga konvertuj u ceo broj
+    df_chart['Amount_in_thousands'] = df_chart['Amount'].astype(int)
+
+    # Osiguraj da balance_date je datetime tip
+    if df_chart['balance_date'].dtype != 'datetime64[ns]':
+        df_chart['balance_date'] = pd.to_datetime(df_chart['balance_date'])
+
+    return df_chart.sort_values(['balance_date', 'Kategorija']).reset_index(drop=True)
+
+
+def build_category_figure(
+    df_chart: pd.DataFrame,
+    selected_categories: Sequence[str],
+    category_order: List[str],
+    colors: Dict[str, str],
+    title: str,
+    group_traces: bool = False,
+):
+    """
+    Pravi grouped bar chart (datum na X osi, jedna serija po kategoriji).
+    df_chart treba da bude rezultat prepare_chart_frame.
+    """
+    if go is None:
+        raise ImportError("plotly nije instaliran. Pokreni 'pip install plotly'")
+
+    # Konvertuj datum u string za bolje prikazivanje
+    datum_str = df_chart['balance_date'].dt.strftime('%d.%m.%Y')
+
+    fig = go.Figure()
+
+    # Filtriraj category_order da uključi samo izabrane kategorije
+    filtered_category_order = (
+        [cat for cat in category_order if cat in selected_categories]
+        if selected_categories else category_order
+    )
+
+    for kategorija in filtered_category_order:
+        mask = df_chart['Kategorija'] == kategorija
+        if not mask.any():
+            continue
+        # df_chart je već sortiran po datumu, pa nije potrebno ponovno sortiranje
+        trace_kwargs = {}
+        if group_traces:
+            trace_kwargs = {'offsetgroup': kategorija, 'legendgroup': kategorija}
+        fig.add_trace(go.Bar(
+            x=datum_str[mask],
+            y=df_chart.loc[mask, 'Amount_in_thousands'],
+            name=kategorija,
+            marker_color=colors.get(kategorija, '#808080'),  # Siva ako kategorija nema definisanu boju
+            **trace_kwargs
+        ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title='Datum',
+        yaxis_title='Iznos (u hiljadama)',
+        barmode='group',  # Ovo je ključno - grupiše barove jedan pored drugog
+        xaxis=dict(tickangle=-45),
+        height=500,
+        showlegend=True
+    )
+    return fig
+
+
+def build_ratio_pivot(ratio_source: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Računa K/D odnos po datumu iz agregiranih kredita i depozita.
+    Vraća None ako u podacima nema i kredita i depozita.
+    """
+    ratio_source = ratio_source.copy()
+    if ratio_source['Amount'].dtype == 'object':
+        ratio_source['Amount'] = ratio_source['Amount'].astype(str).str.replace(',', '').astype(float)
+    else:
+        ratio_source['Amount'] = pd.to_numeric(ratio_source['Amount'], errors='coerce').fillna(0)
+    ratio_source['Amount_in_thousands'] = ratio_source['Amount'].astype(int)
+
+    ratio_pivot = ratio_source.pivot_table(
+        index='balance_date',
+        columns='Kategorija',
+        values='Amount_in_thousands',
+        aggfunc='sum'
+    ).fillna(0)
+    ratio_pivot = ratio_pivot.sort_index()
+
+    if not {'Krediti klijenata', 'Depoziti klijenata'}.issubset(ratio_pivot.columns):
+        return None
+
+    ratio_pivot['K/D odnos'] = ratio_pivot['Krediti klijenata'] / ratio_pivot['Depoziti klijenata'].replace({0: pd.NA})
+    return ratio_pivot.dropna(subset=['K/D odnos'])
+
+
+def build_ratio_figure(ratio_pivot: pd.DataFrame):
+    """Pravi bar chart K/D odnosa u procentima."""
+    if go is None:
+        raise ImportError("plotly nije instaliran. Pokreni 'pip install plotly'")
+
+    datum_str = ratio_pivot.index.strftime('%d.%m.%Y')
+    ratio_pct = (ratio_pivot['K/D odnos'].astype(float) * 100).round(2)
+
+    fig_ratio = go.Figure(
+        data=[
+            go.Bar(
+                x=datum_str,
+                y=ratio_pct,
+                text=ratio_pct.astype(str) + '%',
+                textposition='outside',
+                width=0.6
+            )
+        ]
+    )
+
+    fig_ratio.update_layout(
+        title='Odnos kredita i depozita (K/D) u %',
+        xaxis_title='Datum',
+        yaxis_title='K/D (%)',
+        yaxis=dict(ticksuffix='%', tickformat='.2f'),
+        height=400,
+        bargap=0.3
+    )
+    fig_ratio.update_traces(
+        hovertemplate='Datum: %{x}<br>K/D: %{y:.2f}%<extra></extra>'
+    )
+    return fig_ratio
@@ -7,6 +7,76 @@ BASE_URL_STRANICE = "https://www.cbcg.me/me/kljucne-funkcije/kontrolna-funkcija/
 # Folder gde čuvamo preuzete fajlove
 DOWNLOAD_FOLDER = "data/bankecg_izvestaji"
 
+# Keš HTML stranica (lista PDF-ova) i koliko dugo (u sekundama) je keširana stranica svježa
+HTTP_CACHE_FOLDER = "data/http_cache"
+HTTP_CACHE_TTL = 6 * 60 * 60
+
+# Koliko često (u sekundama) watch.py provjerava listu PDF-ova na sajtu CBCG
+WATCH_INTERVAL = 30 * 60
+
+# Između punih provjera liste watch.py samo proba URL-ove očekivanih sledećih
+# kvartala (vidi probe.py); puna provjera je svaki ovoliki ciklus (0 = uvijek)
+WATCH_RECONCILE_EVERY = 12
+
+# Koliko često (u sekundama) otvorena aplikacija provjerava da li su objavljeni novi podaci
+APP_REFRESH_SECONDS = 60
+
 # Opcioni lokalni CA bundle (putanja do .pem fajla sa sertifikatom)
 # Ako fajl ne postoji, koristi se podrazumevani certifi bundle.
-CUSTOM_CA_BUNDLE = "certs/custom-ca.pem"
\ No newline at end of file
+CUSTOM_CA_BUNDLE = "certs/custom-ca.pem"
+# Folder gde pdf_to_csv čuva konvertovane CSV fajlove
+CSV_OUTPUT_FOLDER = "data/csv_output"
+
+# Izvještaji profilisanja (--profile u main.py i pdf_to_csv.py, vidi profiling.py)
+PROFILE_FOLDER = "data/profiles"
+
+# Statički izvještaji (HTML/PNG grafikoni po banci, vidi static_reports.py)
+REPORTS_FOLDER = "data/reports"
+
+# Rezultati mjerenja performansi (benchmark_crawl.py, app_load_test.py), jedan JSON po liniji
+BENCHMARKS_FILE = "data/benchmarks.jsonl"
+
+# Dnevnici pokretanja preuzimanja i konverzije, za nastavak prekinutog pokretanja (vidi journal.py)
+RUN_JOURNAL_FOLDER = "data/journal"
+
+# PDF fajlovi čija je konverzija zaglavila ili srušila radni proces (vidi quarantine.py)
+QUARANTINE_FILE = "data/pdf_quarantine.json"
+
+# Sirove tabele izvučene iz PDF-ova, prije čišćenja (vidi extraction_cache.py)
+EXTRACTION_CACHE_FOLDER = "data/extraction_cache"
+
+# Folder sa CSV bilansima po bankama (bs = bilans stanja, bu = bilans uspjeha)
+BANKE_CSV_FOLDER = CSV_OUTPUT_FOLDER + "/slike_i_fajlovi/fajlovi/fajlovi_kontrola_banaka/pokazatelji/banke"
+
+# Šifra banke (ime foldera na sajtu CBCG) -> naziv banke
+BANKE = {
+    "nik": "Prva banka CG",
+    "ckb": "Crnogorska komercijalna banka",
+    "mnb": "NLB Montenegro banka",
+    "ffb": "Universal Capital banka",
+    "hip": "Hipotekarna banka",
+    "azm": "Adriatic banka",
+    "hyp": "Addiko banka",
+    "lov": "Lovćen banka",
+    "opp": "Erste banka",
+    "zap": "Zapadna banka",
+    "zir": "Ziraat banka",
+}
+
+# Redosled obrade novih fajlova (vidi priority.py): prvo najnoviji period, pa u okviru
+# perioda banke sa većim brojem. Brojevi prate veličinu banke (ukupna aktiva na
+# 30.09.2025, najveća prvo), pa se posle objave prvo vide banke sa najvećim udjelom
+# u sektoru. Banke kojih nema ovdje (npr. one koje više ne postoje) dolaze poslednje.
+BANK_PRIORITY = {
+    "ckb": 11,
+    "hip": 10,
+    "mnb": 9,
+    "opp": 8,
+    "zap": 7,
+    "azm": 6,
+    "nik": 5,
+    "lov": 4,
+    "ffb": 3,
+    "hyp": 2,
+    "zir": 1,
+}
@@ -0,0 +1,303 @@
+# src/cube.py
+#
+# Gusti niz iznosa banka × period × pozicija za analize preko cijelog sektora.
+# Umjesto filtriranja DataFrame-a po nazivu pozicije (string poređenje po svim
+# redovima), pozicija, banka i period su indeksi u NumPy nizu, pa je npr.
+# "depoziti svih banaka kroz vrijeme" samo isječak values[:, :, pozicija].
+#
+# Niz se čuva kao .npy i otvara sa mmap: učitavanje je trenutno u svakom procesu,
+# isječci su pogledi (bez kopiranja) na stranice fajla koje OS dijeli između procesa.
+# Oznake osa (banke, periodi yyyymm, pozicije [tip, naziv]) su u cube.json.
+# Nedostajući iznos (banka nije postojala, pozicija nije u izvještaju) je NaN.
+#
+# Pozicija je ključ po nazivu bez šifre (vidi canonical_position): šifre se
+# mijenjaju između formata izvještaja (npr. "20. Depoziti klijenata" do 2017,
+# "17.b." / "18.b." / "19.b." od 2018), pa bi ključ sa šifrom presjekao seriju.
+# Redovi istog izvještaja sa istim nazivom se sabiraju; šifre su u posebnoj tabeli.
+#
+#   python src/cube.py --build
+#   python src/cube.py "17.b. Depoziti klijenata"
+
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from catalog import Catalog, load_or_build_catalog
+    from config import BANKE, CSV_OUTPUT_FOLDER
+    from dataset import read_report, split_position
+except ImportError:  # Uvezeno kao paket (npr. iz app.py)
+    from src.catalog import Catalog, load_or_build_catalog
+    from src.config import BANKE, CSV_OUTPUT_FOLDER
+    from src.dataset import read_report, split_position
+
+
+CUBE_FOLDER = Path(CSV_OUTPUT_FOLDER) / "cube"
+CUBE_META = "cube.json"
+
+# Verzija formata; povećaj kada se promijene ose ili tip niza
+CUBE_FORMAT = 2
+
+Position = Tuple[str, str]  # (bs|bu, naziv pozicije)
+
+# Nazivi koji se razlikuju između formata izvještaja (ili imaju grešku u kucanju),
+# a označavaju istu poziciju. Ključ je (tip, naziv bez šifre) ili (tip, cijela
+# oznaka) kada isti naziv u istom izvještaju znači različite pozicije.
+POSITION_ALIASES: Dict[Position, str] = {
+    ("bs", "Nerasporedjena dobit"): "Nerasporedena dobit",
+    ("bs", "Investicione nekretnine/nepokretnosti"): "Investicione nekretnine",
+    # Na strani obaveza "Hartije od vrijednosti" su izdate hartije, ne ulaganja (2.c.-5.c.)
+    ("bs", "17.e. Hartije od vrijednosti"): "Izdate duznicke hartije od vrijednosti",
+    ("bs", "18.e. Hartije od vrijednosti"): "Izdate duznicke hartije od vrijednosti",
+    ("bu", "Rahodi naknada i provizija"): "Rashodi naknada i provizija",
+}
+
+# Formula na kraju zbirne pozicije zavisi od numeracije formata:
+# "UKUPAN KAPITAL: (29. do 34.)", "NETO PROFIT/GUBITAK (III - 21)", "... : I+II+6+7"
+_FORMULA_RE = re.compile(r"\s*(?:\((?:[\dIVX.+\-\s]|do)+\)|:\s*[\dIVX+\-\s]+)$")
+
+
+def canonical_position(label: str, report_type: str = "bs") -> str:
+    """
+    Naziv pozicije bez šifre i formule, isti u svim formatima izvještaja:
+    "17.b. Depoziti klijenata" i "20. Depoziti klijenata" -> "Depoziti klijenata".
+    Oznaka bez naziva (stari bilansi uspjeha: "I.", "PR 1.") ostaje kakva jeste.
+    """
+    alias = POSITION_ALIASES.get((report_type, label))
+    if alias is not None:
+        return alias
+    _, name = split_position(label)
+    if not name:
+        return label
+    name = _FORMULA_RE.sub("", name).rstrip(" :")
+    return POSITION_ALIASES.get((report_type, name), name)
+
+
+def catalog_version(catalog: Catalog) -> str:
+    """Verzija svih podataka u katalogu (mijenja se samo kada se sadržaj nekog CSV-a promijeni)."""
+    digest = hashlib.sha1()
+    for rel in sorted(catalog.entries):
+        digest.update(f"{rel}:{catalog.entries[rel]['sha1']};".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class Cube:
+    """
+    values[banka, period, pozicija] (float64, memory-mapped, samo za čitanje)
+    sa mapama oznaka -> indeks za sve tri ose i šiframa pod kojima se svaka
+    pozicija pojavljivala u izvještajima (position_codes, paralelno sa positions).
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        banks: List[str],
+        periods: List[int],
+        positions: List[Position],
+        data_version: str,
+        position_codes: Optional[List[List[str]]] = None,
+    ):
+        self.values = values
+        self.banks = banks
+        self.periods = periods
+        self.positions = positions
+        self.data_version = data_version
+        self.position_codes = position_codes or [[] for _ in positions]
+        self.bank_index: Dict[str, int] = {bank: i for i, bank in enumerate(banks)}
+        self.period_index: Dict[int, int] = {period: i for i, period in enumerate(periods)}
+        self.position_index: Dict[Position, int] = {position: i for i, position in enumerate(positions)}
+
+    @classmethod
+    def load(cls, folder: Path = CUBE_FOLDER) -> Optional["Cube"]:
+        """Otvara niz sa diska (mmap, bez čitanja podataka); None ako ga nema ili je drugi format."""
+        meta_path = Path(folder) / CUBE_META
+        if not meta_path.is_file():
+            return None
+        with meta_path.open("r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != CUBE_FORMAT:
+            return None
+        values = np.load(Path(folder) / meta["values"], mmap_mode="r")
+        positions = [tuple(position) for position in meta["positions"]]
+        return cls(values, meta["banks"], meta["periods"], positions, meta["data_version"], meta["position_codes"])
+
+    def position_id(self, label: str, report_type: str = "bs") -> int:
+        """Indeks pozicije; label može biti naziv ili oznaka sa šifrom bilo kog formata."""
+        try:
+            return self.position_index[(report_type, canonical_position(label, report_type))]
+        except KeyError:
+            raise KeyError(f"Pozicija nije u nizu: {report_type}/{label}") from None
+
+    def codes(self, label: str, report_type: str = "bs") -> List[str]:
+        """Šifre pod kojima se pozicija pojavljivala (npr. ["17.b.", "18.b.", "19.b.", "20."])."""
+        return self.position_codes[self.position_id(label, report_type)]
+
+    def get(self, bank: str, period: int, label: str, report_type: str = "bs") -> Optional[float]:
+        """Jedan iznos (u hiljadama) ili None ako ga nema."""
+        value = self.values[self.bank_index[bank], self.period_index[period], self.position_id(label, report_type)]
+        return None if np.isnan(value) else float(value)
+
+    def position_slice(self, label: str, report_type: str = "bs") -> np.ndarray:
+        """Iznosi pozicije za sve banke i periode (banka × period); pogled bez kopiranja."""
+        return self.values[:, :, self.position_id(label, report_type)]
+
+    def bank_slice(self, bank: str) -> np.ndarray:
+        """Sve pozicije jedne banke kroz vrijeme (period × pozicija); pogled bez kopiranja."""
+        return self.values[self.bank_index[bank]]
+
+    def position_frame(self, label: str, report_type: str = "bs", banks: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Pozicija kao tabela: redovi su datumi bilansa, kolone banke.
+        Bez banks koristi cijeli isječak bez kopiranja; periodi u kojima nijedna banka nema iznos se izostavljaju.
+        """
+        data = self.position_slice(label, report_type)
+        columns = list(self.banks)
+        if banks is not None:
+            rows = [self.bank_index[bank] for bank in banks]
+            data, columns = data[rows], list(banks)
+        dates = pd.to_datetime([str(p) for p in self.periods], format="%Y%m") + pd.offsets.MonthEnd(0)
+        frame = pd.DataFrame(data.T, index=dates, columns=columns, copy=False)
+        frame.index.name = "balance_date"
+        return frame.dropna(how="all")
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.values.shape
+
+
+def build_cube(catalog: Catalog, folder: Path = CUBE_FOLDER) -> Cube:
+    """
+    Pravi niz iz svih CSV-ova u katalogu i upisuje ga u folder.
+    Novi niz se upisuje pod novim imenom, a cube.json se zamjenjuje atomski, pa
+    procesi koji imaju otvoren stari niz nastavljaju da ga čitaju bez greške.
+    """
+    folder = Path(folder)
+    data_version = catalog_version(catalog)
+
+    # Prvo pročitaj izvještaje da bi ose (posebno pozicije) bile poznate unaprijed
+    # (banka, period, tip) -> oznaka -> iznos; izvještaj može biti u više CSV-ova (_table_N)
+    reports: Dict[Tuple[str, int, str], Dict[str, Optional[int]]] = {}
+    codes_seen: Dict[Position, set] = {}
+    root = Path(catalog.csv_folder)
+    for rel, entry in sorted(catalog.entries.items()):
+        rows = read_report(root / rel)
+        if not rows:
+            continue
+        report_type = entry["report_type"]
+        report = reports.setdefault((entry["bank"], entry["period"], report_type), {})
+        for label, amount in rows:
+            if not label or "(cid:" in label:
+                continue
+            # Ponovljena oznaka u istom izvještaju: zadrži prvi iznos
+            report.setdefault(label, amount)
+            position = (report_type, canonical_position(label, report_type))
+            codes_seen.setdefault(position, set()).add(split_position(label)[0])
+
+    # Banke redom iz BANKE, pa ostale (npr. banke koje više ne postoje)
+    found_banks = {bank for bank, _, _ in reports}
+    banks = [bank for bank in BANKE if bank in found_banks] + sorted(found_banks - set(BANKE))
+    periods = sorted({period for _, period, _ in reports})
+    positions = sorted(codes_seen)
+    bank_index = {bank: i for i, bank in enumerate(banks)}
+    period_index = {period: i for i, period in enumerate(periods)}
+    position_index = {position: i for i, position in enumerate(positions)}
+
+    values = np.full((len(banks), len(periods), len(positions)), np.nan, dtype=np.float64)
+    for (bank, period, report_type), report in reports.items():
+        b, p = bank_index[bank], period_index[period]
+        for label, amount in report.items():
+            if amount is None:
+                continue
+            k = position_index[(report_type, canonical_position(label, report_type))]
+            # Više oznaka sa istim nazivom (npr. depoziti klijenata po amortizovanoj i
+            # fer vrijednosti) se sabira u jednu poziciju, kao u starom formatu
+            values[b, p, k] = amount if np.isnan(values[b, p, k]) else values[b, p, k] + amount
+
+    folder.mkdir(parents=True, exist_ok=True)
+    values_name = f"values-{data_version}.npy"
+    tmp_values = folder / (values_name + ".tmp")
+    with tmp_values.open("wb") as f:
+        np.save(f, values)
+    tmp_values.replace(folder / values_name)
+
+    meta = {
+        "format": CUBE_FORMAT,
+        "data_version": data_version,
+        "built_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "values": values_name,
+        "shape": list(values.shape),
+        "banks": banks,
+        "periods": periods,
+        "positions": [list(position) for position in positions],
+        "position_codes": [sorted(code for code in codes_seen[position] if code) for position in positions],
+    }
+    tmp_meta = folder / (CUBE_META + ".tmp")
+    with tmp_meta.open("w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    tmp_meta.replace(folder / CUBE_META)
+
+    # Stari nizovi više nisu u cube.json; otvoreni mmap-ovi ostaju važeći i posle brisanja
+    for old in folder.glob("values-*.npy"):
+        if old.name != values_name:
+            old.unlink(missing_ok=True)
+    return Cube.load(folder)
+
+
+def update_cube(catalog: Optional[Catalog] = None, folder: Path = CUBE_FOLDER) -> Cube:
+    """Vraća niz sa diska ako odgovara katalogu, inače ga pravi ponovo."""
+    catalog = catalog or load_or_build_catalog()
+    cube = Cube.load(folder)
+    if cube is not None and cube.data_version == catalog_version(catalog):
+        return cube
+    start = time.perf_counter()
+    cube = build_cube(catalog, folder)
+    print(f"Niz banka × period × pozicija {cube.shape} napravljen za {time.perf_counter() - start:.2f}s ({folder})")
+    return cube
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Gusti niz iznosa banka × period × pozicija (memory-mapped) za analize sektora"
+    )
+    parser.add_argument("position", nargs="?", help='Pozicija za prikaz (npr. "17.b. Depoziti klijenata")')
+    parser.add_argument(
+        "--report-type",
+        type=str,
+        default="bs",
+        choices=["bs", "bu"],
+        help="Tip izvještaja pozicije (default: bs)"
+    )
+    parser.add_argument(
+        "--build",
+        action="store_true",
+        help="Napravi niz ponovo iz CSV fajlova"
+    )
+    args = parser.parse_args()
+
+    catalog = load_or_build_catalog()
+    cube = build_cube(catalog) if args.build else update_cube(catalog)
+    print(
+        f"Niz: {len(cube.banks)} banaka × {len(cube.periods)} perioda × {len(cube.positions)} pozicija "
+        f"({cube.values.nbytes / (1024 * 1024):.1f} MB, verzija {cube.data_version})"
+    )
+
+    if args.position:
+        start = time.perf_counter()
+        opened = Cube.load()
+        frame = opened.position_frame(args.position, args.report_type)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        codes = ", ".join(opened.codes(args.position, args.report_type)) or "-"
+        print(f"\n{args.report_type}/{canonical_position(args.position, args.report_type)} (šifre: {codes}; otvaranje niza i isječak: {elapsed_ms:.1f} ms)")
+        print(frame.tail(8).to_string(float_format=lambda v: f"{v:,.0f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+# src/dataset.py
+
+import csv
+import hashlib
+import re
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    from config import BANKE, BANKE_CSV_FOLDER
+except ImportError:  # Uvezeno kao paket (npr. iz app.py)
+    from src.config import BANKE, BANKE_CSV_FOLDER
+
+
+# Redosled encoding-a koje pokušavamo pri čitanju CSV-a
+ENCODINGS = ["utf-8", "utf-8-sig", "cp1252", "latin-1"]
+
+# Redovi koji su samo naslovi sekcija u bilansu stanja (npr. "Obaveze,IZNOS")
+SECTION_HEADERS = {"Aktiva", "Obaveze", "Kapital"}
+
+# Kolone u kojima se nalaze iznosi; prioritet: IZNOS > AKTIVA
+AMOUNT_COLUMNS = ("IZNOS", "AKTIVA")
+
+# Kolone spojenog DataFrame-a
+COLUMNS = ["Pozicija", "Amount", "f_source", "balance_date"]
+
+# Šifra pozicije na početku naziva: "2.", "2.a.", "17.b.", "I.", "PR 1."
+_POSITION_CODE_RE = re.compile(r"^((?:PR\s+)?(?:\d+\.(?:[a-z]\.)?|[IVXLC]+\.))(?!\d)\s*(.*)$")
+
+
+def compute_data_version(csv_files: Iterable[Path]) -> str:
+    """
+    Računa verziju podataka iz imena, veličine i vremena izmjene fajlova.
+    Mijenja se čim se neki CSV doda, obriše ili prepiše.
+    """
+    digest = hashlib.sha1()
+    for f in sorted(csv_files):
+        stat = f.stat()
+        digest.update(f"{f.name}:{stat.st_size}:{stat.st_mtime_ns};".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def parse_amount(value: Optional[str]) -> Optional[int]:
+    """Pretvara iznos iz CSV-a ("1,916,315", "83318", "") u ceo broj ili None."""
+    if value is None:
+        return None
+    value = value.strip().replace(",", "")
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return int(round(float(value)))
+        except ValueError:
+            return None
+
+
+def split_position(label: str) -> Tuple[str, str]:
+    """
+    Razdvaja šifru pozicije od naziva:
+    "2.a. Krediti i potrazivanja od banaka" -> ("2.a.", "Krediti i potrazivanja od banaka").
+    Ako naziv nema šifru, vraća ("", naziv).
+    """
+    match = _POSITION_CODE_RE.match(label)
+    if match is None:
+        return "", label
+    return match.group(1), match.group(2)
+
+
+def report_date(file_name: str) -> Optional[pd.Timestamp]:
+    """
+    Vraća datum bilansa (kraj mjeseca) iz imena fajla u formatu mmyy*
+    (npr. 0925ckb_bs.csv -> 2025-09-30). None ako ime nije u tom formatu.
+    """
+    if len(file_name) < 4 or not file_name[:4].isdigit():
+        return None
+    month = int(file_name[:2])
+    year = 2000 + int(file_name[2:4])
+    if not 1 <= month <= 12:
+        return None
+    return pd.Timestamp(year=year, month=month, day=1) + pd.offsets.MonthEnd(0)
+
+
+def _read_rows(csv_path: Path) -> List[List[str]]:
+    for encoding in ENCODINGS:
+        try:
+            with open(csv_path, newline="", encoding=encoding) as f:
+                return list(csv.reader(f))
+        except UnicodeDecodeError:
+            continue
+    return []
+
+
+def skipped_reports(csv_files: Iterable[Path]) -> List[Tuple[Path, str]]:
+    """
+    Fajlovi koje read_report preskače, sa razlogom (stari format sa "R. br." ili
+    prazan/nečitljiv fajl). Čita se samo zaglavlje.
+    """
+    skipped = []
+    for csv_path in csv_files:
+        header = None
+        for encoding in ENCODINGS:
+            try:
+                with open(csv_path, newline="", encoding=encoding) as f:
+                    header = next(csv.reader(f), None)
+                break
+            except UnicodeDecodeError:
+                continue
+        if not header:
+            skipped.append((csv_path, "prazan ili nečitljiv fajl"))
+        elif "R. br." in header:
+            skipped.append((csv_path, 'stari format (kolona "R. br."), nije provjeren'))
+    return skipped
+
+
+def read_report(csv_path: Path) -> Optional[List[Tuple[str, Optional[int]]]]:
+    """
+    Čita jedan CSV bilans i vraća listu (pozicija, iznos).
+    Fajlovi u starom formatu (sa kolonom "R. br.") se preskaču i vraća se None.
+    """
+    rows = _read_rows(csv_path)
+    if not rows:
+        return None
+
+    header = rows[0]
+    if "R. br." in header:
+        return None
+
+    amount_idx = None
+    for name in AMOUNT_COLUMNS:
+        if name in header:
+            amount_idx = header.index(name)
+            break
+    if amount_idx is None:
+        amount_idx = 1 if len(header) > 1 else None
+
+    result: List[Tuple[str, Optional[int]]] = []
+    for row in rows[1:]:
+        if not row:
+            continue
+        label = row[0]
+        # Ukloni sekcijske headere (Aktiva, Obaveze, Kapital) koji se pojavljuju kao redovi
+        if label in SECTION_HEADERS:
+            continue
+        amount = None
+        if amount_idx is not None and amount_idx < len(row):
+            amount = parse_amount(row[amount_idx])
+        result.append((label, amount))
+    return result
+
+
+def load_bank_frame(csv_files: Iterable[Path], min_year: Optional[int] = None) -> pd.DataFrame:
+    """
+    Učitava CSV bilanse jedne (ili više) banaka u jedan kompaktan DataFrame:
+    - Pozicija i f_source kao kategorije (svaki naziv se čuva samo jednom),
+    - Amount kao nullable Int64 (prazne ćelije su <NA>, ne 0),
+    - balance_date kao datetime64 (kraj mjeseca iz imena fajla).
+    """
+    reports = []
+    for csv_path in sorted(csv_files, key=lambda p: p.name):
+        csv_path = Path(csv_path)
+        date = report_date(csv_path.name)
+        if date is None:
+            continue
+        if min_year is not None and date.year < min_year:
+            continue
+
+        rows = read_report(csv_path)
+        if rows:
+            reports.append((csv_path.name, date, rows))
+    return frame_from_reports(reports)
+
+
+def frame_from_reports(reports: Iterable[Tuple[str, pd.Timestamp, List[Tuple[str, Optional[int]]]]]) -> pd.DataFrame:
+    """
+    DataFrame kao iz load_bank_frame, iz već pročitanih izvještaja
+    (ime fajla, datum bilansa, redovi (pozicija, iznos)), redom kojim su dati.
+    """
+    labels: List[str] = []
+    amounts: List[Optional[int]] = []
+    source_codes: List[int] = []
+    source_names: List[str] = []
+    source_dates: List[pd.Timestamp] = []
+
+    for name, date, rows in reports:
+        code = len(source_names)
+        source_names.append(name)
+        source_dates.append(date)
+        for label, amount in rows:
+            labels.append(label)
+            amounts.append(amount)
+            source_codes.append(code)
+
+    if not source_names:
+        return empty_frame()
+
+    # Isto ime fajla se može pojaviti u više foldera; kategorije moraju biti jedinstvene
+    unique_names = sorted(set(source_names))
+    name_to_code = {name: i for i, name in enumerate(unique_names)}
+    name_codes = [name_to_code[name] for name in source_names]
+
+    return pd.DataFrame({
+        "Pozicija": pd.Categorical(labels),
+        "Amount": pd.array(amounts, dtype="Int64"),
+        "f_source": pd.Categorical.from_codes(
+            [name_codes[c] for c in source_codes], categories=unique_names
+        ),
+        "balance_date": pd.DatetimeIndex(source_dates).take(source_codes).astype("datetime64[ns]"),
+    }, columns=COLUMNS)
+
+
+def empty_frame() -> pd.DataFrame:
+    """Prazan DataFrame sa istim kolonama i tipovima kao load_bank_frame."""
+    return pd.DataFrame({
+        "Pozicija": pd.Categorical([]),
+        "Amount": pd.array([], dtype="Int64"),
+        "f_source": pd.Categorical([]),
+        "balance_date": pd.Series([], dtype="datetime64[ns]"),
+    }, columns=COLUMNS)
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vraća potrošnju memorije po koloni (u bajtovima) i ukupno,
+    uz poređenje sa istim podacima čuvanim kao Python objekti.
+    """
+    compact = df.memory_usage(deep=True, index=False)
+    as_objects = df.astype(object).memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        "tip": [str(df[col].dtype) for col in compact.index],
+        "bajtova": compact.values,
+        "bajtova_object": as_objects.values,
+    }, index=compact.index)
+    report.loc["UKUPNO"] = ["", int(compact.sum()), int(as_objects.sum())]
+    return report
+
+
+def bank_csv_files(bank_code: str, report_type: str = "bs", csv_folder: str = BANKE_CSV_FOLDER) -> List[Path]:
+    """Vraća sve CSV fajlove jedne banke za dati tip izvještaja (bs/bu)."""
+    bank_dir = Path(csv_folder) / report_type / bank_code
+    if not bank_dir.exists():
+        return []
+    return sorted(bank_dir.rglob("*.csv"))
+
+
+def sector_banks(report_type: str = "bs", csv_folder: str = BANKE_CSV_FOLDER) -> List[str]:
+    """Banke iz BANKE, pa ostali folderi banaka (npr. banke koje više ne postoje)."""
+    type_dir = Path(csv_folder) / report_type
+    folders = {path.name for path in type_dir.iterdir() if path.is_dir()} if type_dir.exists() else set()
+    return list(BANKE) + sorted(folders - set(BANKE))
+
+
+def load_sector_frame(
+    report_type: str = "bs",
+    csv_folder: str = BANKE_CSV_FOLDER,
+    min_year: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Učitava bilanse svih banaka (i onih kojih više nema, vidi sector_banks) u jedan
+    DataFrame sa dodatnom kolonom "banka" (kategorija sa šiframa banaka).
+    """
+    banks = sector_banks(report_type, csv_folder)
+    frames = []
+    for code in banks:
+        df = load_bank_frame(bank_csv_files(code, report_type, csv_folder), min_year=min_year)
+        if not df.empty:
+            frames.append(df.assign(banka=code))
+    if not frames:
+        return empty_frame().assign(banka=pd.Categorical([], categories=banks))
+
+    df = pd.concat(frames, ignore_index=True)
+    # concat različite kategorije pretvara u object; vrati kompaktne tipove
+    df["Pozicija"] = df["Pozicija"].astype("category")
+    df["f_source"] = df["f_source"].astype("category")
+    df["banka"] = pd.Categorical(df["banka"], categories=banks)
+    return df
+
+
+def main():
+    """Ispisuje izvještaj o memoriji za svaku banku."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Učitava CSV bilanse po bankama i ispisuje potrošnju memorije"
+    )
+    parser.add_argument(
+        "--csv-folder",
+        type=str,
+        default=BANKE_CSV_FOLDER,
+        help=f"Folder sa CSV bilansima (default: {BANKE_CSV_FOLDER})"
+    )
+    parser.add_argument(
+        "--min-year",
+        type=int,
+        default=None,
+        help="Učitaj samo bilanse od ove godine (npr. 2020)"
+    )
+    args = parser.parse_args()
+
+    total_compact = 0
+    total_objects = 0
+    for code, name in BANKE.items():
+        df = load_bank_frame(bank_csv_files(code, csv_folder=args.csv_folder), min_year=args.min_year)
+        report = memory_report(df)
+        compact = int(report.loc["UKUPNO", "bajtova"])
+        as_objects = int(report.loc["UKUPNO", "bajtova_object"])
+        total_compact += compact
+        total_objects += as_objects
+        print(f"{code} ({name}): {len(df)} redova, {compact / 1024:.1f} KB "
+              f"(kao object kolone: {as_objects / 1024:.1f} KB)")
+
+    print("=" * 60)
+    print(f"Ukupno: {total_compact / 1024:.1f} KB (kao object kolone: {total_objects / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
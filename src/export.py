@@ -0,0 +1,231 @@
+# src/export.py
+
+import csv
+import io
+import json
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # openpyxl je opcion, potreban samo za Excel export
+    Workbook = None
+
+try:
+    from config import BANKE, BANKE_CSV_FOLDER
+    from dataset import bank_csv_files, read_report, report_date
+except ImportError:  # Uvezeno kao paket (npr. iz app.py)
+    from src.config import BANKE, BANKE_CSV_FOLDER
+    from src.dataset import bank_csv_files, read_report, report_date
+
+
+EXPORT_COLUMNS = ["banka", "balance_date", "Pozicija", "Amount"]
+
+# Format -> (ekstenzija, MIME tip)
+EXPORT_FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "jsonl": (".jsonl", "application/x-ndjson"),
+    "xlsx": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+# Koliko izvještaja (fajlova) ide u jedan chunk
+DEFAULT_CHUNK_FILES = 50
+
+ExportRow = Tuple[str, str, str, Optional[int]]
+
+
+def parse_period(value: Optional[str], end: bool = False) -> Optional[pd.Timestamp]:
+    """
+    Pretvara period "YYYY-MM" (ili "YYYY") u datum kraja mjeseca.
+    Za end=True i samo godinu vraća 31.12. te godine.
+    """
+    if not value:
+        return None
+    if len(value) == 4:
+        value = f"{value}-12" if end else f"{value}-01"
+    return pd.Timestamp(f"{value}-01") + pd.offsets.MonthEnd(0)
+
+
+def iter_export_chunks(
+    bank_codes: Sequence[str],
+    date_from: Optional[pd.Timestamp] = None,
+    date_to: Optional[pd.Timestamp] = None,
+    report_type: str = "bs",
+    csv_folder: str = BANKE_CSV_FOLDER,
+    chunk_files: int = DEFAULT_CHUNK_FILES,
+) -> Iterator[List[ExportRow]]:
+    """
+    Čita izvještaje izabranih banaka fajl po fajl i vraća redove u chunk-ovima.
+    U memoriji je u svakom trenutku samo jedan chunk, nikad cijeli skup podataka.
+    """
+    chunk: List[ExportRow] = []
+    files_in_chunk = 0
+
+    for code in bank_codes:
+        files = []
+        for csv_path in bank_csv_files(code, report_type, csv_folder):
+            date = report_date(csv_path.name)
+            if date is None:
+                continue
+            if date_from is not None and date < date_from:
+                continue
+            if date_to is not None and date > date_to:
+                continue
+            files.append((date, csv_path))
+
+        for date, csv_path in sorted(files):
+            rows = read_report(csv_path)
+            if not rows:
+                continue
+            date_str = date.strftime("%Y-%m-%d")
+            chunk.extend((code, date_str, label, amount) for label, amount in rows)
+            files_in_chunk += 1
+
+            if files_in_chunk >= chunk_files:
+                yield chunk
+                chunk = []
+                files_in_chunk = 0
+
+    if chunk:
+        yield chunk
+
+
+def write_csv(chunks: Iterable[List[ExportRow]], out: IO[bytes]) -> int:
+    """Upisuje chunk-ove kao CSV (UTF-8). Vraća broj upisanih redova."""
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    try:
+        writer = csv.writer(text)
+        writer.writerow(EXPORT_COLUMNS)
+        count = 0
+        for chunk in chunks:
+            writer.writerows(
+                (bank, date, label, "" if amount is None else amount)
+                for bank, date, label, amount in chunk
+            )
+            count += len(chunk)
+        text.flush()
+    finally:
+        # Ne zatvaraj out zajedno sa wrapper-om
+        text.detach()
+    return count
+
+
+def write_jsonl(chunks: Iterable[List[ExportRow]], out: IO[bytes]) -> int:
+    """Upisuje chunk-ove kao JSON Lines (jedan JSON objekat po redu)."""
+    count = 0
+    for chunk in chunks:
+        lines = [
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False)
+            for row in chunk
+        ]
+        out.write(("\n".join(lines) + "\n").encode("utf-8"))
+        count += len(chunk)
+    return count
+
+
+def write_xlsx(chunks: Iterable[List[ExportRow]], out: IO[bytes]) -> int:
+    """
+    Upisuje chunk-ove u Excel fajl.
+    Koristi write_only režim openpyxl-a, koji redove odmah serijalizuje na disk.
+    """
+    if Workbook is None:
+        raise ImportError(
+            "openpyxl nije instaliran. Pokreni 'pip install openpyxl'"
+        )
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("bilansi")
+    sheet.append(EXPORT_COLUMNS)
+    count = 0
+    for chunk in chunks:
+        for row in chunk:
+            sheet.append(list(row))
+        count += len(chunk)
+    workbook.save(out)
+    return count
+
+
+WRITERS = {
+    "csv": write_csv,
+    "jsonl": write_jsonl,
+    "xlsx": write_xlsx,
+}
+
+
+def export_data(
+    out: IO[bytes],
+    export_format: str,
+    bank_codes: Sequence[str],
+    date_from: Optional[pd.Timestamp] = None,
+    date_to: Optional[pd.Timestamp] = None,
+    report_type: str = "bs",
+    csv_folder: str = BANKE_CSV_FOLDER,
+) -> int:
+    """
+    Izvozi podatke izabranih banaka i perioda u dati binarni stream.
+    Vraća broj izvezenih redova.
+    """
+    if export_format not in WRITERS:
+        raise ValueError(f"Nepoznat format: {export_format} (dostupno: {', '.join(WRITERS)})")
+
+    chunks = iter_export_chunks(bank_codes, date_from, date_to, report_type, csv_folder)
+    return WRITERS[export_format](chunks, out)
+
+
+def main():
+    """Izvoz podataka iz komandne linije."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Izvozi bilanse izabranih banaka u CSV, JSON Lines ili Excel"
+    )
+    parser.add_argument(
+        "--banks",
+        nargs="+",
+        default=list(BANKE),
+        help="Šifre banaka (default: sve, npr. ckb nik mnb)"
+    )
+    parser.add_argument("--from", dest="date_from", type=str, default=None,
+                        help="Početni period, YYYY-MM ili YYYY")
+    parser.add_argument("--to", dest="date_to", type=str, default=None,
+                        help="Krajnji period, YYYY-MM ili YYYY")
+    parser.add_argument(
+        "--format",
+        choices=list(WRITERS),
+        default="csv",
+        help="Format izlaza (default: csv)"
+    )
+    parser.add_argument(
+        "--report-type",
+        choices=["bs", "bu"],
+        default="bs",
+        help="Tip izvještaja: bs = bilans stanja, bu = bilans uspjeha (default: bs)"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        required=True,
+        help="Izlazni fajl"
+    )
+    args = parser.parse_args()
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with output_path.open("wb") as out:
+        count = export_data(
+            out,
+            args.format,
+            args.banks,
+            parse_period(args.date_from),
+            parse_period(args.date_to, end=True),
+            args.report_type,
+        )
+
+    print(f"Izvezeno {count} redova u {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# src/extraction_cache.py
+#
+# Keš sirovih tabela izvučenih iz PDF-ova (izlaz iter_tables_from_pdf, prije
+# clean_table). Čitanje PDF-a je skupi dio konverzije; sa kešom se promjena
+# čišćenja, normalizacije ili formata CSV-a primjenjuje na cijelu arhivu
+# ponovnim pokretanjem konverzije, bez otvaranja ijednog PDF-a.
+#
+# Ključ je hash sadržaja PDF-a + podešavanja parsera (LayoutSettings.as_dict(),
+# use_layout) + EXTRACTOR_VERSION, pa drugačiji fajl ili drugačije izvlačenje
+# nikad ne dobija stari rezultat. Jedan unos je gzip JSON:
+#   data/extraction_cache/<2 znaka>/<ključ>.json.gz
+#
+#   python src/extraction_cache.py           # veličina keša
+#   python src/extraction_cache.py --prune   # ukloni unose za PDF-ove kojih više nema
+
+import gzip
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from config import DOWNLOAD_FOLDER, EXTRACTION_CACHE_FOLDER
+from pdf_layout import LayoutSettings
+from quarantine import file_sha1
+
+# Povećaj kada se promijeni izvlačenje tabela (pdf_layout.py, iter_tables_from_pdf),
+# a ne podešavanja: svi stari unosi tada prestaju da važe
+EXTRACTOR_VERSION = 1
+
+# Verzija formata unosa
+CACHE_FORMAT = 1
+
+RawTable = List[List[Optional[str]]]
+
+
+def cache_key(pdf_sha1: str, use_layout: bool, layout_settings: LayoutSettings) -> str:
+    params = {
+        "pdf": pdf_sha1,
+        "layout": use_layout,
+        "settings": layout_settings.as_dict(),
+        "extractor": EXTRACTOR_VERSION,
+    }
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    def __init__(self, folder: str = EXTRACTION_CACHE_FOLDER):
+        self.folder = Path(folder)
+
+    def _path(self, key: str) -> Path:
+        return self.folder / key[:2] / f"{key}.json.gz"
+
+    def key(self, pdf_path: Path, use_layout: bool, layout_settings: LayoutSettings) -> str:
+        return cache_key(file_sha1(pdf_path), use_layout, layout_settings)
+
+    def get(self, key: str) -> Optional[List[RawTable]]:
+        """Sirove tabele ili None ako unosa nema (ili je oštećen)."""
+        path = self._path(key)
+        if not path.is_file():
+            return None
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, EOFError, json.JSONDecodeError):
+            return None
+        if entry.get("format") != CACHE_FORMAT:
+            return None
+        return entry["tables"]
+
+    def put(self, key: str, pdf_path: Path, tables: List[RawTable]):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "format": CACHE_FORMAT,
+            "pdf": Path(pdf_path).as_posix(),
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "tables": tables,
+        }
+        # Privremeno ime: prekinut upis (npr. ubijen radni proces) ne ostavlja polovičan unos
+        tmp_path = path.with_name(path.name + ".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump(entry, f, ensure_ascii=False, separators=(",", ":"))
+        tmp_path.replace(path)
+
+    def recording(self, key: str, pdf_path: Path, tables: Iterable[RawTable], ok) -> Iterator[RawTable]:
+        """
+        Prosleđuje tabele dalje i upisuje ih u keš kada se PDF pročita do kraja.
+        ok() se poziva na kraju: nepotpuno pročitan PDF (greška pri čitanju) se ne kešira.
+        """
+        collected: List[RawTable] = []
+        for table in tables:
+            collected.append(table)
+            yield table
+        if ok():
+            self.put(key, pdf_path, collected)
+
+    def entries(self) -> List[Path]:
+        return sorted(self.folder.glob("*/*.json.gz")) if self.folder.exists() else []
+
+    def prune(self, pdf_folder: str = DOWNLOAD_FOLDER, use_layout: bool = True, layout_settings: LayoutSettings = LayoutSettings()) -> int:
+        """Uklanja unose koji ne odgovaraju nijednom PDF-u u pdf_folder sa datim podešavanjima."""
+        valid = {self.key(pdf_file, use_layout, layout_settings) for pdf_file in Path(pdf_folder).rglob("*.pdf")}
+        removed = 0
+        for path in self.entries():
+            if path.name[: -len(".json.gz")] not in valid:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Keš sirovih tabela izvučenih iz PDF-ova (za ponovno čišćenje bez čitanja PDF-ova)"
+    )
+    parser.add_argument(
+        "--pdf-folder",
+        type=str,
+        default=DOWNLOAD_FOLDER,
+        help=f"Folder sa PDF fajlovima (default: {DOWNLOAD_FOLDER})"
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Ukloni unose za PDF-ove kojih više nema ili su promijenjeni (sa podrazumijevanim podešavanjima parsera)"
+    )
+    args = parser.parse_args()
+
+    cache = ExtractionCache()
+    if args.prune:
+        print(f"Uklonjeno unosa: {cache.prune(args.pdf_folder)}")
+    entries = cache.entries()
+    size = sum(path.stat().st_size for path in entries)
+    print(f"Keš ekstrakcije ({cache.folder}): {len(entries)} unosa, {size / (1024 * 1024):.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
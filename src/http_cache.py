@@ -0,0 +1,113 @@
+# src/http_cache.py
+#
+# Keš HTML stranica na disku (lista PDF-ova se ne mijenja često).
+# Za svaki URL čuvamo kompresovano telo (.html.gz) i metapodatke (.json):
+# URL, zaglavlja za revalidaciju (ETag, Last-Modified), vrijeme dohvata i izvor.
+
+import gzip
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+from config import HTTP_CACHE_FOLDER
+
+# Zaglavlja koja čuvamo; ostala nisu potrebna za revalidaciju ni parsiranje
+CACHED_HEADERS = ("ETag", "Last-Modified", "Content-Type", "Date")
+_CANONICAL_HEADERS = {name.lower(): name for name in CACHED_HEADERS}
+
+
+def _cached_headers(headers: Optional[Mapping[str, str]]) -> Dict[str, str]:
+    """Zadržava samo CACHED_HEADERS pod kanonskim imenima (HTTP imena zaglavlja ne razlikuju velika i mala slova)."""
+    kept = {}
+    for name, value in (headers or {}).items():
+        canonical = _CANONICAL_HEADERS.get(name.lower())
+        if canonical is not None:
+            kept[canonical] = value
+    return kept
+
+
+@dataclass
+class CachedPage:
+    url: str
+    body: str
+    headers: Dict[str, str]
+    fetched_at: float
+    source: str = "requests"
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def is_fresh(self, ttl: float) -> bool:
+        return self.age() < ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Zaglavlja za uslovni GET (server vraća 304 ako se stranica nije promijenila)."""
+        headers = {}
+        if self.headers.get("ETag"):
+            headers["If-None-Match"] = self.headers["ETag"]
+        if self.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = self.headers["Last-Modified"]
+        return headers
+
+
+class HttpCache:
+    def __init__(self, folder: str = HTTP_CACHE_FOLDER):
+        self.folder = Path(folder)
+
+    def _paths(self, url: str):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.folder / f"{key}.json", self.folder / f"{key}.html.gz"
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        meta_path, body_path = self._paths(url)
+        if not meta_path.is_file() or not body_path.is_file():
+            return None
+        try:
+            with meta_path.open("r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with gzip.open(body_path, "rt", encoding="utf-8") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return CachedPage(
+            url=meta["url"],
+            body=body,
+            headers=_cached_headers(meta.get("headers")),
+            fetched_at=meta["fetched_at"],
+            source=meta.get("source", "requests"),
+        )
+
+    def put(self, url: str, body: str, headers: Optional[Mapping[str, str]] = None, source: str = "requests") -> CachedPage:
+        headers = _cached_headers(headers)
+        page = CachedPage(url=url, body=body, headers=headers, fetched_at=time.time(), source=source)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        meta_path, body_path = self._paths(url)
+
+        # Telo pa metapodaci, oba preko privremenog fajla i atomske zamjene
+        tmp_body = body_path.with_suffix(".tmp")
+        with gzip.open(tmp_body, "wt", encoding="utf-8") as f:
+            f.write(body)
+        tmp_body.replace(body_path)
+        self._write_meta(meta_path, page)
+        return page
+
+    def touch(self, page: CachedPage) -> CachedPage:
+        """Server je potvrdio (304) da je stranica ista: samo obnovi vrijeme dohvata."""
+        page.fetched_at = time.time()
+        self._write_meta(self._paths(page.url)[0], page)
+        return page
+
+    @staticmethod
+    def _write_meta(meta_path: Path, page: CachedPage):
+        tmp_meta = meta_path.with_suffix(".tmp")
+        with tmp_meta.open("w", encoding="utf-8") as f:
+            json.dump({
+                "url": page.url,
+                "headers": page.headers,
+                "fetched_at": page.fetched_at,
+                "source": page.source,
+            }, f, ensure_ascii=False, indent=2)
+        tmp_meta.replace(meta_path)
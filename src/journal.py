@@ -0,0 +1,178 @@
+# src/journal.py
+#
+# Dnevnik pokretanja (write-ahead log) za preuzimanje i konverziju: svaka faza
+# upisuje šta je pronašla i šta je završila, pa pokretanje prekinuto na pola
+# (restart servera, Ctrl+C) sledeći put nastavlja tamo gdje je stalo umjesto
+# da ponovo dohvata listu i provjerava/konvertuje sve fajlove.
+#
+# Format: jedan JSON po liniji, samo dopisivanje (data/journal/<faza>.jsonl):
+#   {"op": "begin", "run": ..., "params": {...}}   početak pokretanja
+#   {"op": "listing", "files": [...]}               pronađeni fajlovi
+#   {"op": "file", "key": ..., "state": ...}        stanje jednog fajla (done / failed / ...)
+#   {"op": "end"}                                   pokretanje završeno
+#
+# Zapisi se upisuju u grupama (commit na svakih batch_size zapisa, a pozadinska
+# nit upisuje ostatak na svakih flush_interval sekundi, sa fsync). Ako se izgubi poslednja grupa, ti fajlovi
+# se samo ponovo obrade: preuzimanje i konverzija su idempotentni (vidi
+# storage.py i pdf_to_csv.py), pa dnevnik nikad ne tvrdi da je gotovo nešto
+# što nije. Nedovršena poslednja linija (pad usred upisa) se zanemaruje.
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from config import RUN_JOURNAL_FOLDER
+except ImportError:  # Uvezeno kao paket
+    from src.config import RUN_JOURNAL_FOLDER
+
+
+class RunJournal:
+    """
+    Dnevnik jednog pokretanja faze (npr. "crawl" ili "convert").
+    Ako prethodno pokretanje sa istim parametrima nije završeno, resumed je True,
+    a listing i file_states sadrže ono što je tada upisano.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        params: dict,
+        folder: str = RUN_JOURNAL_FOLDER,
+        resume: bool = True,
+        batch_size: int = 50,
+        flush_interval: float = 1.0,
+    ):
+        self.path = Path(folder) / f"{name}.jsonl"
+        self.params = params
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.listing: Optional[List[str]] = None
+        self.file_states: Dict[str, str] = {}
+        self.resumed = False
+        self.run_id: Optional[str] = None
+
+        # Statistika za procjenu koliko dnevnik košta u odnosu na posao
+        self.records = 0
+        self.commits = 0
+        self.seconds = 0.0
+
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+
+        if resume:
+            self._replay()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.resumed:
+            self._file = self.path.open("a", encoding="utf-8")
+        else:
+            # Novo pokretanje: stari (završeni ili tuđi) dnevnik se odbacuje
+            self._file = self.path.open("w", encoding="utf-8")
+            self.run_id = time.strftime("%Y%m%d-%H%M%S")
+            self._append({"op": "begin", "run": self.run_id, "time": time.strftime("%Y-%m-%d %H:%M:%S"), "params": params})
+            self.commit()
+
+        # Zapis ne čeka sledeći fajl da bi stigao na disk (jedan fajl može trajati dugo)
+        self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.commit()
+
+    def _replay(self):
+        """Čita poslednje pokretanje iz dnevnika; nastavlja ga samo ako nije završeno."""
+        if not self.path.is_file():
+            return
+        run: Optional[List[dict]] = None
+        valid_end = 0
+        with self.path.open("rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Prekinut upis poslednje linije
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                valid_end += len(line)
+                if record.get("op") == "begin":
+                    run = [record]
+                elif run is not None:
+                    run.append(record)
+        if not run or run[-1].get("op") == "end" or run[0].get("params") != self.params:
+            return
+
+        # Odsijeci nedovršen kraj da se novi zapisi ne nastave na polovičnu liniju
+        with self.path.open("r+b") as f:
+            f.truncate(valid_end)
+        self.resumed = True
+        self.run_id = run[0]["run"]
+        for record in run[1:]:
+            if record["op"] == "listing":
+                self.listing = record["files"]
+            elif record["op"] == "file":
+                self.file_states[record["key"]] = record["state"]
+
+    def _append(self, record: dict):
+        self._buffer.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self.records += 1
+
+    def _commit_locked(self):
+        if not self._buffer:
+            return
+        start = time.perf_counter()
+        self._file.write("".join(self._buffer))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._buffer.clear()
+        self.commits += 1
+        self.seconds += time.perf_counter() - start
+
+    def commit(self):
+        """Upisuje zapise iz bafera na disk (fsync)."""
+        with self._lock:
+            if not self._file.closed:
+                self._commit_locked()
+
+    def set_listing(self, files: List[str]):
+        """Lista se upisuje odmah: bez nje se zapisi o fajlovima ne mogu nastaviti."""
+        with self._lock:
+            self.listing = list(files)
+            self._append({"op": "listing", "files": self.listing})
+            self._commit_locked()
+
+    def set_state(self, key: str, state: str, **fields):
+        with self._lock:
+            self.file_states[key] = state
+            self._append({"op": "file", "key": key, "state": state, **fields})
+            if len(self._buffer) >= self.batch_size:
+                self._commit_locked()
+
+    def state(self, key: str) -> Optional[str]:
+        return self.file_states.get(key)
+
+    def finish(self):
+        """Označava pokretanje kao završeno; sledeće pokretanje počinje iz početka."""
+        with self._lock:
+            self._append({"op": "end", "time": time.strftime("%Y-%m-%d %H:%M:%S")})
+        self.close()
+
+    def close(self):
+        """Zatvara dnevnik bez oznake kraja (pokretanje se može nastaviti)."""
+        self._closed.set()
+        self._flusher.join()
+        with self._lock:
+            if not self._file.closed:
+                self._commit_locked()
+                self._file.close()
+
+    def print_summary(self, total_seconds: Optional[float] = None):
+        share = f", {self.seconds / total_seconds:.2%} ukupnog vremena" if total_seconds else ""
+        print(
+            f"  Dnevnik ({self.path}): {self.records} zapisa u {self.commits} upisa, "
+            f"{self.seconds * 1000:.1f} ms{share}"
+        )
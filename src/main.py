@@ -1,57 +1,281 @@
 # src/main.py
 
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 from urllib.parse import urljoin  # Važno za pravilno spajanje URL-ova
 import time
+from typing import Callable, List, Optional
+
+import requests
 
 # Uvozimo naše module
-from config import BASE_URL_STRANICE, DOWNLOAD_FOLDER
+from config import BASE_URL_STRANICE, DOWNLOAD_FOLDER, HTTP_CACHE_TTL, PROFILE_FOLDER
 from scraper import dohvati_html
 from parser import parse_pdf_links
 from storage import download_file
+from retry import STATS as retry_stats
+from profiling import Profiler
+from journal import RunJournal
+from priority import by_priority
+from probe import probe
 
-def main():
-    print(f"--- Pokretanje PDF Scrapera za {BASE_URL_STRANICE} ---")
-    
-    # Korak 1: Dohvati HTML stranice koja lista fajlove
-    html_sadrzaj = dohvati_html(BASE_URL_STRANICE)
-    
-    if not html_sadrzaj:
-        print("Ne mogu da dohvatim listu fajlova. Prekidam.")
-        return
 
-    # Korak 2: Parsiraj HTML da izvučeš imena .pdf fajlova
-    pdf_fajlovi = parse_pdf_links(html_sadrzaj)
-    
+@dataclass
+class CrawlResult:
+    found: int = 0
+    downloaded: int = 0
+    skipped: int = 0
+    failed: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    # Lokalne putanje fajlova preuzetih u ovom pokretanju (npr. za konverziju samo njih)
+    new_files: List[str] = field(default_factory=list)
+
+
+def crawl(
+    base_url: str = BASE_URL_STRANICE,
+    download_folder: str = DOWNLOAD_FOLDER,
+    workers: int = 1,
+    delay: float = 0.5,
+    use_cache: bool = True,
+    ttl: float = HTTP_CACHE_TTL,
+    offline: bool = False,
+    profiler: Optional[Profiler] = None,
+    journal: Optional[RunJournal] = None,
+    on_downloaded: Optional[Callable[[Path], None]] = None,
+    pdf_files: Optional[List[str]] = None,
+) -> Optional[CrawlResult]:
+    """
+    Dohvata listu PDF-ova sa base_url i preuzima one kojih nema u download_folder.
+    Sa workers > 1 fajlovi se preuzimaju paralelno (svaka nit ima svoju
+    requests.Session, pa se konekcije ponovo koriste). Vraća None ako lista nije dostupna.
+    Ako je dat profiler, mjere se faze (lista, parsiranje) i svako preuzimanje.
+    Ako je dat dnevnik (vidi journal.py) sa prekinutim pokretanjem, lista se uzima
+    iz dnevnika, a već preuzeti fajlovi se preskaču bez provjere na disku.
+    Fajlovi se preuzimaju po prioritetu (najnoviji period prvi, vidi priority.py);
+    on_downloaded se poziva za svaki preuzet fajl (npr. da konverzija krene odmah).
+    Sa pdf_files (putanje kao sa liste, npr. iz probe.py) lista se ne dohvata.
+    """
+    start = time.perf_counter()
+    profiler = profiler or Profiler("crawl", enabled=False)
+
+    if pdf_files is not None:
+        pdf_fajlovi = list(pdf_files)
+    elif journal is not None and journal.listing is not None:
+        pdf_fajlovi = journal.listing
+        gotovo = sum(1 for f in pdf_fajlovi if journal.state(f) == "done")
+        print(f"Nastavljam prekinuto pokretanje {journal.run_id}: {gotovo}/{len(pdf_fajlovi)} fajlova već obrađeno")
+    else:
+        # Korak 1: Dohvati HTML stranice koja lista fajlove (iz keša ako je svjež)
+        with profiler.stage("lista"):
+            html_sadrzaj = dohvati_html(base_url, use_cache=use_cache, ttl=ttl, offline=offline)
+
+        if not html_sadrzaj:
+            print("Ne mogu da dohvatim listu fajlova. Prekidam.")
+            return None
+
+        # Korak 2: Parsiraj HTML da izvučeš imena .pdf fajlova
+        with profiler.stage("parsiranje"):
+            pdf_fajlovi = parse_pdf_links(html_sadrzaj)
+        if journal is not None:
+            journal.set_listing(pdf_fajlovi)
+    result = CrawlResult(found=len(pdf_fajlovi))
+
     if not pdf_fajlovi:
-        print("Nije pronađen nijedan .pdf link na stranici.")
-        return
-        
+        print("Nema novih fajlova." if pdf_files is not None else "Nije pronađen nijedan .pdf link na stranici.")
+        return result
+
     print(f"Pronađeno ukupno {len(pdf_fajlovi)} PDF fajlova.")
-    
-    # Korak 3: Prođi kroz listu i preuzmi svaki fajl
-    for i, ime_fajla in enumerate(pdf_fajlovi, 1):
-        
+
+    if offline:
+        # Bez mreže: samo prijavi koji fajlovi sa liste nedostaju lokalno
+        nedostaju = [f for f in pdf_fajlovi if not (Path(download_folder) / f.lstrip("/")).exists()]
+        print(f"Offline režim: {len(nedostaju)} fajlova sa liste nije preuzeto.")
+        result.seconds = time.perf_counter() - start
+        return result
+
+    sessions = threading.local()
+    lock = threading.Lock()
+
+    def preuzmi(i: int, ime_fajla: str):
         # Kreiraj puni, apsolutni URL za fajl
         # npr. "https://.../ckb/" + "0925ckb_bs.pdf"
-        puni_url = urljoin(BASE_URL_STRANICE, ime_fajla)
-        
+        puni_url = urljoin(base_url, ime_fajla)
+
         # Kreiraj relativnu putanju gde čuvamo fajl; ukloni vodeću kosu crtu
         # npr. "data/ckb_izvestaji/0925ckb_bs.pdf"
         relativna_putanja = Path(ime_fajla.lstrip("/"))
-        lokalna_putanja = Path(DOWNLOAD_FOLDER) / relativna_putanja
-        
+        lokalna_putanja = Path(download_folder) / relativna_putanja
+
+        if journal is not None and journal.state(ime_fajla) == "done":
+            with lock:
+                result.skipped += 1
+            return
+
+        if lokalna_putanja.exists():
+            with lock:
+                result.skipped += 1
+            return
+
         print(f"\n[{i}/{len(pdf_fajlovi)}] Preuzimam: {ime_fajla}")
-        
-        # Pozovi funkciju za preuzimanje
-        download_file(puni_url, str(lokalna_putanja))
-        
+        if not hasattr(sessions, "session"):
+            sessions.session = requests.Session()
+
+        with profiler.file("preuzimanje", ime_fajla.lstrip("/")):
+            uspjeh = download_file(puni_url, str(lokalna_putanja), session=sessions.session)
+        with lock:
+            if uspjeh:
+                result.downloaded += 1
+                result.new_files.append(str(lokalna_putanja))
+                result.bytes += lokalna_putanja.stat().st_size
+            else:
+                result.failed += 1
+        if uspjeh and on_downloaded is not None:
+            on_downloaded(lokalna_putanja)
+        if journal is not None:
+            # Neuspjeli fajlovi se pokušavaju ponovo i kada se pokretanje nastavi
+            journal.set_state(ime_fajla, "done" if uspjeh else "failed")
+
         # Budi fin prema serveru, napravi malu pauzu
-        time.sleep(0.5) # Pauza od pola sekunde
-    
-    print(f"\n--- Preuzimanje završeno. Svi fajlovi su u '{DOWNLOAD_FOLDER}' ---")
+        if delay:
+            time.sleep(delay)
+
+    # Korak 3: Preuzmi fajlove, najsvježije prve (red zadataka u pool-u je FIFO,
+    # pa redosled predaje određuje i redosled preuzimanja)
+    redosled = by_priority(pdf_fajlovi)
+    if workers <= 1:
+        for i, ime_fajla in enumerate(redosled, 1):
+            preuzmi(i, ime_fajla)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(preuzmi, i, f) for i, f in enumerate(redosled, 1)]:
+                future.result()
+
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Preuzima PDF bilanse banaka sa sajta CBCG"
+    )
+    parser.add_argument(
+        "--url",
+        type=str,
+        default=BASE_URL_STRANICE,
+        help="Stranica sa spiskom PDF-ova (npr. lokalni standin_server.py; default: sajt CBCG)"
+    )
+    parser.add_argument(
+        "--download-folder",
+        type=str,
+        default=DOWNLOAD_FOLDER,
+        help=f"Folder gdje se čuvaju PDF-ovi (default: {DOWNLOAD_FOLDER})"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Broj paralelnih preuzimanja (default: 1)"
+    )
+    parser.add_argument(
+        "--delay",
+        type=float,
+        default=0.5,
+        help="Pauza u sekundama posle svakog preuzetog fajla, po niti (default: 0.5)"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Koristi samo keširanu listu fajlova (bez mreže) i ne preuzimaj PDF-ove"
+    )
+    parser.add_argument(
+        "--ttl",
+        type=float,
+        default=HTTP_CACHE_TTL,
+        help=f"Koliko sekundi je keširana lista fajlova svježa (default: {HTTP_CACHE_TTL})"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Uvijek dohvati listu fajlova sa sajta i ne čuvaj je u kešu"
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Ne nastavljaj prekinuto pokretanje iz dnevnika, počni iz početka"
+    )
+    parser.add_argument(
+        "--probe",
+        action="store_true",
+        help="Umjesto liste provjeri HEAD zahtjevima samo očekivane sledeće kvartale poznatih banaka (vidi probe.py)"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"Snimi cProfile i tracemalloc po fazi i fajlu (izvještaj u {PROFILE_FOLDER})"
+    )
+    args = parser.parse_args()
+    profiler = Profiler("crawl", enabled=args.profile)
+
+    print(f"--- Pokretanje PDF Scrapera za {args.url} ---")
+
+    pdf_files = None
+    if args.probe and not args.offline:
+        found = probe(args.url, args.download_folder)
+        if found.conclusive:
+            pdf_files = found.found
+        else:
+            print("Proba nije potpuna, prelazim na punu provjeru liste.")
+
+    # Dnevnik pokretanja: prekinuto preuzimanje se sledeći put nastavlja (vidi journal.py)
+    journal = None
+    if not args.offline and pdf_files is None:
+        journal = RunJournal(
+            "crawl",
+            {"url": args.url, "download_folder": args.download_folder},
+            resume=not args.fresh,
+        )
+
+    try:
+        result = crawl(
+            args.url,
+            args.download_folder,
+            workers=args.workers,
+            delay=args.delay,
+            use_cache=not args.no_cache,
+            ttl=args.ttl,
+            offline=args.offline,
+            profiler=profiler,
+            journal=journal,
+            pdf_files=pdf_files,
+        )
+    except BaseException:
+        if journal is not None:
+            journal.close()
+        raise
+    if journal is not None:
+        if result is not None:
+            journal.finish()
+        else:
+            journal.close()
+    profiler.print_summary()
+    if result is None or args.offline or not result.found:
+        return
+
+    print(f"\n--- Preuzimanje završeno. Svi fajlovi su u '{args.download_folder}' ---")
+    print(
+        f"Preuzeto: {result.downloaded}, preskočeno: {result.skipped}, neuspjelo: {result.failed} "
+        f"({result.bytes / (1024 * 1024):.1f} MB za {result.seconds:.1f}s)"
+    )
+    retry_stats.print_summary()
+    if journal is not None:
+        journal.print_summary(result.seconds)
 
 # Standardni Python način da se pokrene 'main' funkcija
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,335 @@
+# src/metrics.py
+#
+# Izvedeni pokazatelji po banci i periodu (K/D odnos, kvartalni i godišnji rast,
+# tržišno učešće), sačuvani na disku i ažurirani inkrementalno: kada stigne novi
+# kvartal, čitaju se samo novi/izmijenjeni CSV fajlovi i ponovo računaju samo redovi
+# koji od njih zavise.
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+try:
+    from aggregates import BALANCE_CATEGORIES, CREDIT_DEPOSIT_CATEGORIES
+    from config import BANKE, BANKE_CSV_FOLDER, CSV_OUTPUT_FOLDER
+    from catalog import Catalog
+    from dataset import bank_csv_files, read_report, report_date
+except ImportError:  # Uvezeno kao paket (npr. iz app.py)
+    from src.aggregates import BALANCE_CATEGORIES, CREDIT_DEPOSIT_CATEGORIES
+    from src.config import BANKE, BANKE_CSV_FOLDER, CSV_OUTPUT_FOLDER
+    from src.catalog import Catalog
+    from src.dataset import bank_csv_files, read_report, report_date
+
+
+METRICS_PATH = Path(CSV_OUTPUT_FOLDER) / "metrics.json"
+
+# Verzija formata fajla; povećaj kada se promijene kolone ili način računanja
+# (2: tržišno učešće u odnosu na sve banke, i one koje više ne postoje)
+METRICS_FORMAT = 2
+
+# Osnovne vrijednosti (zbir pozicija po kategoriji) iz kojih se sve ostalo računa
+BASE_CATEGORIES = {**BALANCE_CATEGORIES, **CREDIT_DEPOSIT_CATEGORIES}
+BASE_COLUMNS = list(BASE_CATEGORIES)
+
+# Kategorije za koje računamo rast (QoQ = u odnosu na prethodni kvartal, YoY = na isti kvartal prošle godine)
+GROWTH_CATEGORIES = ["Aktiva", "Krediti klijenata", "Depoziti klijenata"]
+
+DERIVED_COLUMNS = (
+    ["K/D odnos"]
+    + [f"{cat} {suffix}" for cat in GROWTH_CATEGORIES for suffix in ("QoQ", "YoY")]
+    + ["Tržišno učešće"]
+)
+
+_POSITION_TO_CATEGORY = {
+    position: category
+    for category, positions in BASE_CATEGORIES.items()
+    for position in positions
+}
+
+Key = Tuple[str, int]  # (banka, yyyymm)
+
+
+def _period_key(date: pd.Timestamp) -> int:
+    return date.year * 100 + date.month
+
+
+def _shift_period(period: int, months: int) -> int:
+    """Pomjera yyyymm za dati broj mjeseci (može i unazad)."""
+    index = (period // 100) * 12 + (period % 100 - 1) + months
+    return (index // 12) * 100 + index % 12 + 1
+
+
+def _fingerprint(path: Path) -> str:
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def report_base_values(csv_path: Path) -> Optional[Dict[str, int]]:
+    """
+    Zbir pozicija po kategoriji za jedan CSV bilans; prazne pozicije su 0.
+    None ako fajl nema nijednu od pozicija (stari format, nečitljiv font).
+    """
+    rows = read_report(csv_path)
+    if not rows:
+        return None
+    values = {category: 0 for category in BASE_COLUMNS}
+    found = False
+    for label, amount in rows:
+        category = _POSITION_TO_CATEGORY.get(label)
+        if category is None:
+            continue
+        found = True
+        if amount is not None:
+            values[category] += amount
+    return values if found else None
+
+
+def _growth(current: int, previous: Optional[int]) -> Optional[float]:
+    if previous is None or previous == 0:
+        return None
+    return current / previous - 1
+
+
+class MetricsStore:
+    """
+    Tabela pokazatelja sa stanjem potrebnim za inkrementalno ažuriranje:
+    - files: banka -> ime fajla -> [otisak (veličina:mtime), yyyymm, osnovne vrijednosti ili None],
+    - base: (banka, yyyymm) -> osnovne vrijednosti (zbir svih fajlova tog perioda),
+    - derived: (banka, yyyymm) -> izvedeni pokazatelji.
+    """
+
+    def __init__(self, csv_folder: str = BANKE_CSV_FOLDER, path: Path = METRICS_PATH):
+        self.csv_folder = csv_folder
+        self.path = path
+        self.files: Dict[str, Dict[str, list]] = {}
+        self.base: Dict[Key, Dict[str, int]] = {}
+        self.derived: Dict[Key, Dict[str, Optional[float]]] = {}
+        # Drži se i za save() i frame(): tabelu dijele sve sesije aplikacije
+        self._lock = threading.RLock()
+
+    @classmethod
+    def load(cls, csv_folder: str = BANKE_CSV_FOLDER, path: Path = METRICS_PATH) -> "MetricsStore":
+        """Učitava sačuvano stanje; ako ga nema (ili je stari format) počinje od praznog."""
+        store = cls(csv_folder, path)
+        if path.is_file():
+            with path.open("r", encoding="utf-8") as f:
+                raw = json.load(f)
+            if raw.get("format") == METRICS_FORMAT and raw.get("csv_folder") == csv_folder:
+                store.files = raw["files"]
+                for bank, period, base, derived in raw["rows"]:
+                    store.base[(bank, period)] = dict(zip(BASE_COLUMNS, base))
+                    store.derived[(bank, period)] = dict(zip(DERIVED_COLUMNS, derived))
+        return store
+
+    def save(self):
+        with self._lock:
+            raw = {
+                "format": METRICS_FORMAT,
+                "csv_folder": self.csv_folder,
+                "files": self.files,
+                "rows": [
+                    [key[0], key[1],
+                     [self.base[key][c] for c in BASE_COLUMNS],
+                     [self.derived.get(key, {}).get(c) for c in DERIVED_COLUMNS]]
+                    for key in sorted(self.base)
+                ],
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(raw, f, ensure_ascii=False, separators=(",", ":"))
+            tmp_path.replace(self.path)
+
+    def _changed_periods(self, bank: str, csv_files: Iterable[Tuple[Path, str]]) -> Set[int]:
+        """
+        Čita samo nove/izmijenjene fajlove banke; vraća periode kojih se to tiče.
+        csv_files: parovi (putanja, otisak "veličina:mtime").
+        """
+        known = self.files.setdefault(bank, {})
+        seen = set()
+        periods: Set[int] = set()
+
+        for csv_path, fingerprint in csv_files:
+            date = report_date(csv_path.name)
+            if date is None:
+                continue
+            name = csv_path.name
+            seen.add(name)
+            entry = known.get(name)
+            if entry is not None and entry[0] == fingerprint:
+                continue
+            period = _period_key(date)
+            if entry is not None:
+                periods.add(entry[1])
+            known[name] = [fingerprint, period, report_base_values(csv_path)]
+            periods.add(period)
+
+        for name in [n for n in known if n not in seen]:
+            periods.add(known.pop(name)[1])
+        return periods
+
+    def _rebuild_base(self, bank: str, period: int):
+        values = [entry[2] for entry in self.files.get(bank, {}).values() if entry[1] == period and entry[2]]
+        if not values:
+            self.base.pop((bank, period), None)
+            return
+        self.base[(bank, period)] = {c: sum(v[c] for v in values) for c in BASE_COLUMNS}
+
+    def _compute_derived(self, key: Key, sector_assets: Dict[int, int]):
+        bank, period = key
+        base = self.base.get(key)
+        if base is None:
+            self.derived.pop(key, None)
+            return
+
+        previous_quarter = self.base.get((bank, _shift_period(period, -3)))
+        previous_year = self.base.get((bank, _shift_period(period, -12)))
+        deposits = base["Depoziti klijenata"]
+        derived: Dict[str, Optional[float]] = {
+            "K/D odnos": base["Krediti klijenata"] / deposits if deposits else None,
+        }
+        for category in GROWTH_CATEGORIES:
+            derived[f"{category} QoQ"] = _growth(base[category], previous_quarter and previous_quarter[category])
+            derived[f"{category} YoY"] = _growth(base[category], previous_year and previous_year[category])
+        total = sector_assets.get(period)
+        derived["Tržišno učešće"] = base["Aktiva"] / total if total else None
+        self.derived[key] = derived
+
+    def _bank_files(self, bank: str, catalog: Optional[Catalog]) -> List[Tuple[Path, str]]:
+        if catalog is not None:
+            # Otisci iz kataloga: nema obilaženja foldera ni stat poziva
+            return [(path, f"{e['size']}:{e['mtime_ns']}") for path, e in catalog.entries_for(bank)]
+        return [(path, _fingerprint(path)) for path in bank_csv_files(bank, csv_folder=self.csv_folder)]
+
+    def _all_banks(self, catalog: Optional[Catalog]) -> List[str]:
+        """Sve banke sa bilansima stanja, i one koje više ne postoje (ulaze u zbir sektora)."""
+        if catalog is not None:
+            found = set(catalog.banks("bs"))
+        else:
+            bs_dir = Path(self.csv_folder) / "bs"
+            found = {path.name for path in bs_dir.iterdir() if path.is_dir()} if bs_dir.exists() else set()
+        return sorted(found | set(self.files))
+
+    def update(self, banks: Optional[Iterable[str]] = None, catalog: Optional[Catalog] = None) -> int:
+        """
+        Sinhronizuje tabelu sa CSV fajlovima (iz kataloga ako je dat, inače iz foldera).
+        Bez banks se čitaju sve banke, jer tržišno učešće zavisi od cijelog sektora.
+        Vraća broj ponovo izračunatih redova (0 ako se ništa nije promijenilo).
+        """
+        with self._lock:
+            changed: Set[Key] = set()
+            for bank in self._all_banks(catalog) if banks is None else banks:
+                for period in self._changed_periods(bank, self._bank_files(bank, catalog)):
+                    self._rebuild_base(bank, period)
+                    changed.add((bank, period))
+            if not changed:
+                return 0
+
+            # Red zavisi od svog perioda, prethodnog kvartala (QoQ) i iste
+            # četvrtine prošle godine (YoY); tržišno učešće od svih banaka u periodu
+            changed_periods = {period for _, period in changed}
+            affected: Set[Key] = set()
+            for bank, period in changed:
+                affected.update({
+                    (bank, period),
+                    (bank, _shift_period(period, 3)),
+                    (bank, _shift_period(period, 12)),
+                })
+            affected.update(key for key in self.base if key[1] in changed_periods)
+
+            affected_periods = {period for _, period in affected}
+            sector_assets: Dict[int, int] = {}
+            for (bank, period), base in self.base.items():
+                if period in affected_periods:
+                    sector_assets[period] = sector_assets.get(period, 0) + base["Aktiva"]
+
+            for key in affected:
+                self._compute_derived(key, sector_assets)
+            return sum(1 for key in affected if key in self.base)
+
+    def frame(self, bank: Optional[str] = None) -> pd.DataFrame:
+        """
+        Tabela pokazatelja (kolone: banka, balance_date, osnovne i izvedene vrijednosti).
+        Bez bank sadrži banke iz BANKE; ugašene banke ulaze samo u zbir sektora.
+        """
+        records: List[list] = []
+        with self._lock:
+            for (code, period), base in sorted(self.base.items()):
+                if code != bank if bank is not None else code not in BANKE:
+                    continue
+                derived = self.derived.get((code, period), {})
+                records.append(
+                    [code, period]
+                    + [base[c] for c in BASE_COLUMNS]
+                    + [derived.get(c) for c in DERIVED_COLUMNS]
+                )
+        df = pd.DataFrame(records, columns=["banka", "period", *BASE_COLUMNS, *DERIVED_COLUMNS])
+        df["balance_date"] = (
+            pd.to_datetime(df["period"].astype(str), format="%Y%m") + pd.offsets.MonthEnd(0)
+        )
+        df[DERIVED_COLUMNS] = df[DERIVED_COLUMNS].astype("float64")
+        return df[["banka", "balance_date", *BASE_COLUMNS, *DERIVED_COLUMNS]]
+
+    def updated_frame(self, bank: Optional[str] = None, catalog: Optional[Catalog] = None) -> pd.DataFrame:
+        """
+        update(), save() ako je bilo promjena i frame() pod istim lock-om, tako da
+        druga sesija ne mijenja tabelu dok se ona čuva ili čita.
+        """
+        with self._lock:
+            if self.update(catalog=catalog):
+                self.save()
+            return self.frame(bank)
+
+
+def load_and_update(csv_folder: str = BANKE_CSV_FOLDER, path: Path = METRICS_PATH) -> MetricsStore:
+    """Učitava tabelu sa diska, dopunjava je novim fajlovima i čuva ako je bilo promjena."""
+    store = MetricsStore.load(csv_folder, path)
+    if store.update():
+        store.save()
+    return store
+
+
+def main():
+    """Ažurira tabelu pokazatelja i ispisuje poslednji period za svaku banku."""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description="Inkrementalno ažuriranje izvedenih pokazatelja (K/D, rast, tržišno učešće)"
+    )
+    parser.add_argument(
+        "--csv-folder",
+        type=str,
+        default=BANKE_CSV_FOLDER,
+        help=f"Folder sa CSV bilansima (default: {BANKE_CSV_FOLDER})"
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Zanemari sačuvanu tabelu i izračunaj sve ponovo"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    store = MetricsStore(args.csv_folder) if args.rebuild else MetricsStore.load(args.csv_folder)
+    updated = store.update()
+    if updated:
+        store.save()
+    elapsed = time.perf_counter() - start
+    print(f"Ponovo izračunato {updated} od {len(store.base)} redova za {elapsed:.2f}s -> {METRICS_PATH}")
+
+    df = store.frame()
+    if df.empty:
+        return
+    latest = df.groupby("banka").tail(1)
+    for _, row in latest.iterrows():
+        share = row["Tržišno učešće"]
+        share_text = f"{share:.1%}" if pd.notna(share) else "-"
+        print(f"{row['banka']} {row['balance_date']:%Y-%m}: aktiva {row['Aktiva']:,}, tržišno učešće {share_text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+# src/partitions.py
+#
+# Konvertovani podaci kao nepromjenljive particije po (tip, banka, period) i mali
+# manifest sa spiskom živih particija. Particija je CSV sa već pročitanim redovima
+# izvještaja (f_source, Pozicija, Amount); ime sadrži hash sadržaja, pa se fajl
+# nikad ne prepisuje. Novi kvartal ili ispravljen izvještaj = jedna nova particija
+# i atomska zamjena manifesta.
+#
+# Manifest (partitions/manifest.json) ima rastući broj verzije; svaka particija
+# pamti verziju u kojoj je dodata ili izmijenjena, a uklonjene particije ostaju kao
+# "removed" zapisi. Čitalac koji je vidio verziju N zato čita samo particije
+# izmijenjene posle N (vidi PartitionView i api.py), umjesto cijele istorije.
+#
+# Particije objavljuje pdf_to_csv.py posle ažuriranja kataloga (ili ručno:
+# python src/partitions.py).
+
+import csv
+import hashlib
+import io
+import json
+import os
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    from catalog import Catalog, load_or_build_catalog
+    from config import CSV_OUTPUT_FOLDER
+    from dataset import empty_frame, frame_from_reports, read_report
+except ImportError:  # Uvezeno kao paket (npr. iz api.py)
+    from src.catalog import Catalog, load_or_build_catalog
+    from src.config import CSV_OUTPUT_FOLDER
+    from src.dataset import empty_frame, frame_from_reports, read_report
+
+
+PARTITIONS_FOLDER = Path(CSV_OUTPUT_FOLDER) / "partitions"
+MANIFEST_NAME = "manifest.json"
+
+# Verzija formata manifesta i particija; povećaj kada se promijene polja ili kolone
+PARTITIONS_FORMAT = 1
+
+# Particija koja više nije u manifestu se briše tek ovoliko sekundi posle objave
+# manifesta koji je izbacio (ne posle njenog upisa), da je čitalac koji je upravo
+# pročitao stari manifest još može otvoriti
+GC_GRACE_SECONDS = 15 * 60
+
+PARTITION_HEADER = ["f_source", "Pozicija", "Amount"]
+
+Rows = List[Tuple[str, Optional[int]]]
+Report = Tuple[str, pd.Timestamp, Rows]
+
+
+def partition_key(report_type: str, bank: str, period: int) -> str:
+    return f"{report_type}/{bank}/{period}"
+
+
+def split_key(key: str) -> Tuple[str, str, int]:
+    report_type, bank, period = key.split("/")
+    return report_type, bank, int(period)
+
+
+def _period_date(period: int) -> pd.Timestamp:
+    return pd.Timestamp(year=period // 100, month=period % 100, day=1) + pd.offsets.MonthEnd(0)
+
+
+class Manifest:
+    """
+    partitions: ključ ("bs/ckb/202509") -> {file, version, sources}
+    removed: ključ -> verzija u kojoj je particija uklonjena.
+    superseded: fajl particije -> vrijeme (time.time()) kada ga je manifest prestao
+    da koristi; od tog trenutka teče rok za brisanje (vidi _collect_garbage).
+    sources je hash CSV fajlova iz kojih je particija napravljena (iz kataloga),
+    pa se nepromijenjena particija prepoznaje bez čitanja CSV-a.
+    """
+
+    def __init__(self, dataset_id: Optional[str] = None, version: int = 0):
+        # Nasumičan id skupa: ako se manifest obriše i napravi ponovo, verzije kreću
+        # od 1, ali (dataset_id, version) se ne ponavlja
+        self.dataset_id = dataset_id or uuid.uuid4().hex[:8]
+        self.version = version
+        self.updated_at: Optional[str] = None
+        self.partitions: Dict[str, dict] = {}
+        self.removed: Dict[str, int] = {}
+        self.superseded: Dict[str, float] = {}
+
+    @classmethod
+    def load(cls, folder: Path = PARTITIONS_FOLDER) -> Optional["Manifest"]:
+        path = Path(folder) / MANIFEST_NAME
+        if not path.is_file():
+            return None
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != PARTITIONS_FORMAT:
+            return None
+        manifest = cls(data["dataset_id"], data["version"])
+        manifest.updated_at = data.get("updated_at")
+        manifest.partitions = data["partitions"]
+        manifest.removed = data["removed"]
+        manifest.superseded = data.get("superseded", {})
+        return manifest
+
+    @property
+    def data_version(self) -> str:
+        return f"{self.dataset_id}-{self.version}"
+
+    def changes_since(self, version: int) -> Tuple[List[str], List[str]]:
+        """(particije dodate ili izmijenjene posle version, particije uklonjene posle version)."""
+        changed = sorted(key for key, entry in self.partitions.items() if entry["version"] > version)
+        removed = sorted(key for key, removed_in in self.removed.items() if removed_in > version)
+        return changed, removed
+
+    def save(self, folder: Path = PARTITIONS_FOLDER):
+        """Atomska zamjena: čitaoci vide ili stari ili novi manifest, nikad polovičan."""
+        folder = Path(folder)
+        folder.mkdir(parents=True, exist_ok=True)
+        self.updated_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        data = {
+            "format": PARTITIONS_FORMAT,
+            "dataset_id": self.dataset_id,
+            "version": self.version,
+            "updated_at": self.updated_at,
+            "partitions": self.partitions,
+            "removed": self.removed,
+            "superseded": self.superseded,
+        }
+        tmp_path = folder / (MANIFEST_NAME + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path.replace(folder / MANIFEST_NAME)
+
+
+def _sources_digest(rels: Iterable[str], catalog: Catalog) -> str:
+    digest = hashlib.sha1()
+    for rel in sorted(rels):
+        digest.update(f"{rel}:{catalog.entries[rel]['sha1']};".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _encode_partition(reports: List[Report]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(PARTITION_HEADER)
+    for name, _, rows in reports:
+        for label, amount in rows:
+            writer.writerow([name, label, "" if amount is None else amount])
+    return buffer.getvalue().encode("utf-8")
+
+
+def read_partition(path: Path, period: int) -> List[Report]:
+    """Izvještaji iz particije (ime izvornog fajla, datum bilansa, redovi), redom kao u fajlu."""
+    date = _period_date(period)
+    reports: Dict[str, Rows] = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for name, label, amount in reader:
+            reports.setdefault(name, []).append((label, int(amount) if amount else None))
+    return [(name, date, rows) for name, rows in reports.items()]
+
+
+def publish_partitions(
+    catalog: Optional[Catalog] = None,
+    folder: Path = PARTITIONS_FOLDER,
+    gc_grace_seconds: float = GC_GRACE_SECONDS,
+) -> Tuple[Manifest, List[str]]:
+    """
+    Usklađuje particije sa katalogom: piše particije samo za (tip, banka, period)
+    čiji su se CSV fajlovi promijenili, pa (ako ima promjena) novi manifest.
+    Vraća (manifest, izmijenjeni i uklonjeni ključevi).
+    """
+    catalog = catalog or load_or_build_catalog()
+    folder = Path(folder)
+    manifest = Manifest.load(folder) or Manifest()
+    root = Path(catalog.csv_folder)
+
+    groups: Dict[str, List[str]] = defaultdict(list)
+    for rel, entry in catalog.entries.items():
+        groups[partition_key(entry["report_type"], entry["bank"], entry["period"])].append(rel)
+
+    now = time.time()
+    new_version = manifest.version + 1
+    changed: List[str] = []
+    live = set()
+    dirty = False
+    for key, rels in sorted(groups.items()):
+        sources = _sources_digest(rels, catalog)
+        current = manifest.partitions.get(key)
+        if current is not None and current["sources"] == sources:
+            live.add(key)
+            continue
+
+        # Isti redosled kao load_bank_frame (po imenu fajla); stari format se preskače
+        report_type, bank, period = split_key(key)
+        reports = []
+        for rel in sorted(rels, key=lambda r: Path(r).name):
+            rows = read_report(root / rel)
+            if rows:
+                reports.append((Path(rel).name, _period_date(period), rows))
+        if not reports:
+            continue
+        live.add(key)
+
+        body = _encode_partition(reports)
+        file_name = f"{report_type}/{bank}/{period}-{hashlib.sha1(body).hexdigest()[:12]}.csv"
+        if current is not None and current["file"] == file_name:
+            # Drugi izvorni fajlovi, isti sadržaj: particija se ne mijenja
+            current["sources"] = sources
+            dirty = True
+            continue
+        path = folder / file_name
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + ".tmp")
+            tmp_path.write_bytes(body)
+            tmp_path.replace(path)
+        if current is not None:
+            manifest.superseded.setdefault(current["file"], now)
+        manifest.partitions[key] = {"file": file_name, "version": new_version, "sources": sources}
+        manifest.removed.pop(key, None)
+        changed.append(key)
+
+    for key in sorted(set(manifest.partitions) - live):
+        manifest.superseded.setdefault(manifest.partitions[key]["file"], now)
+        del manifest.partitions[key]
+        manifest.removed[key] = new_version
+        changed.append(key)
+
+    if changed:
+        manifest.version = new_version
+    # Brisanje ide prije upisa manifesta: novi manifest ne koristi nijedan obrisan fajl,
+    # a nova vremena u superseded se čuvaju zajedno sa njim
+    gc_changed = _collect_garbage(manifest, folder, gc_grace_seconds, now)
+    if changed or dirty or gc_changed or not (folder / MANIFEST_NAME).exists():
+        manifest.save(folder)
+    return manifest, sorted(changed)
+
+
+def _collect_garbage(manifest: Manifest, folder: Path, grace_seconds: float, now: float) -> bool:
+    """
+    Briše particije koje manifest ne koristi duže od grace_seconds (po manifest.superseded).
+    Fajl bez zapisa (npr. iz prekinutog objavljivanja) dobija zapis sa vremenom now.
+    Vraća True ako je manifest.superseded izmijenjen.
+    """
+    referenced = {entry["file"] for entry in manifest.partitions.values()}
+    updated = False
+    for rel in referenced & set(manifest.superseded):
+        # Isti sadržaj je ponovo objavljen pod istim imenom
+        del manifest.superseded[rel]
+        updated = True
+    on_disk = set()
+    for path in folder.glob("*/*/*.csv"):
+        rel = path.relative_to(folder).as_posix()
+        if rel in referenced:
+            continue
+        superseded_at = manifest.superseded.get(rel)
+        if superseded_at is None:
+            manifest.superseded[rel] = now
+            updated = True
+            on_disk.add(rel)
+        elif now - superseded_at > grace_seconds:
+            path.unlink(missing_ok=True)
+            del manifest.superseded[rel]
+            updated = True
+        else:
+            on_disk.add(rel)
+    for rel in set(manifest.superseded) - on_disk:
+        # Fajl je već obrisan (npr. ručno)
+        del manifest.superseded[rel]
+        updated = True
+    return updated
+
+
+class PartitionView:
+    """
+    Čitalac particija u memoriji. refresh() čita manifest i učitava samo particije
+    izmijenjene od verzije koju je view poslednji put vidio.
+    """
+
+    def __init__(self, folder: Path = PARTITIONS_FOLDER, report_types: Optional[Tuple[str, ...]] = None):
+        self.folder = Path(folder)
+        # Samo ovi tipovi izvještaja se drže u memoriji (None = svi)
+        self.report_types = report_types
+        self.dataset_id: Optional[str] = None
+        self.version = 0
+        self.files: Dict[str, str] = {}
+        self.reports: Dict[str, List[Report]] = {}
+        # Statistika poslednjeg refresh-a; full_reload znači da je sve učitano iz početka
+        self.partitions_read = 0
+        self.full_reload = False
+
+    @property
+    def data_version(self) -> Optional[str]:
+        return f"{self.dataset_id}-{self.version}" if self.dataset_id else None
+
+    def refresh(self) -> Optional[List[str]]:
+        """
+        Vraća ključeve particija koje su se promijenile (prazna lista = ništa novo),
+        ili None ako manifesta nema.
+        """
+        self.partitions_read = 0
+        self.full_reload = False
+        manifest = Manifest.load(self.folder)
+        if manifest is None:
+            return None
+        if manifest.dataset_id == self.dataset_id and manifest.version == self.version:
+            return []
+        if manifest.dataset_id != self.dataset_id:
+            # Drugi skup podataka (npr. manifest napravljen iz početka): učitaj sve
+            self.files.clear()
+            self.reports.clear()
+            self.full_reload = True
+            changed, removed = sorted(manifest.partitions), []
+        else:
+            changed, removed = manifest.changes_since(self.version)
+        if self.report_types is not None:
+            changed = [key for key in changed if split_key(key)[0] in self.report_types]
+            removed = [key for key in removed if split_key(key)[0] in self.report_types]
+
+        for key in removed:
+            self.files.pop(key, None)
+            self.reports.pop(key, None)
+        for key in changed:
+            entry = manifest.partitions[key]
+            if self.files.get(key) == entry["file"]:
+                continue
+            self.reports[key] = read_partition(self.folder / entry["file"], split_key(key)[2])
+            self.files[key] = entry["file"]
+            self.partitions_read += 1
+        self.dataset_id, self.version = manifest.dataset_id, manifest.version
+        return sorted(set(changed) | set(removed))
+
+    def banks(self, report_type: str = "bs") -> List[str]:
+        """Sve banke sa bar jednom particijom (i one koje više ne postoje)."""
+        return sorted({split_key(key)[1] for key in self.reports if split_key(key)[0] == report_type})
+
+    def bank_frame(self, bank: str, report_type: str = "bs", min_year: Optional[int] = None) -> pd.DataFrame:
+        """Isto što i load_bank_frame nad CSV fajlovima banke, ali iz učitanih particija."""
+        reports: List[Report] = []
+        for key, partition in self.reports.items():
+            key_type, key_bank, period = split_key(key)
+            if key_type != report_type or key_bank != bank:
+                continue
+            if min_year is not None and period // 100 < min_year:
+                continue
+            reports.extend(partition)
+        if not reports:
+            return empty_frame()
+        return frame_from_reports(sorted(reports, key=lambda report: report[0]))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Objavljuje konvertovane bilanse kao nepromjenljive particije po banci i periodu"
+    )
+    parser.add_argument(
+        "--since",
+        type=int,
+        default=None,
+        help="Ispiši particije izmijenjene posle ove verzije manifesta"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest, changed = publish_partitions()
+    print(
+        f"Particije ({PARTITIONS_FOLDER}): verzija {manifest.version}, {len(manifest.partitions)} živih, "
+        f"izmijenjeno/uklonjeno sada: {len(changed)} ({time.perf_counter() - start:.2f}s)"
+    )
+    if args.since is not None:
+        updated, removed = manifest.changes_since(args.since)
+        print(f"Posle verzije {args.since}: {len(updated)} izmijenjenih, {len(removed)} uklonjenih")
+        for key in updated:
+            print(f"  + {key} ({manifest.partitions[key]['file']})")
+        for key in removed:
+            print(f"  - {key}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# src/pdf_layout.py
+#
+# Brzi parser za bilanse CBCG ("_bs" / "_bu" PDF-ovi).
+# Izvještaji imaju fiksan raspored kolona (opciono R. br., naziv pozicije, IZNOS),
+# pa umjesto opšte detekcije linija i ivica (page.extract_tables()) riječi sa
+# stranice čitamo jednom, zajedno sa x koordinatama, i raspoređujemo ih po kolonama
+# na osnovu pozicija iz zaglavlja tabele.
+
+import re
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class LayoutSettings:
+    """Podešavanja parsera; ulaze i u ključ keša ekstrakcije."""
+    # Riječi čiji se "top" razlikuje manje od ovoga pripadaju istom redu (u pt)
+    line_tolerance: float = 3.0
+    # Tolerancija pri spajanju slova u riječi (prosleđuje se pdfplumber-u)
+    x_tolerance: float = 1.5
+    # Riječ je u koloni R. br. ako završava lijevo od (x0 naziva kolone - ova margina)
+    column_margin: float = 2.0
+    # Red koji je od prethodnog udaljen više od ovoliko prosječnih razmaka završava tabelu
+    max_line_gap: float = 3.0
+    # Minimalan broj redova sa podacima da bi tabela bila validna
+    min_rows: int = 5
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+AMOUNT_HEADER = "IZNOS"
+
+_AMOUNT_RE = re.compile(r"^-?\(?\d{1,3}(?:[.,]\d{3})*\)?$|^-?\(?\d+\)?$|^-$")
+# Početak pozicije: "1.", "2.a.", "17.b.", "I.", "XII.", "PR 1.", "1)"
+_CODE_RE = re.compile(r"^(?:PR\s+)?(?:\d+\.(?:[a-z]\.)?|[IVXLC]+\.|\d+\))")
+_LEADING_NUMBER_RE = re.compile(r"^(?:PR\s+)?(\d+)\.")
+
+
+@dataclass
+class ExtractionStats:
+    """Brojači za izvještaj o tome koliko je fajlova/stranica išlo kojim putem."""
+    files_layout: int = 0
+    files_fallback: int = 0
+    pages_layout: int = 0
+    pages_fallback: int = 0
+    layout_seconds: float = 0.0
+    # Ukupno vrijeme stranica na rezervnom putu (neuspjeli layout pokušaj + extract_tables())
+    fallback_seconds: float = 0.0
+    fallback_reasons: dict = field(default_factory=dict)
+    # Fajlovi čije su tabele uzete iz keša ekstrakcije (vidi extraction_cache.py)
+    files_cached: int = 0
+    # Fajlovi čije čitanje je prekinuto greškom (rezultat se ne kešira)
+    read_errors: int = 0
+    # Poruka poslednje greške čitanja (za karantin; ne sabira se u merge())
+    read_error: Optional[str] = None
+
+    def add_fallback_reason(self, reason: str):
+        self.fallback_reasons[reason] = self.fallback_reasons.get(reason, 0) + 1
+
+    def merge(self, other: "ExtractionStats"):
+        """Dodaje brojače iz drugog objekta (npr. vraćenog iz radnog procesa)."""
+        self.files_layout += other.files_layout
+        self.files_fallback += other.files_fallback
+        self.pages_layout += other.pages_layout
+        self.pages_fallback += other.pages_fallback
+        self.layout_seconds += other.layout_seconds
+        self.fallback_seconds += other.fallback_seconds
+        self.files_cached += other.files_cached
+        self.read_errors += other.read_errors
+        for reason, count in other.fallback_reasons.items():
+            self.fallback_reasons[reason] = self.fallback_reasons.get(reason, 0) + count
+
+    def speedup(self) -> Optional[float]:
+        """
+        Koliko je puta stranica koju riješi layout parser jeftinija od stranice na
+        rezervnom putu (obje uključuju prvo, "hladno" čitanje znakova stranice).
+        """
+        if not self.pages_layout or not self.pages_fallback or not self.layout_seconds:
+            return None
+        per_page_layout = self.layout_seconds / self.pages_layout
+        per_page_fallback = self.fallback_seconds / self.pages_fallback
+        return per_page_fallback / per_page_layout
+
+    def print_summary(self):
+        print(f"  Layout parser: {self.files_layout} fajlova ({self.pages_layout} stranica)")
+        print(f"  extract_tables() fallback: {self.files_fallback} fajlova ({self.pages_fallback} stranica)")
+        if self.files_cached:
+            print(f"  Iz keša ekstrakcije (bez čitanja PDF-a): {self.files_cached} fajlova")
+        if self.pages_layout:
+            print(f"  Prosječno po stranici (layout): {self.layout_seconds / self.pages_layout * 1000:.1f} ms")
+        if self.pages_fallback:
+            print(f"  Prosječno po stranici (rezervni put): {self.fallback_seconds / self.pages_fallback * 1000:.1f} ms")
+        speedup = self.speedup()
+        if speedup is not None:
+            print(f"  Ubrzanje po stranici (layout u odnosu na rezervni put): {speedup:.1f}x")
+        for reason, count in sorted(self.fallback_reasons.items(), key=lambda x: -x[1]):
+            print(f"    fallback ({count}x): {reason}")
+
+
+def _group_lines(words: List[dict], tolerance: float) -> List[List[dict]]:
+    """Grupiše riječi u redove po vertikalnoj poziciji i sortira ih s lijeva na desno."""
+    lines: List[List[dict]] = []
+    current: List[dict] = []
+    current_top: Optional[float] = None
+    for word in sorted(words, key=lambda w: (round(w["top"], 1), w["x0"])):
+        if current_top is not None and abs(word["top"] - current_top) > tolerance:
+            lines.append(sorted(current, key=lambda w: w["x0"]))
+            current = []
+        if not current:
+            current_top = word["top"]
+        current.append(word)
+    if current:
+        lines.append(sorted(current, key=lambda w: w["x0"]))
+    return lines
+
+
+def _find_header(lines: List[List[dict]]) -> Optional[Tuple[int, dict, dict]]:
+    """Vraća (indeks reda, riječ IZNOS, prva riječ naziva kolone) za zaglavlje tabele."""
+    for i, line in enumerate(lines):
+        amount_words = [w for w in line if w["text"].upper() == AMOUNT_HEADER]
+        if not amount_words:
+            continue
+        amount_word = amount_words[-1]
+        label_words = [
+            w for w in line
+            if w is not amount_word and w["x1"] < amount_word["x0"] and w["text"] not in ("R.", "br.", "R.br.")
+        ]
+        if label_words:
+            return i, amount_word, label_words[0]
+    return None
+
+
+def extract_layout_table(page: Any, settings: LayoutSettings = LayoutSettings()) -> List[List[str]]:
+    """
+    Čita riječi sa stranice i slaže ih u redove tabele [R. br.,] naziv, iznos.
+    Kolone se određuju iz x pozicija zaglavlja (kolona IZNOS i naziv pozicije).
+    Vraća praznu listu ako zaglavlje nije pronađeno.
+    """
+    words = page.extract_words(x_tolerance=settings.x_tolerance, keep_blank_chars=False)
+    lines = _group_lines(words, settings.line_tolerance)
+
+    header = _find_header(lines)
+    if header is None:
+        return []
+    header_idx, amount_word, label_word = header
+
+    amount_x0 = amount_word["x0"]
+    code_limit = label_word["x0"] - settings.column_margin
+
+    # Na stranicama koje nastavljaju tabelu sa prethodne stranice zaglavlje
+    # (npr. "Kapital IZNOS") dolazi tek posle prvih pozicija; uključi i njih
+    start_idx = header_idx
+    while start_idx > 0 and _CODE_RE.match(lines[start_idx - 1][0]["text"]) and lines[start_idx - 1][0]["x0"] < amount_x0:
+        start_idx -= 1
+
+    # Prosječan razmak između redova, da prepoznamo kraj tabele
+    tops = [line[0]["top"] for line in lines[start_idx:]]
+    gaps = [b - a for a, b in zip(tops, tops[1:]) if b > a]
+    typical_gap = statistics.median(gaps) if gaps else 0.0
+
+    rows: List[Tuple[str, str, str, bool]] = []  # (R. br., naziv, iznos, nastavak dozvoljen)
+    has_code_column = False
+    previous_top: Optional[float] = None
+
+    for line in lines[start_idx:]:
+        top = line[0]["top"]
+        if previous_top is not None and typical_gap and top - previous_top > settings.max_line_gap * typical_gap:
+            break
+
+        code_words, label_words, amount_words = [], [], []
+        for word in line:
+            text = word["text"]
+            if word["x1"] > amount_x0 and (_AMOUNT_RE.match(text) or text.upper() == AMOUNT_HEADER):
+                amount_words.append(text)
+            elif word["x1"] <= code_limit:
+                code_words.append(text)
+            else:
+                label_words.append(text)
+
+        code = " ".join(code_words)
+        label = " ".join(label_words)
+        amount = " ".join(amount_words)
+        if code:
+            has_code_column = True
+
+        # Red bez šifre, iznosa i oznake nove pozicije je nastavak prethodnog naziva
+        is_continuation = (
+            rows
+            and not code
+            and not amount
+            and label
+            and not _CODE_RE.match(label)
+            and rows[-1][3]
+        )
+        if is_continuation:
+            prev_code, prev_label, prev_amount, _ = rows[-1]
+            rows[-1] = (prev_code, f"{prev_label} {label}", prev_amount, True)
+        else:
+            # Nastavak ima smisla samo za redove sa nazivom (ne za zaglavlje)
+            rows.append((code, label, amount, amount.upper() != AMOUNT_HEADER))
+        previous_top = top
+
+    if has_code_column:
+        return [[code, label, amount] for code, label, amount, _ in rows]
+    return [[label, amount] for _, label, amount, _ in rows]
+
+
+def validate_layout_table(table: List[List[str]], settings: LayoutSettings = LayoutSettings()) -> Tuple[bool, str]:
+    """
+    Provjerava da li rezultat layout parsera liči na bilans:
+    dovoljno redova, ispravni iznosi, rastuća numeracija pozicija, bez (cid:) znakova.
+    Vraća (True, "") ili (False, razlog).
+    """
+    if not table:
+        return False, "zaglavlje sa kolonom IZNOS nije pronađeno"
+
+    data_rows = [row for row in table if row[-1].upper() != AMOUNT_HEADER]
+    if len(data_rows) < settings.min_rows:
+        return False, f"premalo redova ({len(data_rows)})"
+
+    last_number = 0
+    coded_rows = 0
+    for row in data_rows:
+        text = " ".join(row)
+        if "(cid:" in text:
+            return False, "nečitljiv font (cid)"
+        amount = row[-1]
+        if amount and not _AMOUNT_RE.match(amount):
+            return False, f"neispravan iznos '{amount}'"
+
+        position = row[0] if len(row) == 3 and row[0] else row[-2]
+        match = _LEADING_NUMBER_RE.match(position)
+        if match:
+            coded_rows += 1
+            number = int(match.group(1))
+            if number < last_number:
+                return False, f"numeracija pozicija nije rastuća ({last_number} -> {number})"
+            last_number = number
+
+    if coded_rows < len(data_rows) / 2:
+        return False, "većina redova nema šifru pozicije"
+
+    return True, ""
+
+
+def timed_layout_extract(page: Any, settings: LayoutSettings) -> Tuple[List[List[str]], bool, str, float]:
+    """Pokreće layout parser i validaciju; vraća (tabela, validna, razlog, trajanje u s)."""
+    start = time.perf_counter()
+    table = extract_layout_table(page, settings)
+    ok, reason = validate_layout_table(table, settings)
+    return table, ok, reason, time.perf_counter() - start
@@ -3,69 +3,197 @@
 import os
 from pathlib import Path
 import csv
-from typing import List, Optional
+import re
+import time
+from typing import Iterator, List, Optional, Tuple, Union
 
 try:
     import pdfplumber
 except ImportError:
     pdfplumber = None
 
-from config import DOWNLOAD_FOLDER
+from catalog import update_catalog
+from cube import update_cube
+from config import (
+    BANKE_CSV_FOLDER,
+    CSV_OUTPUT_FOLDER,
+    DOWNLOAD_FOLDER,
+    EXTRACTION_CACHE_FOLDER,
+    PROFILE_FOLDER,
+    QUARANTINE_FILE,
+)
+from dataset import split_position
+from extraction_cache import ExtractionCache
+from journal import RunJournal
+from partitions import publish_partitions
+from pdf_layout import AMOUNT_HEADER, ExtractionStats, LayoutSettings, timed_layout_extract
+from priority import by_priority
+from profiling import Profiler, measure
+from quarantine import Quarantine
+from workers import WorkerPool
 
 
-def extract_tables_from_pdf(pdf_path: Path) -> List[List[List[str]]]:
+# Svi razmaci, tabovi i novi redovi u ćeliji se svode na jedan razmak
+_WHITESPACE_RE = re.compile(r"\s+")
+# Iznos u hiljadama: "83318", "83,318", "1.916.315", "-665", "(665)"
+_AMOUNT_CELL_RE = re.compile(r"^(\()?(-)?(\d{1,3}(?:([.,])\d{3})(?:\4\d{3})*|\d+)\)?$")
+
+Cell = Union[str, int]
+
+
+def iter_tables_from_pdf(
+    pdf_path: Path,
+    stats: Optional[ExtractionStats] = None,
+    use_layout: bool = True,
+    layout_settings: LayoutSettings = LayoutSettings(),
+) -> Iterator[List[List[str]]]:
     """
-    Ekstraktuje sve tabele iz PDF fajla.
-    Vraća listu tabela, gde je svaka tabela lista redova, a svaki red lista ćelija.
+    Vraća tabele iz PDF fajla jednu po jednu, stranicu po stranicu.
+    Svaka tabela je lista redova, a svaki red lista ćelija.
+
+    Posle svake stranice se briše keš pdfplumber-a za tu stranicu (page.close()),
+    pa memorija ne raste sa brojem stranica.
+
+    Prvo se pokušava brzi layout parser (vidi pdf_layout.py); page.extract_tables()
+    se koristi samo za stranice na kojima rezultat ne prođe validaciju.
     """
     if pdfplumber is None:
         raise ImportError(
             "pdfplumber nije instaliran. Pokreni 'pip install pdfplumber'"
         )
-    
-    tables = []
+
+    used_fallback = False
     try:
         with pdfplumber.open(pdf_path) as pdf:
             for page_num, page in enumerate(pdf.pages, 1):
-                # Pokušaj da ekstraktuješ tabele sa stranice
-                page_tables = page.extract_tables()
-                if page_tables:
-                    tables.extend(page_tables)
-                    print(f"  Stranica {page_num}: pronađeno {len(page_tables)} tabela")
+                try:
+                    page_tables, fallback = _extract_page_tables(page, page_num, stats, use_layout, layout_settings)
+                finally:
+                    page.close()
+                used_fallback = used_fallback or fallback
+                yield from page_tables
     except Exception as e:
         print(f"  Greška pri čitanju PDF-a: {e}")
-    
-    return tables
+        if stats is not None:
+            stats.read_errors += 1
+            stats.read_error = f"greška pri čitanju PDF-a: {e}"
+
+    if stats is not None:
+        if used_fallback:
+            stats.files_fallback += 1
+        else:
+            stats.files_layout += 1
 
 
-def clean_table(table: List[List[Optional[str]]]) -> List[List[str]]:
+def _extract_page_tables(
+    page,
+    page_num: int,
+    stats: Optional[ExtractionStats],
+    use_layout: bool,
+    layout_settings: LayoutSettings,
+) -> Tuple[List[List[List[str]]], bool]:
     """
-    Čisti tabelu: uklanja None vrednosti i pretvara u stringove.
+    Tabele sa jedne stranice; drugi element kaže da li je korišćen extract_tables().
+    Stranici na rezervnom putu se računa i neuspjeli pokušaj layout parsera: on je
+    prvi pročitao znakove stranice (pdfplumber ih kešira), pa bi samo vrijeme
+    extract_tables() bilo vrijeme "toplog" parsera i ubrzanje bi izgledalo manje.
     """
-    cleaned = []
-    for row in table:
-        if row is None:
-            continue
-        cleaned_row = []
-        for cell in row:
-            if cell is None:
-                cleaned_row.append("")
-            else:
-                # Ukloni višestruke razmake i novi red
-                cleaned_cell = str(cell).strip().replace("\n", " ").replace("\r", "")
-                # Zamijeni višestruke razmake jednim
-                while "  " in cleaned_cell:
-                    cleaned_cell = cleaned_cell.replace("  ", " ")
-                cleaned_row.append(cleaned_cell)
-        # Preskoči potpuno prazne redove
-        if any(cell.strip() for cell in cleaned_row):
-            cleaned.append(cleaned_row)
+    start = time.perf_counter()
+    if use_layout:
+        layout_table, ok, reason, elapsed = timed_layout_extract(page, layout_settings)
+        if ok:
+            if stats is not None:
+                stats.pages_layout += 1
+                stats.layout_seconds += elapsed
+            return [layout_table], False
+        if stats is not None:
+            stats.add_fallback_reason(reason)
+
+    # Pokušaj da ekstraktuješ tabele sa stranice
+    page_tables = page.extract_tables()
+    if stats is not None:
+        stats.pages_fallback += 1
+        stats.fallback_seconds += time.perf_counter() - start
+    if page_tables:
+        print(f"  Stranica {page_num}: pronađeno {len(page_tables)} tabela")
+    return page_tables or [], True
+
+
+def extract_tables_from_pdf(
+    pdf_path: Path,
+    stats: Optional[ExtractionStats] = None,
+    use_layout: bool = True,
+    layout_settings: LayoutSettings = LayoutSettings(),
+) -> List[List[List[str]]]:
+    """
+    Ekstraktuje sve tabele iz PDF fajla.
+    Vraća listu tabela, gde je svaka tabela lista redova, a svaki red lista ćelija.
+    """
+    return list(iter_tables_from_pdf(pdf_path, stats, use_layout, layout_settings))
+
+
+def normalize_cell(cell: Optional[str]) -> str:
+    """Uklanja višestruke razmake i nove redove iz ćelije."""
+    if cell is None:
+        return ""
+    return _WHITESPACE_RE.sub(" ", str(cell)).strip()
+
+
+def parse_amount_cell(text: str) -> Optional[int]:
+    """
+    Pretvara iznos iz PDF-a u ceo broj ("83,318" -> 83318, "(665)" -> -665).
+    Vraća None ako ćelija nije iznos.
+    """
+    match = _AMOUNT_CELL_RE.match(text.replace(" ", ""))
+    if match is None:
+        return None
+    value = int(re.sub(r"[.,]", "", match.group(3)))
+    return -value if match.group(1) or match.group(2) else value
+
+
+def normalize_label(label: str) -> str:
+    """Naziv pozicije sa šifrom odvojenom jednim razmakom ("2.a.Krediti" -> "2.a. Krediti")."""
+    code, name = split_position(label)
+    if not code:
+        return label
+    return f"{code} {name}" if name else code
+
+
+def clean_table(table: List[List[Optional[str]]]) -> List[List[Cell]]:
+    """
+    Čisti tabelu i tipizira ćelije:
+    - tekst bez višestrukih razmaka i novih redova,
+    - naziv pozicije sa normalizovanom šifrom,
+    - iznosi u koloni IZNOS (ili poslednjoj koloni) kao celi brojevi.
+    Prazni redovi se preskaču.
+    """
+    rows = [[normalize_cell(cell) for cell in row] for row in table if row is not None]
+    rows = [row for row in rows if any(row)]
+    if not rows:
+        return []
+
+    header = [cell.upper() for cell in rows[0]]
+    amount_idx = header.index(AMOUNT_HEADER) if AMOUNT_HEADER in header else len(header) - 1
+    # Naziv je prva kolona koja nije "R. br." (kod starijih izvještaja šifra ima svoju kolonu)
+    label_idx = 1 if header and header[0] in ("R. BR.", "R.BR.") else 0
+
+    cleaned: List[List[Cell]] = []
+    for row in rows:
+        typed_row: List[Cell] = list(row)
+        if label_idx < len(row) and label_idx != amount_idx:
+            typed_row[label_idx] = normalize_label(row[label_idx])
+        if amount_idx < len(row):
+            amount = parse_amount_cell(row[amount_idx])
+            if amount is not None:
+                typed_row[amount_idx] = amount
+        cleaned.append(typed_row)
     return cleaned
 
 
-def save_table_to_csv(table: List[List[str]], csv_path: Path, table_num: int = 1):
+def save_table_to_csv(table: List[List[Cell]], csv_path: Path, table_num: int = 1):
     """
-    Čuva tabelu u CSV fajl.
+    Čuva tabelu u CSV fajl. Iznosi se upisuju kao obični celi brojevi (83318),
+    bez separatora hiljada.
     """
     try:
         with open(csv_path, "w", newline="", encoding="utf-8") as f:
@@ -77,49 +205,98 @@ def save_table_to_csv(table: List[List[str]], csv_path: Path, table_num: int = 1
         print(f"    Greška pri čuvanju CSV-a {csv_path}: {e}")
 
 
-def convert_pdf_to_csv(pdf_path: Path, output_folder: Path) -> int:
+def convert_pdf_to_csv(
+    pdf_path: Path,
+    output_folder: Path,
+    stats: Optional[ExtractionStats] = None,
+    use_layout: bool = True,
+    cache: Optional[ExtractionCache] = None,
+    layout_settings: LayoutSettings = LayoutSettings(),
+) -> int:
     """
     Konvertuje jedan PDF fajl u CSV fajlove (jedan CSV po tabeli).
+    Tabele se upisuju čim se pročitaju, bez držanja cijelog dokumenta u memoriji.
+    Sa kešom (vidi extraction_cache.py) se sirove tabele uzimaju iz keša ako postoje,
+    a inače se posle čitanja PDF-a upisuju u keš.
     Vraća broj tabela koje je uspešno konvertovao.
     """
     print(f"\nObrađujem: {pdf_path.name}")
-    
-    tables = extract_tables_from_pdf(pdf_path)
-    
-    if not tables:
-        print(f"  Nema tabela u PDF-u")
-        return 0
-    
-    # Kreiraj output folder ako ne postoji
-    output_folder.mkdir(parents=True, exist_ok=True)
-    
+    stats = stats if stats is not None else ExtractionStats()
+
     # Baza imena za CSV fajlove (bez .pdf ekstenzije)
     base_name = pdf_path.stem
-    
-    saved_count = 0
+
+    tables = None
+    if cache is not None:
+        key = cache.key(pdf_path, use_layout, layout_settings)
+        tables = cache.get(key)
+        if tables is not None:
+            stats.files_cached += 1
+    if tables is None:
+        tables = iter_tables_from_pdf(pdf_path, stats=stats, use_layout=use_layout, layout_settings=layout_settings)
+        if cache is not None:
+            errors_before = stats.read_errors
+            tables = cache.recording(key, pdf_path, tables, ok=lambda: stats.read_errors == errors_before)
+
+    saved_paths: List[Path] = []
     for i, table in enumerate(tables, 1):
         cleaned_table = clean_table(table)
-        
+
         if not cleaned_table:
             continue
-        
-        # Ako ima više tabela, dodaj broj u ime fajla
-        if len(tables) > 1:
-            csv_filename = f"{base_name}_table_{i}.csv"
-        else:
-            csv_filename = f"{base_name}.csv"
-        
-        csv_path = output_folder / csv_filename
+
+        # Kreiraj output folder ako ne postoji
+        output_folder.mkdir(parents=True, exist_ok=True)
+
+        # Broj tabela nije unaprijed poznat; ako bude samo jedna, preimenuje se ispod
+        csv_path = output_folder / f"{base_name}_table_{i}.csv"
         save_table_to_csv(cleaned_table, csv_path, i)
-        saved_count += 1
-    
-    return saved_count
+        saved_paths.append(csv_path)
+
+    if not saved_paths:
+        print(f"  Nema tabela u PDF-u")
+        return 0
+
+    if len(saved_paths) == 1:
+        saved_paths[0].replace(output_folder / f"{base_name}.csv")
+
+    return len(saved_paths)
+
+
+def _convert_task(
+    task: Tuple[Path, Path, bool, Optional[Path], Optional[str]]
+) -> Tuple[int, ExtractionStats, Optional[dict], Optional[str]]:
+    """
+    Zadatak za radni proces: konvertuje jedan PDF i vraća (broj tabela, statistiku, profil,
+    grešku čitanja ili None). PDF koji se ne može pročitati do kraja ide u karantin.
+    Ako je data putanja profila, konverzija se mjeri (cProfile + tracemalloc, vidi profiling.py).
+    Ako je dat folder keša ekstrakcije, sirove tabele se čitaju iz njega / upisuju u njega.
+    """
+    pdf_path, output_folder, use_layout, profile_path, cache_folder = task
+    stats = ExtractionStats()
+    cache = ExtractionCache(cache_folder) if cache_folder else None
+    if profile_path is None:
+        tables_count = convert_pdf_to_csv(pdf_path, output_folder, stats=stats, use_layout=use_layout, cache=cache)
+        return tables_count, stats, None, stats.read_error
+    with measure(pdf_path.name, profile_path) as record:
+        tables_count = convert_pdf_to_csv(pdf_path, output_folder, stats=stats, use_layout=use_layout, cache=cache)
+    return tables_count, stats, record, stats.read_error
 
 
 def convert_all_pdfs_to_csv(
     pdf_folder: str = DOWNLOAD_FOLDER,
-    output_folder: str = "data/csv_output",
-    recursive: bool = True
+    output_folder: str = CSV_OUTPUT_FOLDER,
+    recursive: bool = True,
+    use_layout: bool = True,
+    workers: int = 1,
+    max_worker_memory_mb: Optional[float] = None,
+    timeout: Optional[float] = 120.0,
+    quarantine_file: Optional[str] = QUARANTINE_FILE,
+    retry_quarantined: bool = False,
+    profiler: Optional[Profiler] = None,
+    pdf_files: Optional[List[Path]] = None,
+    journal: Optional[RunJournal] = None,
+    extraction_cache_folder: Optional[str] = EXTRACTION_CACHE_FOLDER,
 ):
     """
     Konvertuje sve PDF fajlove iz foldera u CSV fajlove.
@@ -128,6 +305,17 @@ def convert_all_pdfs_to_csv(
         pdf_folder: Folder gde se nalaze PDF fajlovi
         output_folder: Folder gde će se čuvati CSV fajlovi
         recursive: Da li da traži PDF fajlove rekurzivno u podfolderima
+        use_layout: Da li da koristi brzi layout parser (sa extract_tables() kao rezervom)
+        workers: Broj radnih procesa (0 = sve u ovom procesu)
+        max_worker_memory_mb: Radni proces čiji RSS pređe ovu granicu se zamjenjuje novim
+        timeout: Najduže trajanje konverzije jednog fajla u sekundama (samo sa workers > 0)
+        quarantine_file: JSON sa fajlovima koji su zaglavili/srušili radnika (None = bez karantina)
+        retry_quarantined: Pokušaj ponovo i fajlove iz karantina
+        profiler: Ako je dat, mjere se faze i konverzija svakog fajla (i u radnim procesima)
+        pdf_files: Ako je dat, konvertuju se samo ovi fajlovi iz pdf_folder (npr. novi, vidi watch.py)
+        journal: Dnevnik pokretanja (vidi journal.py); u nastavljenom pokretanju se lista
+            fajlova uzima iz dnevnika, a već obrađeni fajlovi se preskaču
+        extraction_cache_folder: Keš sirovih tabela (vidi extraction_cache.py; None = bez keša)
     """
     if pdfplumber is None:
         print("ERROR: pdfplumber nije instaliran.")
@@ -141,38 +329,105 @@ def convert_all_pdfs_to_csv(
         print(f"ERROR: Folder {pdf_folder} ne postoji!")
         return
     
+    profiler = profiler or Profiler("convert", enabled=False)
+
     # Pronađi sve PDF fajlove
-    if recursive:
-        pdf_files = list(pdf_dir.rglob("*.pdf"))
-    else:
-        pdf_files = list(pdf_dir.glob("*.pdf"))
+    with profiler.stage("pronalazenje"):
+        if journal is not None and journal.listing is not None:
+            pdf_files = [pdf_dir / rel for rel in journal.listing]
+        elif pdf_files is not None:
+            pdf_files = [Path(f) for f in pdf_files]
+        elif recursive:
+            pdf_files = list(pdf_dir.rglob("*.pdf"))
+        else:
+            pdf_files = list(pdf_dir.glob("*.pdf"))
     
     if not pdf_files:
         print(f"Nema PDF fajlova u {pdf_folder}")
         return
     
     print(f"Pronađeno {len(pdf_files)} PDF fajlova")
+    if journal is not None:
+        if journal.listing is None:
+            journal.set_listing([pdf_file.relative_to(pdf_dir).as_posix() for pdf_file in pdf_files])
+        else:
+            # Fajl je obrađen (i uspješno i neuspješno) ako je u dnevniku; konverzija je deterministička
+            before_resume = len(pdf_files)
+            pdf_files = [f for f in pdf_files if journal.state(f.relative_to(pdf_dir).as_posix()) is None]
+            print(f"Nastavljam prekinuto pokretanje {journal.run_id}: {before_resume - len(pdf_files)} fajlova već obrađeno")
     print(f"Output folder: {output_dir}")
     print("=" * 60)
     
     total_tables = 0
     successful = 0
     failed = 0
+    stats = ExtractionStats()
     
-    for pdf_file in pdf_files:
-        try:
-            # Zadrži relativnu strukturu foldera u output folderu
-            relative_path = pdf_file.relative_to(pdf_dir)
-            relative_output = output_dir / relative_path.parent
-            
-            tables_count = convert_pdf_to_csv(pdf_file, relative_output)
-            if tables_count > 0:
-                total_tables += tables_count
-                successful += 1
+    quarantine = Quarantine(Path(quarantine_file)) if quarantine_file else None
+    skipped = 0
+    if quarantine is not None and not retry_quarantined:
+        kept = []
+        for pdf_file in pdf_files:
+            reason = quarantine.reason(pdf_file)
+            if reason is not None:
+                print(f"  Preskačem (karantin): {pdf_file.name} - {reason}")
+                skipped += 1
             else:
-                failed += 1
-        except Exception as e:
-            print(f"  ERROR: {e}")
+                kept.append(pdf_file)
+        pdf_files = kept
+
+    # Najnoviji period (i važnije banke) prvi, da bi se posle objave odmah vidio (vidi priority.py)
+    pdf_files = by_priority(pdf_files)
+
+    # Zadrži relativnu strukturu foldera u output folderu
+    tasks = [
+        (
+            pdf_file,
+            output_dir / pdf_file.relative_to(pdf_dir).parent,
+            use_layout,
+            profiler.file_profile_path("konverzija", pdf_file.relative_to(pdf_dir).as_posix()),
+            extraction_cache_folder,
+        )
+        for pdf_file in pdf_files
+    ]
+
+    pool = None
+    if workers > 0:
+        pool = WorkerPool(_convert_task, workers=workers, max_memory_mb=max_worker_memory_mb, timeout=timeout)
+        results = ((r.payload[0], r.result, r.error) for r in pool.imap_unordered(tasks))
+    else:
+        if timeout:
+            print("  Napomena: ograničenje vremena po fajlu radi samo sa --workers > 0")
+        results = _run_in_process(tasks)
+
+    for pdf_file, result, error in results:
+        if result is not None:
+            tables_count, file_stats, profile_record, read_error = result
+            stats.merge(file_stats)
+            profiler.add_file("konverzija", profile_record)
+            # PDF koji se ne može pročitati do kraja se tretira kao neuspjeh (i ide u karantin)
+            error = error or read_error
+        if journal is not None:
+            journal.set_state(
+                pdf_file.relative_to(pdf_dir).as_posix(),
+                "failed" if error or not result[0] else "done",
+            )
+        if error:
+            print(f"  ERROR ({pdf_file.name}): {error}")
+            failed += 1
+            # Zaglavljen fajl, pad radnika, izuzetak ili nečitljiv PDF: ne pokušavaj ponovo
+            # dok se fajl ne promijeni. Karantin se čuva odmah, da ga prekid pokretanja ne izgubi.
+            if quarantine is not None:
+                quarantine.add(pdf_file, error)
+                quarantine.save()
+            continue
+        if quarantine is not None:
+            quarantine.remove(pdf_file)
+            quarantine.save()
+        if tables_count > 0:
+            total_tables += tables_count
+            successful += 1
+        else:
             failed += 1
     
     print("\n" + "=" * 60)
@@ -181,6 +436,35 @@ def convert_all_pdfs_to_csv(
     print(f"  Neuspešno: {failed} PDF fajlova")
     print(f"  Ukupno tabela: {total_tables}")
     print(f"  CSV fajlovi su u: {output_dir}")
+    if quarantine is not None:
+        quarantine.save()
+        print(f"  Preskočeno iz karantina: {skipped}, u karantinu ukupno: {len(quarantine)} ({quarantine.path})")
+    stats.print_summary()
+    if pool is not None:
+        pool.stats.print_summary()
+
+    # Aplikacija bira fajlove iz kataloga, pa ga osvježi posle svake konverzije;
+    # niz za analize sektora (vidi cube.py) se pravi ponovo samo ako se podaci promijenili,
+    # a particije (vidi partitions.py) se pišu samo za izmijenjene banke i periode
+    if Path(BANKE_CSV_FOLDER).resolve().is_relative_to(output_dir.resolve()):
+        with profiler.stage("katalog"):
+            catalog = update_catalog()
+        with profiler.stage("niz"):
+            update_cube(catalog)
+        with profiler.stage("particije"):
+            manifest, changed_partitions = publish_partitions(catalog)
+        if changed_partitions:
+            print(f"Particije: verzija {manifest.version}, izmijenjeno/uklonjeno {len(changed_partitions)}")
+    profiler.print_summary()
+
+
+def _run_in_process(tasks):
+    """Isto što i WorkerPool.imap_unordered, ali redom u ovom procesu."""
+    for task in tasks:
+        try:
+            yield task[0], _convert_task(task), None
+        except Exception as e:
+            yield task[0], None, str(e)
 
 
 def main():
@@ -199,22 +483,91 @@ def main():
     parser.add_argument(
         "--output",
         type=str,
-        default="data/csv_output",
-        help="Output folder za CSV fajlove (default: data/csv_output)"
+        default=CSV_OUTPUT_FOLDER,
+        help=f"Output folder za CSV fajlove (default: {CSV_OUTPUT_FOLDER})"
     )
     parser.add_argument(
         "--no-recursive",
         action="store_true",
         help="Ne traži PDF fajlove rekurzivno u podfolderima"
     )
+    parser.add_argument(
+        "--no-layout",
+        action="store_true",
+        help="Ne koristi brzi layout parser, samo pdfplumber extract_tables()"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Broj radnih procesa za konverziju (default: 1, 0 = bez posebnih procesa)"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=120.0,
+        help="Najduže trajanje konverzije jednog PDF-a u sekundama (default: 120, 0 = bez ograničenja)"
+    )
+    parser.add_argument(
+        "--retry-quarantined",
+        action="store_true",
+        help=f"Pokušaj ponovo i fajlove iz karantina ({QUARANTINE_FILE})"
+    )
+    parser.add_argument(
+        "--max-worker-memory",
+        type=float,
+        default=None,
+        help="Granica memorije po radnom procesu u MB; proces koji je pređe se zamjenjuje novim"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"Snimi cProfile i tracemalloc po fazi i po PDF-u (izvještaj u {PROFILE_FOLDER})"
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Ne nastavljaj prekinuto pokretanje iz dnevnika, konvertuj sve iz početka"
+    )
+    parser.add_argument(
+        "--no-extraction-cache",
+        action="store_true",
+        help=f"Uvijek čitaj PDF-ove i ne upisuj sirove tabele u keš ({EXTRACTION_CACHE_FOLDER})"
+    )
     
     args = parser.parse_args()
-    
-    convert_all_pdfs_to_csv(
-        pdf_folder=args.pdf_folder,
-        output_folder=args.output,
-        recursive=not args.no_recursive
+
+    # Dnevnik pokretanja: prekinuta konverzija se sledeći put nastavlja (vidi journal.py)
+    journal = RunJournal(
+        "convert",
+        {
+            "pdf_folder": args.pdf_folder,
+            "output": args.output,
+            "recursive": not args.no_recursive,
+            "layout": not args.no_layout,
+        },
+        resume=not args.fresh,
     )
+    start = time.perf_counter()
+    try:
+        convert_all_pdfs_to_csv(
+            pdf_folder=args.pdf_folder,
+            output_folder=args.output,
+            recursive=not args.no_recursive,
+            use_layout=not args.no_layout,
+            workers=args.workers,
+            max_worker_memory_mb=args.max_worker_memory,
+            timeout=args.timeout or None,
+            retry_quarantined=args.retry_quarantined,
+            profiler=Profiler("convert", enabled=args.profile),
+            journal=journal,
+            extraction_cache_folder=None if args.no_extraction_cache else EXTRACTION_CACHE_FOLDER,
+        )
+    except BaseException:
+        journal.close()
+        raise
+    journal.finish()
+    journal.print_summary(time.perf_counter() - start)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,100 @@
+# src/priority.py
+#
+# Redosled obrade fajlova "prvo najsvježije": preuzimanje i konverzija uzimaju
+# sledeći posao iz heap-a po prioritetu umjesto redom sa liste/iz foldera, pa je
+# posle nove objave najnoviji kvartal gotov (i objavljen) prvi, a stariji
+# periodi se dopunjavaju iza njega.
+#
+# Prioritet: noviji period, pa važnija banka (BANK_PRIORITY u config.py), pa
+# bilans stanja prije bilansa uspjeha. Period i banka se čitaju iz putanje
+# (.../<bs|bu>/<banka>/<mmyy...>.pdf), pa isti ključ važi za URL-ove sa liste,
+# preuzete PDF-ove i CSV fajlove.
+
+import heapq
+import itertools
+import threading
+from pathlib import PurePosixPath
+from typing import Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+try:
+    from config import BANK_PRIORITY
+    from dataset import report_date
+except ImportError:  # Uvezeno kao paket
+    from src.config import BANK_PRIORITY
+    from src.dataset import report_date
+
+T = TypeVar("T")
+
+_REPORT_TYPE_RANK = {"bs": 0, "bu": 1}
+
+
+def priority_key(path, bank_priority: Dict[str, int] = BANK_PRIORITY) -> Tuple[int, int, int, str]:
+    """Manji ključ = raniji posao. Fajl čiji se period ne može pročitati ide na kraj."""
+    parts = PurePosixPath(str(path).replace("\\", "/")).parts
+    date = report_date(parts[-1]) if parts else None
+    period = date.year * 100 + date.month if date is not None else 0
+    bank = parts[-2] if len(parts) >= 2 else ""
+    report_type = parts[-3] if len(parts) >= 3 else ""
+    return (
+        -period,
+        -bank_priority.get(bank, 0),
+        _REPORT_TYPE_RANK.get(report_type, len(_REPORT_TYPE_RANK)),
+        str(path),
+    )
+
+
+def by_priority(items: Iterable[T], key=priority_key) -> List[T]:
+    """Poslovi poređani po prioritetu (najsvježiji prvi)."""
+    heap = [(key(item), i, item) for i, item in enumerate(items)]
+    heapq.heapify(heap)
+    return [heapq.heappop(heap)[2] for _ in range(len(heap))]
+
+
+class PriorityWorkQueue(Generic[T]):
+    """
+    Red poslova po prioritetu za više niti: proizvođač (npr. preuzimanje) dodaje
+    poslove kako stižu, a potrošač (npr. konverzija) uvijek uzima najsvježiji.
+    Posle close() get() vraća preostale poslove pa None.
+    """
+
+    def __init__(self, key=priority_key):
+        self.key = key
+        self._heap: List[tuple] = []
+        self._counter = itertools.count()
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def put(self, item: T):
+        with self._cond:
+            heapq.heappush(self._heap, (self.key(item), next(self._counter), item))
+            self._cond.notify()
+
+    def close(self):
+        """Više neće biti novih poslova."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[T]:
+        """Najsvježiji posao; čeka dok ga nema. None kada je red zatvoren i prazan (ili istekne timeout)."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._heap or self._closed, timeout):
+                return None
+            if not self._heap:
+                return None
+            return heapq.heappop(self._heap)[2]
+
+    def get_batch(self, max_items: int, timeout: Optional[float] = None) -> List[T]:
+        """Čeka bar jedan posao, pa uzima još najviše max_items - 1 koji su već tu."""
+        first = self.get(timeout)
+        if first is None:
+            return []
+        batch = [first]
+        with self._cond:
+            while self._heap and len(batch) < max_items:
+                batch.append(heapq.heappop(self._heap)[2])
+        return batch
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._heap)
@@ -0,0 +1,247 @@
+# src/probe.py
+#
+# Otkrivanje novih bilansa bez dohvatanja liste: imena PDF-ova prate strogi
+# obrazac (<bs|bu>/<banka>/<mmyy><šifra>_<bs|bu>.pdf), pa se za svaku aktivnu
+# banku mogu unaprijed napraviti URL-ovi sledećih kvartala i provjeriti HEAD
+# zahtjevima (paralelno). Nova objava se tako otkriva sa nekoliko malih zahtjeva
+# umjesto preuzimanja i parsiranja cijele liste (ponekad i preko Playwright-a).
+#
+# Šifra u imenu fajla nije uvijek ista kao folder banke i mijenja se kroz
+# vrijeme (npr. azm/0925adr_bs.pdf, ffb/0925ucb_bs.pdf), pa se koristi šifra iz
+# poslednjeg poznatog fajla u tom folderu. Novu šifru ili novu banku proba ne
+# može pogoditi; zato watch.py povremeno i dalje radi punu provjeru liste.
+#
+#   python src/probe.py                   # samo prikaži šta je pronađeno
+#   python src/main.py --probe            # pronađi i preuzmi
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+
+from catalog import Catalog
+from config import BANKE_CSV_FOLDER, BASE_URL_STRANICE, CSV_OUTPUT_FOLDER, DOWNLOAD_FOLDER
+from dataset import report_date
+from priority import by_priority
+from retry import call_with_retry, check_retryable
+from storage import _resolve_verify_path
+
+# Putanja foldera banaka na sajtu (ista struktura se čuva lokalno za PDF i CSV)
+SITE_BANKE_PATH = BANKE_CSV_FOLDER[len(CSV_OUTPUT_FOLDER):]
+
+# Koliko sledećih kvartala se provjerava po banci (kvartali koji još nisu završeni se ne provjeravaju)
+PERIODS_AHEAD = 2
+
+# Banka bez izvještaja ovoliko kvartala iza najnovijeg perioda se smatra ugašenom
+ACTIVE_WINDOW_QUARTERS = 4
+
+# Statusi koji sigurno znače "fajl još nije objavljen"
+_MISSING_STATUSES = frozenset({404, 410})
+
+Series = Tuple[str, str]  # (bs|bu, folder banke)
+
+
+@dataclass
+class ProbeResult:
+    candidates: int = 0
+    # Putanje na sajtu (kao sa liste, npr. "/slike_i_fajlovi/.../bs/ckb/1225ckb_bs.pdf")
+    found: List[str] = field(default_factory=list)
+    missing: int = 0
+    # URL-ovi čiji odgovor nije ni 200 ni 404 (403, mrežna greška...): tada treba puna provjera liste
+    errors: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def conclusive(self) -> bool:
+        return not self.errors
+
+
+def _period(file_name: str) -> Optional[int]:
+    parsed = report_date(file_name)
+    return parsed.year * 100 + parsed.month if parsed is not None else None
+
+
+def known_series(
+    catalog: Optional[Catalog] = None,
+    download_folder: str = DOWNLOAD_FOLDER,
+) -> Dict[Series, Tuple[int, str]]:
+    """
+    (tip, banka) -> (poslednji poznat period yyyymm, šifra iz imena tog fajla).
+    Poznati su konvertovani CSV-ovi iz kataloga i već preuzeti PDF-ovi.
+    """
+    names: List[Tuple[str, str, str]] = []
+    catalog = catalog or Catalog.load()
+    for rel, entry in catalog.entries.items():
+        names.append((entry["report_type"], entry["bank"], PurePosixPath(rel).name))
+    pdf_root = Path(download_folder) / SITE_BANKE_PATH.lstrip("/")
+    for pdf_file in pdf_root.glob("*/*/*.pdf") if pdf_root.exists() else []:
+        names.append((pdf_file.parent.parent.name, pdf_file.parent.name, pdf_file.name))
+
+    series: Dict[Series, Tuple[int, str]] = {}
+    for report_type, bank, name in names:
+        period = _period(name)
+        suffix = f"_{report_type}"
+        stem = name.split(".", 1)[0]
+        # "0925adr_bs" ili "0925adr_bs_table_1" -> "adr"
+        code = stem[4:stem.find(suffix, 4)] if suffix in stem[4:] else ""
+        if period is None or not code:
+            continue
+        if period > series.get((report_type, bank), (0, ""))[0]:
+            series[(report_type, bank)] = (period, code)
+    return series
+
+
+def next_periods(period: int, count: int, today: Optional[date] = None) -> List[int]:
+    """Do count kvartala posle period (yyyymm) koji su se već završili."""
+    today = today or date.today()
+    current = today.year * 100 + today.month
+    periods = []
+    year, month = divmod(period, 100)
+    month = -(-month // 3) * 3  # Kraj kvartala kome period pripada
+    while len(periods) < count:
+        month += 3
+        if month > 12:
+            year, month = year + 1, month - 12
+        candidate = year * 100 + month
+        # Kvartal se objavljuje tek kada se završi
+        if candidate >= current:
+            break
+        periods.append(candidate)
+    return periods
+
+
+def candidate_paths(
+    series: Dict[Series, Tuple[int, str]],
+    periods_ahead: int = PERIODS_AHEAD,
+    active_window: int = ACTIVE_WINDOW_QUARTERS,
+    today: Optional[date] = None,
+) -> List[str]:
+    """Putanje na sajtu za očekivane sledeće bilanse aktivnih banaka, najsvježije prvo."""
+    if not series:
+        return []
+    newest = max(period for period, _ in series.values())
+    newest_year, newest_month = divmod(newest, 100)
+    oldest_active = (newest_year * 12 + newest_month - 1) - 3 * active_window
+    paths = []
+    for (report_type, bank), (period, code) in sorted(series.items()):
+        year, month = divmod(period, 100)
+        if year * 12 + month - 1 <= oldest_active:
+            continue  # Banka više ne objavljuje izvještaje
+        for candidate in next_periods(period, periods_ahead, today):
+            mmyy = f"{candidate % 100:02d}{candidate // 100 % 100:02d}"
+            paths.append(f"{SITE_BANKE_PATH}/{report_type}/{bank}/{mmyy}{code}_{report_type}.pdf")
+    return by_priority(paths)
+
+
+def probe_paths(base_url: str, paths: List[str], workers: int = 8, timeout: float = 10) -> ProbeResult:
+    """
+    Provjerava putanje HEAD zahtjevima (workers paralelno, svaka nit sa svojom
+    requests.Session). 429/5xx se ponavljaju kao i kod preuzimanja (vidi retry.py).
+    """
+    start = time.perf_counter()
+    result = ProbeResult(candidates=len(paths))
+    verify_path = _resolve_verify_path()
+    sessions = threading.local()
+    lock = threading.Lock()
+
+    def head(path: str):
+        url = urljoin(base_url, path)
+        if not hasattr(sessions, "session"):
+            sessions.session = requests.Session()
+        try:
+            response = call_with_retry(
+                lambda: check_retryable(
+                    sessions.session.head(url, timeout=timeout, verify=verify_path, allow_redirects=True)
+                ),
+                url,
+            )
+            status = response.status_code
+        except requests.RequestException as e:
+            print(f"Proba nije uspjela za {url}: {e}")
+            with lock:
+                result.errors.append(url)
+            return
+        with lock:
+            if status == 200:
+                result.found.append(path)
+            elif status in _MISSING_STATUSES:
+                result.missing += 1
+            else:
+                print(f"Proba: neočekivan status {status} za {url}")
+                result.errors.append(url)
+
+    if paths:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            list(pool.map(head, paths))
+    result.found = by_priority(result.found)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def probe(
+    base_url: str = BASE_URL_STRANICE,
+    download_folder: str = DOWNLOAD_FOLDER,
+    workers: int = 8,
+    periods_ahead: int = PERIODS_AHEAD,
+    catalog: Optional[Catalog] = None,
+) -> ProbeResult:
+    """Pravi kandidate iz poznatih fajlova i provjerava ih na sajtu."""
+    series = known_series(catalog, download_folder)
+    paths = candidate_paths(series, periods_ahead)
+    # Već preuzeti (a još nekonvertovani) fajlovi nisu novi
+    paths = [p for p in paths if not (Path(download_folder) / p.lstrip("/")).exists()]
+    result = probe_paths(base_url, paths, workers=workers)
+    print(
+        f"Proba: {result.candidates} očekivanih fajlova, pronađeno {len(result.found)}, "
+        f"nije objavljeno {result.missing}, greške {len(result.errors)} ({result.seconds:.2f}s)"
+    )
+    return result
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Provjerava HEAD zahtjevima da li su objavljeni sledeći kvartali poznatih banaka"
+    )
+    parser.add_argument(
+        "--url",
+        type=str,
+        default=BASE_URL_STRANICE,
+        help="Adresa sajta (putanje fajlova su apsolutne, pa je dovoljna bilo koja stranica sajta)"
+    )
+    parser.add_argument(
+        "--download-folder",
+        type=str,
+        default=DOWNLOAD_FOLDER,
+        help=f"Folder sa preuzetim PDF-ovima (default: {DOWNLOAD_FOLDER})"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Broj paralelnih HEAD zahtjeva (default: 8)"
+    )
+    parser.add_argument(
+        "--periods-ahead",
+        type=int,
+        default=PERIODS_AHEAD,
+        help=f"Koliko sledećih kvartala provjeriti po banci (default: {PERIODS_AHEAD})"
+    )
+    args = parser.parse_args()
+
+    result = probe(args.url, args.download_folder, workers=args.workers, periods_ahead=args.periods_ahead)
+    for path in result.found:
+        print(f"  {path}")
+    if not result.conclusive:
+        print("Proba nije potpuna; pokreni punu provjeru liste (python src/main.py).")
+
+
+if __name__ == "__main__":
+    main()
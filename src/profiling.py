@@ -0,0 +1,227 @@
+# src/profiling.py
+#
+# Profilisanje faza pipeline-a (--profile u main.py i pdf_to_csv.py):
+# za svaku fazu i svaki fajl cProfile statistika i tracemalloc (vršna memorija
+# i najveće alokacije), upisani u folder izvještaja:
+#   <faza>.prof / <faza>.txt        - cProfile (prof se otvara sa python -m pstats ili snakeviz)
+#   files/<faza>/<fajl>.prof        - cProfile po fajlu
+#   <faza>_files.prof / .txt        - zbir profila svih fajlova jedne faze
+#   summary.json                    - vremena, vršna memorija i alokacije po fazi i fajlu
+#
+# Napomena: cProfile vidi samo nit u kojoj je pokrenut, a tracemalloc broji
+# alokacije cijelog procesa; kod paralelnih preuzimanja (--workers > 1) memorija
+# po fajlu uključuje i ostale niti. cProfile i tracemalloc zajedno usporavaju
+# kod nekoliko puta (za pdfplumber ~7x), pa su vremena u izvještaju za poređenje
+# faza i fajlova međusobno, ne za apsolutno trajanje.
+
+import cProfile
+import io
+import json
+import pstats
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+try:
+    from config import PROFILE_FOLDER
+except ImportError:  # Uvezeno kao paket (npr. iz app.py)
+    from src.config import PROFILE_FOLDER
+
+# Koliko funkcija (po kumulativnom vremenu) i alokacija čuvamo u izvještaju
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 10
+
+_MB = 1024 * 1024
+
+_ALLOCATION_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "faza"
+
+
+def _top_functions(profile, limit: int = TOP_FUNCTIONS) -> str:
+    stream = io.StringIO()
+    pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
+
+
+@contextmanager
+def measure(name: str, prof_path: Optional[Path] = None, allocations: bool = True) -> Iterator[dict]:
+    """
+    Mjeri blok koda: trajanje, vršnu memoriju (tracemalloc) i najveće nove alokacije,
+    uz cProfile koji se upisuje u prof_path. Rezultat se popunjava u vraćeni rečnik
+    po izlasku iz bloka (pa radi i u radnom procesu, gdje se rečnik vraća roditelju).
+    """
+    record: dict = {"name": name}
+    # Profiler pokreće tracemalloc jednom za cijeli proces; ovdje samo ako ga niko nije pokrenuo
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base_memory = tracemalloc.get_traced_memory()[0]
+    before = tracemalloc.take_snapshot() if allocations else None
+
+    profile: Optional[cProfile.Profile] = cProfile.Profile()
+    start = time.perf_counter()
+    try:
+        profile.enable()
+    except ValueError:  # Drugi profiler je već aktivan (npr. paralelne niti na Python 3.12+)
+        profile = None
+    try:
+        yield record
+    finally:
+        if profile is not None:
+            profile.disable()
+        record["seconds"] = round(time.perf_counter() - start, 4)
+        # Sa više niti drugi reset_peak može spustiti vrh ispod početne vrijednosti
+        record["peak_mb"] = round(max(0, tracemalloc.get_traced_memory()[1] - base_memory) / _MB, 2)
+        if before is not None:
+            after = tracemalloc.take_snapshot().filter_traces(_ALLOCATION_FILTERS)
+            record["top_allocations"] = [
+                {
+                    "where": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "size_kb": round(stat.size_diff / 1024, 1),
+                    "count": stat.count_diff,
+                }
+                for stat in after.compare_to(before.filter_traces(_ALLOCATION_FILTERS), "lineno")[:TOP_ALLOCATIONS]
+                if stat.size_diff > 0
+            ]
+        if started_tracing:
+            tracemalloc.stop()
+        if prof_path is not None and profile is not None:
+            prof_path.parent.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(str(prof_path))
+            record["profile"] = str(prof_path)
+
+
+class Profiler:
+    """
+    Izvještaj o profilisanju jednog pokretanja. Faze se mjere sa stage(),
+    pojedinačni fajlovi sa file() (ili add_file() za zapise iz radnih procesa);
+    fajlovi iste faze se na kraju sabiraju u jednu cProfile statistiku.
+    Isključen Profiler (enabled=False) ništa ne mjeri ni ne upisuje.
+    """
+
+    def __init__(self, run_name: str, enabled: bool = True, root: str = PROFILE_FOLDER):
+        self.enabled = enabled
+        self.run_name = run_name
+        self.folder = Path(root) / f"{run_name}-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.stages: List[dict] = []
+        self.files: Dict[str, List[dict]] = {}
+        # Jedno praćenje alokacija za cijelo pokretanje (faze i fajlovi, i iz više niti)
+        self._started_tracing = enabled and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        with measure(name, self.folder / f"{_safe_name(name)}.prof") as record:
+            yield
+        self.stages.append(record)
+
+    def file_profile_path(self, stage: str, file_name: str) -> Optional[Path]:
+        """Putanja .prof fajla za jedan fajl (prosleđuje se i radnim procesima)."""
+        if not self.enabled:
+            return None
+        return self.folder / "files" / _safe_name(stage) / f"{_safe_name(file_name)}.prof"
+
+    @contextmanager
+    def file(self, stage: str, file_name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        with measure(file_name, self.file_profile_path(stage, file_name)) as record:
+            yield
+        self.add_file(stage, record)
+
+    def add_file(self, stage: str, record: Optional[dict]):
+        if self.enabled and record:
+            self.files.setdefault(stage, []).append(record)
+
+    def write_report(self) -> Optional[Path]:
+        """Upisuje summary.json i tekstualne izvještaje; vraća folder izvještaja."""
+        if not self.enabled:
+            return None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self.folder.mkdir(parents=True, exist_ok=True)
+
+        for record in self.stages:
+            if "profile" not in record:
+                continue
+            prof = Path(record["profile"])
+            prof.with_suffix(".txt").write_text(_top_functions(str(prof)), encoding="utf-8")
+
+        file_totals = []
+        for stage, records in self.files.items():
+            profiles = [r["profile"] for r in records if r.get("profile") and Path(r["profile"]).is_file()]
+            if profiles:
+                merged = self.folder / f"{_safe_name(stage)}_files.prof"
+                stats = pstats.Stats(*profiles)
+                stats.dump_stats(str(merged))
+                merged.with_suffix(".txt").write_text(_top_functions(str(merged)), encoding="utf-8")
+            file_totals.append({
+                "stage": stage,
+                "files": len(records),
+                "seconds": round(sum(r["seconds"] for r in records), 3),
+                "max_peak_mb": max((r["peak_mb"] for r in records), default=0.0),
+            })
+
+        summary = {
+            "run": self.run_name,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "stages": self.stages,
+            "file_totals": file_totals,
+            "files": self.files,
+        }
+        with (self.folder / "summary.json").open("w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return self.folder
+
+    def print_summary(self):
+        if not self.enabled:
+            return
+        folder = self.write_report()
+        print(f"\nProfil ({folder}):")
+        for record in self.stages:
+            print(f"  {record['name']:<20} {record['seconds']:>9.2f}s  vršna memorija {record['peak_mb']:>8.1f} MB")
+        for stage, records in self.files.items():
+            slowest = sorted(records, key=lambda r: -r["seconds"])[:5]
+            total = sum(r["seconds"] for r in records)
+            print(f"  {stage}: {len(records)} fajlova, ukupno {total:.2f}s; najsporiji:")
+            for r in slowest:
+                print(f"    {Path(r['name']).name:<40} {r['seconds']:>8.2f}s  {r['peak_mb']:>7.1f} MB")
+
+
+class StageTimer:
+    """
+    Lagano mjerenje vremena između tačaka u kodu (za panel u app.py):
+    lap("faza") bilježi vrijeme od prethodnog poziva.
+    """
+
+    def __init__(self):
+        self._last = time.perf_counter()
+        self.laps: List[tuple] = []
+
+    def lap(self, name: str) -> float:
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self._last = now
+        self.laps.append((name, elapsed))
+        return elapsed
+
+    def total(self) -> float:
+        return sum(elapsed for _, elapsed in self.laps)
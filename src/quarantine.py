@@ -0,0 +1,94 @@
+# src/quarantine.py
+#
+# Spisak PDF fajlova čija konverzija je zaglavila ili srušila radni proces.
+# Takvi fajlovi se preskaču u narednim pokretanjima dok se ne promijene
+# (drugačiji sadržaj = drugačiji hash).
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    from config import QUARANTINE_FILE
+except ImportError:  # Uvezeno kao paket
+    from src.config import QUARANTINE_FILE
+
+
+def file_sha1(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Quarantine:
+    """
+    Karantin: putanja PDF-a -> {reason, size, mtime_ns, sha1, time}.
+    Veličina i mtime služe za brzu provjeru; hash se računa samo kada se oni
+    promijene (npr. isti fajl ponovo preuzet), pa nepromijenjen sadržaj ostaje u karantinu.
+    """
+
+    def __init__(self, path: Path = Path(QUARANTINE_FILE)):
+        self.path = Path(path)
+        self.entries: Dict[str, dict] = {}
+        if self.path.is_file():
+            with self.path.open("r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        self._dirty = False
+
+    @staticmethod
+    def _key(pdf_path: Path) -> str:
+        return Path(pdf_path).as_posix()
+
+    def reason(self, pdf_path: Path) -> Optional[str]:
+        """Razlog karantina ako fajl treba preskočiti, inače None."""
+        key = self._key(pdf_path)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        try:
+            stat = Path(pdf_path).stat()
+        except OSError:
+            return None
+        if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+            return entry["reason"]
+        if file_sha1(pdf_path) == entry["sha1"]:
+            # Isti sadržaj, samo novi mtime: zapamti novi stat da sledeći put ne računamo hash
+            entry["size"], entry["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+            self._dirty = True
+            return entry["reason"]
+        # Fajl je promijenjen: pokušaj ponovo
+        del self.entries[key]
+        self._dirty = True
+        return None
+
+    def add(self, pdf_path: Path, reason: str):
+        stat = Path(pdf_path).stat()
+        self.entries[self._key(pdf_path)] = {
+            "reason": reason,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha1": file_sha1(pdf_path),
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self._dirty = True
+
+    def remove(self, pdf_path: Path):
+        if self.entries.pop(self._key(pdf_path), None) is not None:
+            self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        tmp_path.replace(self.path)
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self.entries)
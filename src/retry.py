@@ -0,0 +1,249 @@
+# src/retry.py
+#
+# Ponavljanje HTTP zahtjeva sa eksponencijalnim čekanjem (uz jitter i poštovanje
+# Retry-After zaglavlja) i "circuit breaker" po hostu: posle više uzastopnih grešaka
+# host se pauzira umjesto da ga i dalje zasipamo zahtjevima.
+#
+# Sve zavisnosti (sleep, sat, generator slučajnih brojeva, session) se mogu
+# proslijediti, pa se ponašanje može provjeriti i protiv lokalnog servera koji
+# namjerno vraća greške.
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, FrozenSet, Optional, TypeVar
+from urllib.parse import urlparse
+
+import requests
+
+T = TypeVar("T")
+
+
+class RetryableHTTPError(requests.HTTPError):
+    """Odgovor sa statusom koji ima smisla ponoviti (429, 5xx)."""
+
+    def __init__(self, response: requests.Response):
+        super().__init__(f"{response.status_code} {response.reason} za {response.url}", response=response)
+        self.retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+
+class CircuitOpenError(requests.RequestException):
+    """Host je privremeno pauziran jer je previše zahtjeva zaredom propalo."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 4
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    # Retry-After duži od ovoga ne čekamo (tretira se kao neuspjeh)
+    max_retry_after: float = 120.0
+    retry_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+
+    def delay(self, attempt: int, rng: random.Random, retry_after: Optional[float] = None) -> float:
+        """
+        Čekanje prije sledećeg pokušaja (attempt = broj do sada propalih pokušaja).
+        "Full jitter": slučajno između 0 i base_delay * 2^(attempt-1), najviše max_delay.
+        Ako je server poslao Retry-After, čeka se bar toliko.
+        """
+        backoff = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = rng.uniform(0, backoff)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After može biti broj sekundi ili HTTP datum."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+@dataclass
+class RetryStats:
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    breaker_trips: int = 0
+    breaker_rejections: int = 0
+    retries_by_host: Dict[str, int] = field(default_factory=dict)
+
+    def reset(self):
+        self.__init__()
+
+    def print_summary(self):
+        print(f"HTTP zahtjeva: {self.requests}, ponovljenih pokušaja: {self.retries}, neuspjelih: {self.failures}")
+        if self.breaker_trips or self.breaker_rejections:
+            print(f"Circuit breaker: otvoren {self.breaker_trips} puta, odbijeno zahtjeva: {self.breaker_rejections}")
+        for host, count in sorted(self.retries_by_host.items(), key=lambda x: -x[1]):
+            print(f"  {host}: {count} ponovljenih pokušaja")
+
+
+class CircuitBreaker:
+    """
+    Stanja: zatvoren (zahtjevi prolaze) -> otvoren posle failure_threshold
+    uzastopnih grešaka (zahtjevi se odmah odbijaju) -> posle reset_timeout
+    propušta se jedan probni zahtjev; uspjeh zatvara, greška ponovo otvara.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.clock() - self.opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> bool:
+        """Bilježi grešku; vraća True ako se breaker upravo otvorio."""
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.opened_at = self.clock()
+                self._trial_running = False
+                return True
+            return False
+
+
+class CircuitBreakerRegistry:
+    """Jedan CircuitBreaker po hostu."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        host = urlparse(url).netloc
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout, self.clock)
+                self._breakers[host] = breaker
+            return breaker
+
+    def reset(self):
+        """Zaboravlja stanje svih hostova (npr. između dva mjerenja)."""
+        with self._lock:
+            self._breakers.clear()
+
+
+# Podrazumijevani objekti koje dijele storage.py i scraper.py
+DEFAULT_POLICY = RetryPolicy()
+BREAKERS = CircuitBreakerRegistry()
+STATS = RetryStats()
+
+
+def call_with_retry(
+    attempt: Callable[[], T],
+    url: str,
+    policy: RetryPolicy = DEFAULT_POLICY,
+    breakers: CircuitBreakerRegistry = BREAKERS,
+    stats: RetryStats = STATS,
+    sleep: Callable[[float], None] = time.sleep,
+    rng: Optional[random.Random] = None,
+) -> T:
+    """
+    Poziva attempt() dok ne uspije ili se ne potroše pokušaji.
+    Ponavljaju se greške konekcije, timeout-i i RetryableHTTPError; ostali izuzeci
+    (npr. 404 preko raise_for_status) se odmah prosleđuju.
+    """
+    rng = rng or random.Random()
+    breaker = breakers.for_url(url)
+    host = urlparse(url).netloc
+
+    for attempt_no in range(1, policy.max_attempts + 1):
+        if not breaker.allow():
+            stats.breaker_rejections += 1
+            raise CircuitOpenError(f"Host {host} je pauziran posle uzastopnih grešaka")
+
+        stats.requests += 1
+        try:
+            result = attempt()
+        except (requests.ConnectionError, requests.Timeout, RetryableHTTPError) as e:
+            stats.failures += 1
+            if breaker.record_failure():
+                stats.breaker_trips += 1
+                print(f"  Host {host} pauziran na {breakers.reset_timeout:.0f}s (previše grešaka zaredom)")
+                raise
+            retry_after = getattr(e, "retry_after", None)
+            if attempt_no == policy.max_attempts or (retry_after or 0) > policy.max_retry_after:
+                raise
+            delay = policy.delay(attempt_no, rng, retry_after)
+            stats.retries += 1
+            stats.retries_by_host[host] = stats.retries_by_host.get(host, 0) + 1
+            print(f"  Pokušaj {attempt_no}/{policy.max_attempts} nije uspio ({e}); ponavljam za {delay:.1f}s")
+            sleep(delay)
+        except requests.HTTPError:
+            # Host je odgovorio (npr. 404): za breaker je to uspjeh, a greška ide pozivaocu
+            breaker.record_success()
+            raise
+        except BaseException:
+            # Svaki drugi izlaz mora osloboditi probni zahtjev, inače host ostaje pauziran zauvijek
+            stats.failures += 1
+            if breaker.record_failure():
+                stats.breaker_trips += 1
+            raise
+        else:
+            breaker.record_success()
+            return result
+
+    raise AssertionError("nedostižno")
+
+
+def check_retryable(response: requests.Response, policy: RetryPolicy = DEFAULT_POLICY) -> requests.Response:
+    """Podiže RetryableHTTPError za statuse koje treba ponoviti, inače vraća odgovor."""
+    if response.status_code in policy.retry_statuses:
+        response.close()
+        raise RetryableHTTPError(response)
+    return response
+
+
+def get_with_retry(
+    session: requests.Session,
+    url: str,
+    policy: RetryPolicy = DEFAULT_POLICY,
+    breakers: CircuitBreakerRegistry = BREAKERS,
+    stats: RetryStats = STATS,
+    sleep: Callable[[float], None] = time.sleep,
+    **kwargs,
+) -> requests.Response:
+    """session.get(url, **kwargs) sa ponavljanjem za 429/5xx i mrežne greške."""
+    return call_with_retry(
+        lambda: check_retryable(session.get(url, **kwargs), policy),
+        url,
+        policy=policy,
+        breakers=breakers,
+        stats=stats,
+        sleep=sleep,
+    )
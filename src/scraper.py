@@ -14,26 +14,81 @@ except ImportError:  # Playwright nije instaliran u okruženju (npr. tokom lint-
     PlaywrightError = Exception  # type: ignore[assignment]
     sync_playwright = None  # type: ignore[assignment]
 
-from config import CUSTOM_CA_BUNDLE
-
-
-def dohvati_html(url: str) -> str | None:
+from config import CUSTOM_CA_BUNDLE, HTTP_CACHE_TTL
+from http_cache import HttpCache
+from retry import get_with_retry
+
+
+def dohvati_html(
+    url: str,
+    use_cache: bool = True,
+    ttl: float = HTTP_CACHE_TTL,
+    offline: bool = False,
+    cache: HttpCache | None = None,
+) -> str | None:
     """
     Šalje GET zahtev na dati URL i vraća HTML sadržaj stranice.
     Ako server blokira zahtev (npr. 403), pokušava se Playwright fallback.
+
+    Stranica se čuva u kešu na disku (vidi http_cache.py):
+    - dok je mlađa od ttl sekundi, vraća se iz keša bez mreže,
+    - kasnije se šalje uslovni GET (ETag / If-Modified-Since); 304 znači da je keš i dalje dobar,
+    - ako mreža ne radi, vraća se i zastarjela kopija,
+    - offline=True vraća samo ono što je u kešu.
     """
+    cache = cache or HttpCache()
+    cached = cache.get(url) if (use_cache or offline) else None
+
+    if offline:
+        if cached is None:
+            print(f"Offline režim: {url} nije u kešu.")
+            return None
+        print(f"Offline režim: koristim keširanu stranicu (stara {cached.age() / 60:.0f} min)")
+        return cached.body
+
+    if cached is not None and cached.is_fresh(ttl):
+        print(f"Koristim keširanu stranicu (stara {cached.age() / 60:.0f} min): {url}")
+        return cached.body
+
     try:
-        html = _fetch_with_requests(url)
-        if html is not None:
-            return html
+        response = _fetch_response(url, cached.conditional_headers() if cached else None)
+        if response is not None:
+            if response.status_code == 304 and cached is not None:
+                print(f"Stranica nije promijenjena (304), koristim keš: {url}")
+                return cache.touch(cached).body
+            print(f"Uspešno dohvaćen HTML sa {url}")
+            if use_cache:
+                cache.put(url, response.text, response.headers)
+            return response.text
     except requests.RequestException as e:
         print(f"Greška prilikom dohvatanja URL-a {url}: {e}")
+        if cached is not None:
+            print(f"Koristim zastarjelu keširanu stranicu (stara {cached.age() / 60:.0f} min)")
+            return cached.body
 
     print("Pokušavam sa Playwright-om kao rezervom...")
-    return _fetch_with_playwright(url)
+    html = _fetch_with_playwright(url)
+    if html is not None and use_cache:
+        cache.put(url, html, source="playwright")
+    elif html is None and cached is not None:
+        print(f"Koristim zastarjelu keširanu stranicu (stara {cached.age() / 60:.0f} min)")
+        return cached.body
+    return html
 
 
 def _fetch_with_requests(url: str) -> str | None:
+    response = _fetch_response(url)
+    if response is None:
+        return None
+    print(f"Uspešno dohvaćen HTML sa {url}")
+    return response.text
+
+
+def _fetch_response(url: str, extra_headers: dict | None = None) -> requests.Response | None:
+    """
+    Dohvata stranicu preko requests-a; vraća odgovor (200 ili 304)
+    ili None ako server vrati 403 (tada treba probati Playwright).
+    """
     headers = {
         "User-Agent": (
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -72,16 +127,15 @@ def _fetch_with_requests(url: str) -> str | None:
     # Referer može pomoći kod sajtova koji očekuju navigaciju
     session.headers["Referer"] = origin + "/"
 
-    response = session.get(url, verify=verify_path, timeout=20)
+    # 429/5xx i mrežne greške se ponavljaju (vidi retry.py); 403 se vraća odmah
+    response = get_with_retry(session, url, verify=verify_path, timeout=20, headers=extra_headers)
 
     if response.status_code == 403:
         print("Server vratio 403 Forbidden. Prelazim na Playwright...")
         return None
 
     response.raise_for_status()
-
-    print(f"Uspešno dohvaćen HTML sa {url}")
-    return response.text
+    return response
 
 
 def _resolve_verify_path() -> str:
@@ -0,0 +1,247 @@
+# src/search_index.py
+
+import bisect
+import json
+import re
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import pandas as pd
+
+try:
+    from config import BANKE_CSV_FOLDER, CSV_OUTPUT_FOLDER
+    from dataset import compute_data_version, read_report, report_date
+except ImportError:  # Uvezeno kao paket (npr. iz app.py)
+    from src.config import BANKE_CSV_FOLDER, CSV_OUTPUT_FOLDER
+    from src.dataset import compute_data_version, read_report, report_date
+
+
+# Indeks se čuva pored konvertovanih CSV fajlova
+SEARCH_INDEX_PATH = Path(CSV_OUTPUT_FOLDER) / "search_index.json"
+
+# Verzija formata fajla sa indeksom; povećaj kada se struktura promijeni
+INDEX_FORMAT = 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Slova koja NFKD ne razlaže na osnovno slovo + dijakritik
+_EXTRA_TRANSLITERATION = str.maketrans({"đ": "d", "Đ": "D", "ł": "l", "Ł": "L"})
+
+
+def normalize_text(text: str) -> str:
+    """Mala slova bez dijakritika: "Potraživanja" -> "potrazivanja"."""
+    text = unicodedata.normalize("NFKD", text.translate(_EXTRA_TRANSLITERATION))
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+def _period_key(date: pd.Timestamp) -> int:
+    return date.year * 100 + date.month
+
+
+def build_index(csv_folder: str = BANKE_CSV_FOLDER) -> dict:
+    """
+    Prolazi kroz sve banke i periode i pravi indeks:
+    - positions: lista [tip izvještaja, naziv pozicije],
+    - postings: token -> lista id-eva pozicija u kojima se token pojavljuje,
+    - series: id pozicije -> {banka: [[yyyymm, iznos], ...]}.
+    """
+    root = Path(csv_folder)
+    csv_files = sorted(root.rglob("*.csv")) if root.exists() else []
+
+    position_ids: Dict[tuple, int] = {}
+    positions: List[List[str]] = []
+    series: Dict[int, Dict[str, List[list]]] = {}
+    postings: Dict[str, Set[int]] = {}
+
+    for csv_path in csv_files:
+        date = report_date(csv_path.name)
+        if date is None:
+            continue
+        # Struktura foldera: <csv_folder>/<bs|bu>/<banka>/<fajl>.csv
+        relative = csv_path.relative_to(root).parts
+        if len(relative) < 3:
+            continue
+        report_type, bank = relative[0], relative[1]
+
+        rows = read_report(csv_path)
+        if not rows:
+            continue
+
+        period = _period_key(date)
+        for label, amount in rows:
+            # Preskoči nečitljive redove iz PDF-ova sa neispravnim fontom
+            if not label or "(cid:" in label:
+                continue
+            key = (report_type, label)
+            pid = position_ids.get(key)
+            if pid is None:
+                pid = len(positions)
+                position_ids[key] = pid
+                positions.append([report_type, label])
+                for token in set(tokenize(label)):
+                    postings.setdefault(token, set()).add(pid)
+            series.setdefault(pid, {}).setdefault(bank, []).append([period, amount])
+
+    return {
+        "format": INDEX_FORMAT,
+        "data_version": compute_data_version(csv_files),
+        "positions": positions,
+        "postings": {token: sorted(ids) for token, ids in sorted(postings.items())},
+        "series": {str(pid): banks for pid, banks in series.items()},
+    }
+
+
+def save_index(index: dict, path: Path = SEARCH_INDEX_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    # Atomska zamjena da čitaoci nikad ne vide polu-upisan indeks
+    tmp_path.replace(path)
+
+
+class SearchIndex:
+    """Učitan indeks pozicija; pretraga je presjek posting lista za sve tokene upita."""
+
+    def __init__(self, index: dict):
+        self.data_version: str = index["data_version"]
+        self.positions: List[List[str]] = index["positions"]
+        self.postings: Dict[str, List[int]] = index["postings"]
+        self.series_by_position: Dict[str, Dict[str, List[list]]] = index["series"]
+        # Sortirani tokeni za pretragu po prefiksu (korisnik još kuca zadnju riječ)
+        self.tokens: List[str] = sorted(self.postings)
+
+    @classmethod
+    def load(cls, path: Path = SEARCH_INDEX_PATH) -> Optional["SearchIndex"]:
+        if not path.is_file():
+            return None
+        with path.open("r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("format") != INDEX_FORMAT:
+            return None
+        return cls(index)
+
+    def _ids_for_prefix(self, prefix: str) -> Set[int]:
+        ids: Set[int] = set()
+        start = bisect.bisect_left(self.tokens, prefix)
+        for token in self.tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            ids.update(self.postings[token])
+        return ids
+
+    def search(self, query: str, report_type: Optional[str] = None, limit: int = 50) -> List[dict]:
+        """
+        Vraća pozicije koje sadrže sve riječi upita (zadnja riječ može biti prefiks).
+        Poređenje ne zavisi od velikih slova ni dijakritika.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        result: Optional[Set[int]] = None
+        for i, token in enumerate(tokens):
+            if i == len(tokens) - 1:
+                ids = self._ids_for_prefix(token)
+            else:
+                ids = set(self.postings.get(token, []))
+            result = ids if result is None else result & ids
+            if not result:
+                return []
+
+        matches = []
+        for pid in sorted(result or []):
+            rtype, label = self.positions[pid]
+            if report_type is not None and rtype != report_type:
+                continue
+            matches.append({
+                "id": pid,
+                "report_type": rtype,
+                "Pozicija": label,
+                "banke": len(self.series_by_position.get(str(pid), {})),
+            })
+            if len(matches) >= limit:
+                break
+        return matches
+
+    def series(self, position_id: int) -> pd.DataFrame:
+        """Vremenska serija pozicije za sve banke (kolone: banka, balance_date, Amount)."""
+        records = []
+        for bank, points in self.series_by_position.get(str(position_id), {}).items():
+            for period, amount in points:
+                records.append((bank, period, amount))
+        df = pd.DataFrame(records, columns=["banka", "period", "Amount"])
+        df["balance_date"] = (
+            pd.to_datetime(df["period"].astype(str), format="%Y%m") + pd.offsets.MonthEnd(0)
+        )
+        df["Amount"] = df["Amount"].astype("Int64")
+        return df[["banka", "balance_date", "Amount"]].sort_values(["banka", "balance_date"]).reset_index(drop=True)
+
+
+def load_or_build_index(
+    csv_folder: str = BANKE_CSV_FOLDER,
+    path: Path = SEARCH_INDEX_PATH,
+) -> SearchIndex:
+    """
+    Učitava indeks sa diska; ako ne postoji ili je napravljen od starijih
+    podataka (druga verzija podataka), pravi ga ponovo i čuva.
+    """
+    index = SearchIndex.load(path)
+    if index is not None:
+        root = Path(csv_folder)
+        current_version = compute_data_version(root.rglob("*.csv")) if root.exists() else None
+        if index.data_version != current_version:
+            index = None
+    if index is None:
+        raw = build_index(csv_folder)
+        save_index(raw, path)
+        index = SearchIndex(raw)
+    return index
+
+
+def main():
+    """Pravi indeks ili pretražuje postojeći."""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description="Indeks pozicija iz bilansa svih banaka i perioda"
+    )
+    parser.add_argument("query", nargs="?", help="Tekst za pretragu (npr. potrazivanja)")
+    parser.add_argument(
+        "--build",
+        action="store_true",
+        help="Ponovo napravi indeks iz CSV fajlova"
+    )
+    parser.add_argument(
+        "--csv-folder",
+        type=str,
+        default=BANKE_CSV_FOLDER,
+        help=f"Folder sa CSV bilansima (default: {BANKE_CSV_FOLDER})"
+    )
+    args = parser.parse_args()
+
+    if args.build:
+        start = time.perf_counter()
+        raw = build_index(args.csv_folder)
+        save_index(raw)
+        print(f"Indeks napravljen za {time.perf_counter() - start:.2f}s: "
+              f"{len(raw['positions'])} pozicija, {len(raw['postings'])} tokena -> {SEARCH_INDEX_PATH}")
+
+    if args.query:
+        index = load_or_build_index(args.csv_folder)
+        start = time.perf_counter()
+        matches = index.search(args.query)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for match in matches:
+            print(f"[{match['report_type']}] {match['Pozicija']} ({match['banke']} banaka)")
+        print(f"Pronađeno {len(matches)} pozicija za {elapsed_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
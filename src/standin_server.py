@@ -0,0 +1,349 @@
+# src/standin_server.py
+#
+# Lokalna zamjena za sajt CBCG: stranica sa spiskom PDF-ova i sami PDF-ovi,
+# uz podesive "loše uslove" (kašnjenje, ograničen protok, nasumični 403/5xx,
+# WAF koji propušta samo pravi browser). Služi da se main.py i preuzimanje
+# mogu provjeriti i mjeriti (vidi benchmark_crawl.py) bez opterećivanja pravog sajta.
+#
+# PDF-ovi se uzimaju iz foldera sa već preuzetim fajlovima ("snimak" sajta),
+# a ako ga nema, prave se sintetički fajlovi sa istim imenima kao CSV bilansi.
+
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from config import BANKE_CSV_FOLDER, BASE_URL_STRANICE, CSV_OUTPUT_FOLDER, DOWNLOAD_FOLDER
+
+# Putanja stranice sa spiskom fajlova, ista kao na pravom sajtu
+LISTING_PATH = urlparse(BASE_URL_STRANICE).path
+
+# Kolačić koji WAF postavlja JavaScript-om; requests ga ne može dobiti, browser može
+WAF_COOKIE = "cbcg_waf=ok"
+
+STATS_PATH = "/__stats"
+
+_CHUNK_SIZE = 16 * 1024
+
+
+@dataclass
+class SiteConfig:
+    """Uslovi koje server simulira; sve je podrazumijevano isključeno."""
+    latency_ms: float = 0.0
+    # Dodatno nasumično kašnjenje 0..jitter_ms po zahtjevu
+    jitter_ms: float = 0.0
+    # Protok po konekciji u KB/s (None = bez ograničenja)
+    bandwidth_kbps: Optional[float] = None
+    # Udio zahtjeva koji dobijaju 503 (sa Retry-After) odnosno 403
+    error_rate: float = 0.0
+    forbidden_rate: float = 0.0
+    retry_after: int = 1
+    # Stranica sa spiskom vraća 403 + JavaScript izazov dok klijent nema WAF kolačić
+    waf: bool = False
+    seed: Optional[int] = None
+
+
+@dataclass
+class ServerStats:
+    requests: int = 0
+    bytes_sent: int = 0
+    by_status: Dict[int, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, status: int, sent: int):
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += sent
+            self.by_status[status] = self.by_status.get(status, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+            self.by_status = {}
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "bytes_sent": self.bytes_sent,
+                "by_status": {str(k): v for k, v in sorted(self.by_status.items())},
+            }
+
+
+def synthetic_pdf(name: str, size: int) -> bytes:
+    """Deterministički "PDF" zadate veličine (isti naziv = isti sadržaj, pa i isti ETag)."""
+    head = f"%PDF-1.4\n% sinteticki fajl {name}\n".encode("utf-8")
+    tail = b"\n%%EOF\n"
+    seed = hashlib.sha1(name.encode("utf-8")).hexdigest().encode("ascii")
+    filler_size = max(0, size - len(head) - len(tail))
+    filler = (seed * (filler_size // len(seed) + 1))[:filler_size]
+    return head + filler + tail
+
+
+class StandinSite:
+    """
+    Sadržaj sajta: URL putanja PDF-a -> izvor (fajl na disku ili sintetički sadržaj).
+    Putanje su iste kao na CBCG-u (/slike_i_fajlovi/.../bs/ckb/0925ckb_bs.pdf),
+    pa main.py fajlove čuva u istoj strukturi foldera.
+    """
+
+    def __init__(self, pdf_folder: Optional[str] = DOWNLOAD_FOLDER, synthetic_size_kb: int = 64,
+                 limit: Optional[int] = None):
+        self.files: Dict[str, Optional[Path]] = {}
+        self.synthetic_size = synthetic_size_kb * 1024
+        self._etags: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        folder = Path(pdf_folder) if pdf_folder else None
+        if folder is not None and folder.is_dir():
+            for pdf_path in sorted(folder.rglob("*.pdf")):
+                self.files["/" + pdf_path.relative_to(folder).as_posix()] = pdf_path
+        if not self.files:
+            # Nema snimljenih PDF-ova: imena pravimo od CSV bilansa
+            csv_root = Path(CSV_OUTPUT_FOLDER)
+            for csv_path in sorted(Path(BANKE_CSV_FOLDER).rglob("*.csv")):
+                self.files["/" + csv_path.relative_to(csv_root).with_suffix(".pdf").as_posix()] = None
+
+        if limit is not None:
+            self.files = dict(list(self.files.items())[:limit])
+
+    @property
+    def source(self) -> str:
+        return "snimak" if any(p is not None for p in self.files.values()) else "sinteticki"
+
+    def listing_html(self) -> bytes:
+        links = "\n".join(
+            f'<li><a href="{path}">{path.rsplit("/", 1)[-1]}</a></li>' for path in self.files
+        )
+        return (
+            "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+            "<title>Bilansi stanja i bilansi uspjeha banaka</title></head>\n"
+            f"<body><ul>\n{links}\n</ul></body></html>\n"
+        ).encode("utf-8")
+
+    def pdf_body(self, path: str) -> Optional[bytes]:
+        if path not in self.files:
+            return None
+        source = self.files[path]
+        if source is None:
+            return synthetic_pdf(path, self.synthetic_size)
+        return source.read_bytes()
+
+    def etag(self, path: str, body: bytes) -> str:
+        with self._lock:
+            etag = self._etags.get(path)
+            if etag is None:
+                etag = self._etags[path] = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            return etag
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], site: StandinSite, config: SiteConfig):
+        super().__init__(address, _Handler)
+        self.site = site
+        self.config = config
+        self.stats = ServerStats()
+        self._rng = random.Random(config.seed)
+        self._rng_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def listing_url(self) -> str:
+        return self.base_url + LISTING_PATH
+
+    def random(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def start_in_thread(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+_WAF_CHALLENGE = (
+    "<!DOCTYPE html><html><head><title>Provjera pretraživača</title></head><body>"
+    "<p>Provjeravamo vaš pretraživač...</p>"
+    "<script>"
+    f"document.cookie = \"{WAF_COOKIE}; path=/\";"
+    "fetch(location.href).then(r => r.text()).then(html => {"
+    "document.open(); document.write(html); document.close(); });"
+    "</script></body></html>"
+).encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StandinServer
+    # Keep-alive kao na pravom sajtu; zato svaki odgovor ima Content-Length
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+    def _handle(self, send_body: bool):
+        config = self.server.config
+        path = unquote(urlparse(self.path).path)
+
+        if path == STATS_PATH:
+            body = json.dumps(self.server.stats.as_dict()).encode("utf-8")
+            self._send(200, body, "application/json", send_body, record=False)
+            return
+
+        delay = config.latency_ms + self.server.random() * config.jitter_ms
+        if delay:
+            time.sleep(delay / 1000)
+
+        if config.error_rate and self.server.random() < config.error_rate:
+            self._send(503, b"Service Unavailable\n", "text/plain", send_body,
+                       {"Retry-After": str(config.retry_after)})
+            return
+        if config.forbidden_rate and self.server.random() < config.forbidden_rate:
+            self._send(403, b"Forbidden\n", "text/plain", send_body)
+            return
+
+        if path == "/":
+            self._send(200, b"<html><body>CBCG (lokalna zamjena)</body></html>\n", "text/html", send_body)
+            return
+
+        if path == LISTING_PATH:
+            if config.waf and WAF_COOKIE not in self.headers.get("Cookie", ""):
+                self._send(403, _WAF_CHALLENGE, "text/html", send_body)
+                return
+            body = self.server.site.listing_html()
+            self._send_cacheable(path, body, "text/html; charset=utf-8", send_body)
+            return
+
+        body = self.server.site.pdf_body(path)
+        if body is None:
+            self._send(404, b"Not Found\n", "text/plain", send_body)
+            return
+        self._send_cacheable(path, body, "application/pdf", send_body)
+
+    def _send_cacheable(self, path: str, body: bytes, content_type: str, send_body: bool):
+        etag = self.server.site.etag(path, body)
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", content_type, send_body, {"ETag": etag})
+            return
+        self._send(200, body, content_type, send_body, {"ETag": etag})
+
+    def _send(self, status: int, body: bytes, content_type: str, send_body: bool,
+              headers: Optional[Dict[str, str]] = None, record: bool = True):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body) if status != 304 else 0))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        sent = 0
+        if send_body and status != 304:
+            sent = self._write_body(body)
+        if record:
+            self.server.stats.record(status, sent)
+
+    def _write_body(self, body: bytes) -> int:
+        bandwidth = self.server.config.bandwidth_kbps
+        sent = 0
+        try:
+            for start in range(0, len(body), _CHUNK_SIZE):
+                chunk = body[start:start + _CHUNK_SIZE]
+                self.wfile.write(chunk)
+                sent += len(chunk)
+                if bandwidth:
+                    time.sleep(len(chunk) / (bandwidth * 1024))
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        return sent
+
+
+def config_arguments(parser):
+    """Opcije za SiteConfig/StandinSite; dijeli ih i benchmark_crawl.py."""
+    parser.add_argument("--pdf-folder", type=str, default=DOWNLOAD_FOLDER,
+                        help=f"Folder sa preuzetim PDF-ovima koje server vraća (default: {DOWNLOAD_FOLDER}); "
+                             "ako je prazan, prave se sintetički fajlovi")
+    parser.add_argument("--synthetic-size-kb", type=int, default=64,
+                        help="Veličina sintetičkog PDF-a u KB (default: 64)")
+    parser.add_argument("--files", type=int, default=None,
+                        help="Najviše ovoliko PDF-ova na listi (default: svi)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Kašnjenje svakog odgovora u ms (default: 0)")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="Dodatno nasumično kašnjenje do ovoliko ms (default: 0)")
+    parser.add_argument("--bandwidth", type=float, default=None,
+                        help="Protok po konekciji u KB/s (default: bez ograničenja)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Udio zahtjeva koji dobijaju 503 (0-1, default: 0)")
+    parser.add_argument("--forbidden-rate", type=float, default=0.0,
+                        help="Udio zahtjeva koji dobijaju 403 (0-1, default: 0)")
+    parser.add_argument("--waf", action="store_true",
+                        help="Stranica sa spiskom traži JavaScript (requests dobija 403, Playwright prolazi)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Seed za nasumične greške (za ponovljive scenarije)")
+
+
+def config_from_args(args) -> Tuple[StandinSite, SiteConfig]:
+    site = StandinSite(args.pdf_folder, args.synthetic_size_kb, args.files)
+    config = SiteConfig(
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        bandwidth_kbps=args.bandwidth,
+        error_rate=args.error_rate,
+        forbidden_rate=args.forbidden_rate,
+        waf=args.waf,
+        seed=args.seed,
+    )
+    return site, config
+
+
+def describe(site: StandinSite, config: SiteConfig) -> dict:
+    """Opis scenarija (za ispis i za zapis u benchmarks.jsonl)."""
+    return {"files": len(site.files), "source": site.source, **asdict(config)}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Lokalna zamjena za sajt CBCG (spisak PDF-ova i fajlovi) za testiranje i mjerenje"
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    config_arguments(parser)
+    args = parser.parse_args()
+
+    site, config = config_from_args(args)
+    server = StandinServer((args.host, args.port), site, config)
+    print(f"Server sluša na {server.base_url} ({len(site.files)} PDF-ova, izvor: {site.source})")
+    print(f"Spisak fajlova: {server.listing_url}")
+    print(f"Statistika: {server.base_url}{STATS_PATH}")
+    print(f"Pokreni npr.: python src/main.py --url {server.listing_url} --no-cache")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\nStatistika servera: {server.stats.as_dict()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+# src/static_reports.py
+#
+# Statički izvještaji za sve banke: isti grafikoni kao u app.py (kategorije,
+# krediti/HoV/depoziti, K/D odnos) upisani u samostalne HTML fajlove (plotly.js je
+# ugrađen, pa se otvaraju i bez mreže) i, ako je instaliran kaleido, u PNG slike.
+# Banke se crtaju paralelno u radnim procesima (vidi workers.py); banka čija se
+# verzija podataka (vidi catalog.py) nije promijenila od prošlog crtanja se preskače.
+# Tržišno učešće zavisi od svih banaka, pa promjena podataka bilo koje banke
+# (verzija sektora, vidi sector_version) ponovo crta sve izvještaje.
+#
+#   python src/static_reports.py                 # sve banke, samo izmijenjene
+#   python src/static_reports.py --force --png   # sve ponovo, uz PNG slike
+
+import hashlib
+import html
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from bank_data import build_bank_data
+from catalog import Catalog, load_or_build_catalog
+from charts import (
+    CATEGORY_COLORS,
+    CATEGORY_COLORS_2,
+    CATEGORY_ORDER,
+    CATEGORY_ORDER_2,
+    build_category_figure,
+    build_ratio_figure,
+    go,
+    prepare_chart_frame,
+)
+from config import BANKE, REPORTS_FOLDER
+from metrics import MetricsStore
+from workers import WorkerPool
+
+try:
+    import kaleido  # noqa: F401  (plotly ga koristi za write_image)
+except ImportError:
+    kaleido = None
+
+MANIFEST_NAME = "manifest.json"
+
+# Povećaj kada se promijeni izgled izvještaja ili računanje pokazatelja u njemu
+# (2: tržišno učešće u odnosu na cijeli sektor), pa se sve banke ponovo nacrtaju
+RENDER_VERSION = 2
+
+# Kao u app.py: prikazuju se podaci od 2020.
+MIN_YEAR = 2020
+
+_PAGE = """<!DOCTYPE html>
+<html lang="sr">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; color: #222; }}
+table {{ border-collapse: collapse; margin: 1em 0; }}
+td, th {{ border: 1px solid #ccc; padding: 4px 10px; text-align: right; }}
+th {{ background: #f4f4f4; }}
+.meta {{ color: #777; font-size: 0.9em; }}
+</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+def _write_atomic(path: Path, data, binary: bool = False):
+    """Upisuje fajl preko privremenog, pa čitalac nikad ne vidi polovičan izvještaj."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    if binary:
+        tmp_path.write_bytes(data)
+    else:
+        tmp_path.write_text(data, encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def _period_text(dates: pd.Series) -> str:
+    return f"{dates.min().strftime('%d.%m.%Y')} - {dates.max().strftime('%d.%m.%Y')}"
+
+
+def _latest_table(metrics: pd.DataFrame) -> str:
+    """Poslednji period iz tabele pokazatelja (kao metrike na vrhu prvog taba u app.py)."""
+    if metrics.empty:
+        return ""
+    latest = metrics.iloc[-1]
+    rows = []
+    for column, growth in (
+        ("Aktiva", "Aktiva QoQ"),
+        ("Krediti klijenata", "Krediti klijenata YoY"),
+        ("Depoziti klijenata", "Depoziti klijenata YoY"),
+    ):
+        change = f"{latest[growth]:+.1%}" if pd.notna(latest[growth]) else "-"
+        rows.append(f"<tr><th>{column}</th><td>{latest[column]:,}</td><td>{change}</td></tr>")
+    share = latest["Tržišno učešće"]
+    rows.append(f"<tr><th>Tržišno učešće (aktiva)</th><td>{share:.1%}</td><td></td></tr>" if pd.notna(share) else "")
+    return (
+        f"<h2>Stanje na dan {metrics.index[-1].strftime('%d.%m.%Y')}</h2>"
+        "<table><tr><th></th><th>Iznos (u hiljadama)</th><th>Promjena</th></tr>"
+        + "".join(rows) + "</table>"
+    )
+
+
+def render_bank_report(
+    bank: str,
+    csv_files: List[Path],
+    data_version: str,
+    metrics: pd.DataFrame,
+    output_folder: Path,
+    only_year_end: bool = True,
+    png: bool = False,
+) -> dict:
+    """
+    Crta izvještaj jedne banke u output_folder (<banka>.html i, uz png, <banka>_<grafikon>.png).
+    metrics je tabela pokazatelja banke indeksirana po datumu (MetricsStore.frame).
+    Vraća zapis za manifest.
+    """
+    start = time.perf_counter()
+    bank_data = build_bank_data(bank, csv_files, data_version, min_year=MIN_YEAR)
+
+    charts = []  # (ime, naslov sekcije, figura)
+    sources = [
+        ("kategorije", "Pregled svih kategorija", bank_data.balance, CATEGORY_ORDER, CATEGORY_COLORS,
+         "Pregled kategorija po datumu", False),
+        ("krediti_depoziti", "Pregled kredita i depozita", bank_data.credit_deposit, CATEGORY_ORDER_2, CATEGORY_COLORS_2,
+         "Pregled kredita, HoV i depozita po datumu", True),
+    ]
+    for name, heading, source, order, colors, title, group_traces in sources:
+        if only_year_end and not source.empty:
+            source = source[source["balance_date"].dt.month == 12]
+        if source.empty:
+            continue
+        categories = sorted(source["Kategorija"].unique().tolist())
+        fig = build_category_figure(
+            prepare_chart_frame(source, categories), categories, order, colors,
+            title=title, group_traces=group_traces,
+        )
+        charts.append((name, f"{heading} u periodu: {_period_text(source['balance_date'])}", fig))
+
+    ratio = metrics[metrics.index.year >= MIN_YEAR]
+    if only_year_end:
+        ratio = ratio[ratio.index.month == 12]
+    ratio = ratio.dropna(subset=["K/D odnos"])
+    if not ratio.empty:
+        charts.append(("kd_odnos", "Odnos kredita i depozita (K/D)", build_ratio_figure(ratio)))
+
+    bank_name = BANKE.get(bank, bank)
+    parts = [
+        f"<h1>{html.escape(bank_name)}</h1>",
+        f"<p class=\"meta\">Napravljeno {time.strftime('%d.%m.%Y %H:%M')}, verzija podataka {data_version}"
+        f"{', samo stanje na kraju godine' if only_year_end else ''}.</p>",
+        _latest_table(metrics),
+    ]
+    if not charts:
+        parts.append("<p>Nema podataka za prikaz grafikona.</p>")
+    for i, (_, heading, fig) in enumerate(charts):
+        # plotly.js samo jednom, ugrađen u stranicu
+        parts.append(f"<h2>{html.escape(heading)}</h2>")
+        parts.append(fig.to_html(full_html=False, include_plotlyjs=(i == 0)))
+
+    output_folder.mkdir(parents=True, exist_ok=True)
+    html_path = output_folder / f"{bank}.html"
+    _write_atomic(html_path, _PAGE.format(title=html.escape(bank_name), body="\n".join(parts)))
+    files = [html_path.name]
+
+    if png:
+        for name, _, fig in charts:
+            png_path = output_folder / f"{bank}_{name}.png"
+            _write_atomic(png_path, fig.to_image(format="png", width=1200), binary=True)
+            files.append(png_path.name)
+
+    return {
+        "bank": bank,
+        "data_version": data_version,
+        "render_version": RENDER_VERSION,
+        "only_year_end": only_year_end,
+        "png": png,
+        "rendered_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "files": files,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def _render_task(task) -> dict:
+    """Zadatak za radni proces (vidi WorkerPool): jedna banka."""
+    return render_bank_report(*task)
+
+
+def load_manifest(folder: Path) -> Dict[str, dict]:
+    path = folder / MANIFEST_NAME
+    if not path.is_file():
+        return {}
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f).get("banks", {})
+
+
+def save_manifest(folder: Path, banks: Dict[str, dict]):
+    raw = {"render_version": RENDER_VERSION, "banks": dict(sorted(banks.items()))}
+    _write_atomic(folder / MANIFEST_NAME, json.dumps(raw, ensure_ascii=False, indent=2))
+
+
+def sector_version(catalog: Catalog) -> str:
+    """Verzija podataka svih banaka iz kataloga (i ugašenih): od nje zavisi tržišno učešće."""
+    digest = hashlib.sha1()
+    for bank, version in sorted(catalog.bank_versions("bs", min_year=MIN_YEAR).items()):
+        digest.update(f"{bank}:{version};".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def is_up_to_date(
+    entry: Optional[dict],
+    data_version: str,
+    sector: str,
+    only_year_end: bool,
+    png: bool,
+    folder: Path,
+) -> bool:
+    """Da li je izvještaj banke već nacrtan iz iste verzije podataka banke i sektora, sa istim opcijama."""
+    if not entry:
+        return False
+    return (
+        entry.get("data_version") == data_version
+        and entry.get("sector_version") == sector
+        and entry.get("render_version") == RENDER_VERSION
+        and entry.get("only_year_end") == only_year_end
+        and (entry.get("png") or not png)
+        and all((folder / name).is_file() for name in entry.get("files", []))
+    )
+
+
+def write_index(folder: Path, banks: Dict[str, dict]):
+    """index.html sa linkovima na izvještaje svih banaka."""
+    rows = "".join(
+        f"<tr><td style=\"text-align:left\"><a href=\"{html.escape(entry['files'][0])}\">"
+        f"{html.escape(BANKE.get(bank, bank))}</a></td><td>{entry['rendered_at']}</td><td>{entry['data_version']}</td></tr>"
+        for bank, entry in sorted(banks.items(), key=lambda item: BANKE.get(item[0], item[0]))
+    )
+    body = (
+        "<h1>Bilansi banaka u Crnoj Gori</h1>"
+        "<table><tr><th>Banka</th><th>Nacrtano</th><th>Verzija podataka</th></tr>" + rows + "</table>"
+    )
+    _write_atomic(folder / "index.html", _PAGE.format(title="Bilansi banaka", body=body))
+
+
+def generate_reports(
+    output_folder: str = REPORTS_FOLDER,
+    banks: Optional[List[str]] = None,
+    workers: int = 1,
+    only_year_end: bool = True,
+    png: bool = False,
+    force: bool = False,
+) -> Dict[str, int]:
+    """
+    Crta izvještaje za banke (podrazumijevano sve iz BANKE) i ažurira manifest i index.html.
+    workers = 0 crta sve u ovom procesu. Vraća broj nacrtanih, preskočenih i neuspjelih banaka.
+    """
+    if go is None:
+        print("ERROR: plotly nije instaliran. Pokreni 'pip install plotly'")
+        return {}
+    if png and kaleido is None:
+        print("Upozorenje: kaleido nije instaliran ('pip install kaleido'), crtam samo HTML.")
+        png = False
+
+    folder = Path(output_folder)
+    catalog = load_or_build_catalog()
+    # K/D i metrike dolaze iz tabele pokazatelja, kao u app.py; ažurira se jednom, ovdje
+    store = MetricsStore.load()
+    if store.update(catalog=catalog):
+        store.save()
+    metrics = store.frame()
+
+    sector = sector_version(catalog)
+    manifest = load_manifest(folder)
+    counts = {"nacrtano": 0, "preskočeno": 0, "neuspjelo": 0}
+    tasks = []
+    for bank in banks or list(BANKE):
+        files = catalog.files(bank, "bs", min_year=MIN_YEAR)
+        if not files:
+            print(f"  {bank}: nema CSV fajlova u katalogu")
+            continue
+        data_version = catalog.data_version(bank, "bs", min_year=MIN_YEAR)
+        if not force and is_up_to_date(manifest.get(bank), data_version, sector, only_year_end, png, folder):
+            counts["preskočeno"] += 1
+            continue
+        bank_metrics = metrics[metrics["banka"] == bank].set_index("balance_date")
+        tasks.append((bank, files, data_version, bank_metrics, folder, only_year_end, png))
+
+    print(f"Crtam {len(tasks)} banaka ({counts['preskočeno']} bez promjena) u {folder}")
+    if workers > 0 and len(tasks) > 1:
+        pool = WorkerPool(_render_task, workers=workers)
+        results = ((r.payload[0], r.result, r.error) for r in pool.imap_unordered(tasks))
+    else:
+        results = _run_in_process(tasks)
+
+    for bank, record, error in results:
+        if error:
+            print(f"  ERROR ({bank}): {error}")
+            counts["neuspjelo"] += 1
+            continue
+        manifest[bank] = {k: v for k, v in record.items() if k not in ("bank", "seconds")}
+        manifest[bank]["sector_version"] = sector
+        counts["nacrtano"] += 1
+        print(f"  {bank}: {', '.join(record['files'])} ({record['seconds']:.1f}s)")
+
+    if manifest:
+        folder.mkdir(parents=True, exist_ok=True)
+        save_manifest(folder, manifest)
+        write_index(folder, manifest)
+    return counts
+
+
+def _run_in_process(tasks):
+    """Isto što i WorkerPool.imap_unordered, ali redom u ovom procesu."""
+    for task in tasks:
+        try:
+            yield task[0], _render_task(task), None
+        except Exception as e:
+            yield task[0], None, str(e)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Crta statičke HTML/PNG izvještaje sa grafikonima bilansa za sve banke"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=REPORTS_FOLDER,
+        help=f"Folder za izvještaje (default: {REPORTS_FOLDER})"
+    )
+    parser.add_argument(
+        "--banks",
+        type=str,
+        default=None,
+        help="Šifre banaka odvojene zarezom (default: sve)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Broj radnih procesa (default: broj jezgara, 0 = sve u ovom procesu)"
+    )
+    parser.add_argument(
+        "--all-periods",
+        action="store_true",
+        help="Prikaži sve kvartale, ne samo stanje na kraju godine"
+    )
+    parser.add_argument(
+        "--png",
+        action="store_true",
+        help="Uz HTML snimi i PNG slike grafikona (potreban kaleido)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Nacrtaj sve banke ponovo, i one čiji se podaci nisu promijenili"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    banks = [b.strip() for b in args.banks.split(",") if b.strip()] if args.banks else None
+    counts = generate_reports(
+        args.output,
+        banks=banks,
+        workers=args.workers,
+        only_year_end=not args.all_periods,
+        png=args.png,
+        force=args.force,
+    )
+    if counts:
+        summary = ", ".join(f"{name}: {count}" for name, count in counts.items())
+        print(f"\nZavršeno za {time.perf_counter() - start:.1f}s ({summary})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,21 @@
 # src/storage.py
 
 from pathlib import Path
+from typing import Optional
 
 import certifi
 import requests
 
 from config import CUSTOM_CA_BUNDLE
+from retry import call_with_retry, check_retryable
 
 
-def download_file(url: str, save_path: str):
+def download_file(url: str, save_path: str, session: Optional[requests.Session] = None):
     """
     Preuzima fajl (npr. PDF, sliku) sa datog URL-a i čuva ga na 'save_path'.
     Koristi stream=True za efikasno preuzimanje.
+    Prolazne greške (timeout, 429, 5xx, prekid tokom preuzimanja) se ponavljaju
+    sa eksponencijalnim čekanjem (vidi retry.py).
     """
     try:
         path = Path(save_path)
@@ -32,21 +36,39 @@ def download_file(url: str, save_path: str):
         }
 
         verify_path = _resolve_verify_path()
-
-        response = requests.get(
-            url,
-            headers=headers,
-            stream=True,  # stream=True je važno za velike fajlove
-            timeout=30,
-            verify=verify_path,
-        )
-
-        response.raise_for_status()
-
-        # Pišemo fajl u "komadima" (chunks)
-        with path.open("wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        http = session or requests
+        # Fajl se piše pod privremenim imenom, da prekinuto preuzimanje
+        # ne ostane na disku kao "već postoji"
+        tmp_path = path.with_name(path.name + ".part")
+
+        def attempt():
+            response = check_retryable(http.get(
+                url,
+                headers=headers,
+                stream=True,  # stream=True je važno za velike fajlove
+                timeout=30,
+                verify=verify_path,
+            ))
+
+            response.raise_for_status()
+
+            # Pišemo fajl u "komadima" (chunks)
+            try:
+                with tmp_path.open("wb") as f:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        f.write(chunk)
+            except requests.exceptions.ChunkedEncodingError as e:
+                # Veza prekinuta usred preuzimanja: tretiraj kao mrežnu grešku
+                raise requests.ConnectionError(e) from e
+            finally:
+                response.close()
+
+        try:
+            call_with_retry(attempt, url)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        tmp_path.replace(path)
 
         print(f"Uspješno sačuvan: {path}")
         return True
@@ -0,0 +1,275 @@
+# src/validation.py
+#
+# Provjera računovodstvenih identiteta u konvertovanim bilansima stanja.
+# Sve banke (i one kojih više nema) i svi periodi se provjeravaju odjednom,
+# operacijama nad kolonama (groupby/merge), umjesto fajl po fajl. Izvještaji koje
+# nije moguće pročitati (stari format sa "R. br.") se prijavljuju kao neprovjereni.
+
+import numpy as np
+import pandas as pd
+
+try:
+    from config import BANKE_CSV_FOLDER
+    from dataset import bank_csv_files, load_sector_frame, report_date, sector_banks, skipped_reports
+except ImportError:  # Uvezeno kao paket (npr. iz app.py)
+    from src.config import BANKE_CSV_FOLDER
+    from src.dataset import bank_csv_files, load_sector_frame, report_date, sector_banks, skipped_reports
+
+
+# Zbirne pozicije prepoznajemo po nazivu, ne po broju, jer se numeracija
+# razlikuje između šema izvještaja (npr. "16. UKUPNA SREDSTVA:" od 2018,
+# "18. UKUPNA SREDSTVA:" ranije)
+TOTAL_ASSETS = "UKUPNA SREDSTVA"
+TOTAL_LIABILITIES = "UKUPNE OBAVEZE"
+TOTAL_EQUITY = "UKUPAN KAPITAL"
+TOTAL_LIABILITIES_EQUITY = "UKUPNI KAPITAL I OBAVEZE"
+
+# Iznosi su u hiljadama EUR i zaokruženi, pa zbir može odstupati za par jedinica
+# (u postojećim podacima najviše 3)
+DEFAULT_TOLERANCE = 3
+
+ISSUE_COLUMNS = ["banka", "f_source", "balance_date", "pravilo", "iskazano", "izracunato", "razlika"]
+
+# "2." -> (2, ""), "2.a." -> (2, "a")
+_CODE_PATTERN = r"^(?P<broj>\d+)\.(?:(?P<pod>[a-z])\.)?\s"
+
+
+def _position_codes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Dodaje kolone broj (redni broj pozicije), pod (slovo podpozicije ili "")
+    i vrsta (koja zbirna pozicija je u pitanju, ako jeste).
+    Regex se primjenjuje jednom po kategoriji naziva, ne po redu.
+    """
+    labels = pd.Series(df["Pozicija"].cat.categories)
+    codes = labels.str.extract(_CODE_PATTERN)
+    upper = labels.str.upper()
+    kind = np.select(
+        [
+            upper.str.contains(TOTAL_LIABILITIES_EQUITY, regex=False),
+            upper.str.contains(TOTAL_ASSETS, regex=False),
+            upper.str.contains(TOTAL_LIABILITIES, regex=False),
+            upper.str.contains(TOTAL_EQUITY, regex=False),
+        ],
+        ["PASIVA", "AKTIVA", "OBAVEZE", "KAPITAL"],
+        default="",
+    )
+
+    category_codes = df["Pozicija"].cat.codes.to_numpy()
+    numbers = pd.to_numeric(codes["broj"]).to_numpy()
+    return df.assign(
+        broj=numbers[category_codes],
+        pod=codes["pod"].fillna("").to_numpy()[category_codes],
+        vrsta=kind[category_codes],
+    )
+
+
+def _issues(report_keys: pd.DataFrame, rule: str, reported: pd.Series, computed: pd.Series,
+            tolerance: int) -> pd.DataFrame:
+    """Vraća redove (izvještaje) gdje se iskazani i izračunati iznos razlikuju."""
+    joined = pd.concat({"iskazano": reported, "izracunato": computed}, axis=1, join="inner")
+    joined["razlika"] = joined["iskazano"] - joined["izracunato"]
+    failing = joined[joined["razlika"].abs() > tolerance]
+    if failing.empty:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    failing = failing.join(report_keys, how="left").reset_index(drop=True)
+    failing["pravilo"] = rule
+    return failing[ISSUE_COLUMNS]
+
+
+def validate_balance_sheets(df: pd.DataFrame, tolerance: int = DEFAULT_TOLERANCE) -> pd.DataFrame:
+    """
+    Provjerava bilanse stanja svih banaka i perioda odjednom. Pravila:
+    - pozicija sa podpozicijama (npr. "2.") = zbir podpozicija ("2.a." + "2.b." + ...),
+    - UKUPNA SREDSTVA = zbir pozicija aktive,
+    - UKUPNE OBAVEZE = zbir pozicija između ukupne aktive i ukupnih obaveza,
+    - UKUPAN KAPITAL = zbir pozicija između ukupnih obaveza i ukupnog kapitala,
+    - UKUPNI KAPITAL I OBAVEZE = UKUPNE OBAVEZE + UKUPAN KAPITAL,
+    - UKUPNA SREDSTVA = UKUPNE OBAVEZE + UKUPAN KAPITAL.
+    Izvještaji bez zbirnih pozicija (npr. nečitljiv font) se takođe prijavljuju.
+    Prazne pozicije se računaju kao 0. Vraća jedan red po prekršenom pravilu
+    i izvještaju (kolone ISSUE_COLUMNS).
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+
+    if "banka" not in df.columns:
+        df = df.assign(banka="")
+    df = _position_codes(df)
+
+    # Jedan izvještaj = jedan CSV fajl jedne banke
+    report_id = df.groupby(["banka", "f_source"], observed=True, sort=False).ngroup()
+    df = df.assign(
+        izvjestaj=report_id.to_numpy(),
+        Amount=df["Amount"].fillna(0).astype("int64"),
+    )
+    report_keys = (
+        df.groupby("izvjestaj")[["banka", "f_source", "balance_date"]].first()
+    )
+
+    parts = []
+
+    # 0) Izvještaji u kojima nema ukupne aktive: ekstrakcija nije uspjela
+    with_totals = df.loc[df["vrsta"] == "AKTIVA", "izvjestaj"].unique()
+    missing = report_keys[~report_keys.index.isin(with_totals)].reset_index(drop=True)
+    if not missing.empty:
+        missing["pravilo"] = f"nedostaje {TOTAL_ASSETS}"
+        parts.append(missing.reindex(columns=ISSUE_COLUMNS))
+
+    df = df[df["broj"].notna()]
+
+    # 1) Pozicija = zbir podpozicija (samo gdje podpozicije postoje)
+    subs = df[df["pod"] != ""]
+    sub_sums = subs.groupby(["izvjestaj", "broj"])["Amount"].sum()
+    parents = df[(df["pod"] == "") & (df["vrsta"] == "")].groupby(["izvjestaj", "broj"])["Amount"].sum()
+    parent_check = pd.concat({"iskazano": parents, "izracunato": sub_sums}, axis=1, join="inner")
+    parent_check["razlika"] = parent_check["iskazano"] - parent_check["izracunato"]
+    failing = parent_check[parent_check["razlika"].abs() > tolerance].reset_index()
+    if not failing.empty:
+        failing = failing.join(report_keys, on="izvjestaj")
+        failing["pravilo"] = failing["broj"].astype(int).astype(str) + ". = zbir podpozicija"
+        parts.append(failing[ISSUE_COLUMNS])
+
+    # Redni brojevi i iznosi zbirnih pozicija po izvještaju
+    totals = df[df["vrsta"] != ""].pivot_table(
+        index="izvjestaj", columns="vrsta", values=["broj", "Amount"], aggfunc="first"
+    )
+    if totals.empty:
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=ISSUE_COLUMNS)
+    total_numbers = totals["broj"]
+    total_amounts = totals["Amount"]
+
+    # 2) Sekcije: pozicija pripada sekciji ako je između dvije zbirne pozicije
+    top = df[(df["pod"] == "") & (df["vrsta"] == "")]
+    bounds = total_numbers.reindex(top["izvjestaj"]).to_numpy()
+    kinds = list(total_numbers.columns)
+    number = top["broj"].to_numpy()
+
+    def bound(kind: str) -> np.ndarray:
+        return bounds[:, kinds.index(kind)] if kind in kinds else np.full(len(top), np.nan)
+
+    assets_end, liabilities_end, equity_end = bound("AKTIVA"), bound("OBAVEZE"), bound("KAPITAL")
+    section = np.select(
+        [
+            number < assets_end,
+            (number > assets_end) & (number < liabilities_end),
+            (number > liabilities_end) & (number < equity_end),
+        ],
+        ["AKTIVA", "OBAVEZE", "KAPITAL"],
+        default="",
+    )
+    section_sums = (
+        top.assign(sekcija=section)
+        .loc[lambda x: x["sekcija"] != ""]
+        .pivot_table(index="izvjestaj", columns="sekcija", values="Amount", aggfunc="sum")
+    )
+
+    def amounts(kind: str) -> pd.Series:
+        return total_amounts[kind].dropna() if kind in total_amounts.columns else pd.Series(dtype="float64")
+
+    def sums(kind: str) -> pd.Series:
+        return section_sums[kind].dropna() if kind in section_sums.columns else pd.Series(dtype="float64")
+
+    assets, liabilities, equity = amounts("AKTIVA"), amounts("OBAVEZE"), amounts("KAPITAL")
+    checks = [
+        (f"{TOTAL_ASSETS} = zbir aktive", assets, sums("AKTIVA")),
+        (f"{TOTAL_LIABILITIES} = zbir obaveza", liabilities, sums("OBAVEZE")),
+        (f"{TOTAL_EQUITY} = zbir kapitala", equity, sums("KAPITAL")),
+        (f"{TOTAL_LIABILITIES_EQUITY} = obaveze + kapital", amounts("PASIVA"), liabilities + equity),
+        (f"{TOTAL_ASSETS} = obaveze + kapital", assets, liabilities + equity),
+    ]
+    for rule, reported, computed in checks:
+        issues = _issues(report_keys, rule, reported, computed.dropna(), tolerance)
+        if not issues.empty:
+            parts.append(issues)
+
+    if not parts:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    issues = pd.concat(parts, ignore_index=True)
+    for column in ("iskazano", "izracunato", "razlika"):
+        issues[column] = issues[column].astype("Int64")
+    return issues.sort_values(["banka", "balance_date", "pravilo"]).reset_index(drop=True)
+
+
+def unchecked_reports(report_type: str = "bs", csv_folder: str = BANKE_CSV_FOLDER) -> pd.DataFrame:
+    """
+    Izvještaji koje load_sector_frame preskače (vidi dataset.skipped_reports), kao
+    redovi sa kolonama ISSUE_COLUMNS bez iznosa, da se ne izgube iz provjere.
+    """
+    rows = [
+        [bank, csv_path.name, report_date(csv_path.name), reason, pd.NA, pd.NA, pd.NA]
+        for bank in sector_banks(report_type, csv_folder)
+        for csv_path, reason in skipped_reports(bank_csv_files(bank, report_type, csv_folder))
+    ]
+    unchecked = pd.DataFrame(rows, columns=ISSUE_COLUMNS)
+    for column in ("iskazano", "izracunato", "razlika"):
+        unchecked[column] = unchecked[column].astype("Int64")
+    return unchecked
+
+
+def failing_reports(issues: pd.DataFrame) -> pd.DataFrame:
+    """Sažetak po izvještaju: koliko pravila ne prolazi i koja."""
+    if issues.empty:
+        return pd.DataFrame(columns=["banka", "f_source", "balance_date", "gresaka", "pravila"])
+    return (
+        issues.groupby(["banka", "f_source", "balance_date"], observed=True)
+        .agg(gresaka=("pravilo", "size"), pravila=("pravilo", "; ".join))
+        .reset_index()
+    )
+
+
+def main():
+    """Provjerava bilanse stanja svih banaka i ispisuje izvještaje koji ne prolaze."""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description="Provjera računovodstvenih identiteta u bilansima stanja svih banaka"
+    )
+    parser.add_argument(
+        "--csv-folder",
+        type=str,
+        default=BANKE_CSV_FOLDER,
+        help=f"Folder sa CSV bilansima (default: {BANKE_CSV_FOLDER})"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=int,
+        default=DEFAULT_TOLERANCE,
+        help=f"Dozvoljeno odstupanje u hiljadama EUR (default: {DEFAULT_TOLERANCE})"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Sačuvaj sve greške u CSV fajl"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = load_sector_frame("bs", args.csv_folder)
+    unchecked = unchecked_reports("bs", args.csv_folder)
+    loaded = time.perf_counter()
+    issues = validate_balance_sheets(df, tolerance=args.tolerance)
+    checked = time.perf_counter()
+
+    reports = failing_reports(issues)
+    total_reports = df.groupby(["banka", "f_source"], observed=True).ngroups if not df.empty else 0
+    for row in reports.itertuples(index=False):
+        print(f"✗ {row.banka} {row.balance_date:%Y-%m} ({row.f_source}): {row.pravila}")
+    for row in unchecked.itertuples(index=False):
+        print(f"? {row.banka} {row.balance_date:%Y-%m} ({row.f_source}): {row.pravilo}")
+
+    print("=" * 60)
+    print(
+        f"Provjereno {total_reports} izvještaja, {len(reports)} ne prolazi ({len(issues)} grešaka), "
+        f"neprovjereno {len(unchecked)}"
+    )
+    print(f"Učitavanje: {loaded - start:.2f}s, provjera: {(checked - loaded) * 1000:.0f} ms")
+
+    if args.output:
+        pd.concat([issues, unchecked], ignore_index=True).to_csv(args.output, index=False)
+        print(f"Greške sačuvane u {args.output}")
+
+
+if __name__ == "__main__":
+    main()
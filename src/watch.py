@@ -0,0 +1,242 @@
+# src/watch.py
+#
+# Pipeline kao dugotrajan proces: na svakih WATCH_INTERVAL sekundi provjerava listu
+# PDF-ova na sajtu CBCG (uslovni GET, pa je neizmijenjena lista samo 304), preuzima
+# samo nove fajlove, konvertuje samo njih i objavljuje novu verziju podataka.
+#
+# Objava je zamjena fajla kataloga (catalog.py upisuje privremeni fajl pa ga
+# atomski preimenuje). Aplikacija na svakom rerun-u (i periodično, vidi
+# data_freshness u app.py) provjerava katalog i iz keševa izbacuje samo banke
+# čija se verzija podataka promijenila, pa se novi kvartal vidi bez restarta.
+#
+#   python src/watch.py                  # radi dok se ne prekine (Ctrl+C / SIGTERM)
+#   python src/watch.py --once           # jedan ciklus (npr. iz cron-a)
+#
+# Većina ciklusa ne dohvata listu: probe.py HEAD zahtjevima provjerava samo
+# očekivane sledeće kvartale poznatih banaka. Puna provjera liste (nove banke,
+# promijenjene šifre, ispravljeni stari fajlovi) radi se na svakih
+# WATCH_RECONCILE_EVERY ciklusa i uvijek kada proba ne dobije jasan odgovor.
+
+import signal
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Dict, List
+
+from catalog import Catalog
+from config import BASE_URL_STRANICE, CSV_OUTPUT_FOLDER, DOWNLOAD_FOLDER, WATCH_INTERVAL, WATCH_RECONCILE_EVERY
+from cube import update_cube
+from main import crawl
+from metrics import load_and_update
+from pdf_to_csv import convert_all_pdfs_to_csv
+from priority import PriorityWorkQueue
+from probe import probe
+from search_index import load_or_build_index
+
+# Kao u app.py: verzije podataka se porede za bilanse stanja od 2020.
+MIN_YEAR = 2020
+
+
+def pending_pdfs(pdf_folder: str = DOWNLOAD_FOLDER, output_folder: str = CSV_OUTPUT_FOLDER) -> List[Path]:
+    """PDF-ovi za koje još nema nijednog CSV-a (npr. preuzeti dok proces nije radio)."""
+    pdf_dir, output_dir = Path(pdf_folder), Path(output_folder)
+    pending = []
+    for pdf_file in sorted(pdf_dir.rglob("*.pdf")) if pdf_dir.exists() else []:
+        csv_dir = output_dir / pdf_file.relative_to(pdf_dir).parent
+        if not (csv_dir / f"{pdf_file.stem}.csv").exists() and not any(csv_dir.glob(f"{pdf_file.stem}_table_*.csv")):
+            pending.append(pdf_file)
+    return pending
+
+
+def _convert_from_queue(
+    queue: "PriorityWorkQueue[Path]",
+    pdf_folder: str,
+    output_folder: str,
+    workers: int,
+    converted: List[Path],
+    max_batch: int = 50,
+):
+    """
+    Konvertuje fajlove iz reda dok se red ne zatvori. Uzima sve što čeka (najviše
+    max_batch), najsvježije prvo; konverzija na kraju svake grupe ažurira katalog,
+    što je i objava nove verzije (vidi catalog.py).
+    """
+    while True:
+        batch = queue.get_batch(max_batch)
+        if not batch:
+            return
+        try:
+            convert_all_pdfs_to_csv(pdf_folder, output_folder, workers=workers, pdf_files=batch)
+        except Exception:
+            traceback.print_exc()
+        converted.extend(batch)
+
+
+def changed_banks(before: Dict[str, str], after: Dict[str, str]) -> List[str]:
+    return sorted(bank for bank in set(before) | set(after) if before.get(bank) != after.get(bank))
+
+
+def run_cycle(
+    url: str = BASE_URL_STRANICE,
+    pdf_folder: str = DOWNLOAD_FOLDER,
+    output_folder: str = CSV_OUTPUT_FOLDER,
+    download_workers: int = 1,
+    convert_workers: int = 1,
+    catch_up: bool = False,
+    reports: bool = False,
+    full_crawl: bool = True,
+) -> List[str]:
+    """
+    Jedan ciklus: lista -> nova preuzimanja -> konverzija samo njih -> objava.
+    Sa catch_up=True konvertuju se i ranije preuzeti PDF-ovi koji nemaju CSV.
+    Sa full_crawl=False umjesto liste se probaju URL-ovi očekivanih sledećih
+    kvartala (vidi probe.py); ako proba nije jasna, ipak se provjerava lista.
+    Vraća banke kojima se promijenila verzija podataka.
+
+    Preuzimanje i konverzija rade istovremeno: svaki preuzet fajl ide u red po
+    prioritetu (vidi priority.py), a konverzija uvijek uzima najsvježije fajlove
+    koji čekaju i objavljuje ih čim ih konvertuje. Najnoviji kvartal je tako
+    dostupan odmah, a stariji periodi se dopunjavaju iza njega.
+    """
+    before = Catalog.load().bank_versions("bs", min_year=MIN_YEAR)
+
+    queue: PriorityWorkQueue[Path] = PriorityWorkQueue()
+    converted: List[Path] = []
+    converter = threading.Thread(
+        target=_convert_from_queue,
+        args=(queue, pdf_folder, output_folder, convert_workers, converted),
+        daemon=True,
+    )
+    converter.start()
+    if catch_up:
+        for pdf_file in pending_pdfs(pdf_folder, output_folder):
+            queue.put(pdf_file)
+    try:
+        pdf_files = None
+        if not full_crawl:
+            probed = probe(url, pdf_folder)
+            if probed.conclusive:
+                pdf_files = probed.found
+            else:
+                print("Proba nije potpuna, provjeravam cijelu listu.")
+        # ttl=0: lista se uvijek provjerava uslovnim GET-om (ETag / If-Modified-Since)
+        crawl(url, pdf_folder, workers=download_workers, delay=0.5, ttl=0, on_downloaded=queue.put, pdf_files=pdf_files)
+    finally:
+        queue.close()
+        converter.join()
+
+    if not converted:
+        print("Nema novih fajlova.")
+        return []
+
+    after = Catalog.load().bank_versions("bs", min_year=MIN_YEAR)
+    changed = changed_banks(before, after)
+    if not changed:
+        print("Konvertovani fajlovi nisu promijenili podatke banaka.")
+        return []
+    print(f"Objavljena nova verzija podataka za: {', '.join(changed)}")
+
+    # Izvedeni podaci (pokazatelji, indeks pretrage, niz za analize) se osvježavaju odmah, da prvi
+    # korisnik posle objave ne čeka na njih
+    load_and_update()
+    load_or_build_index()
+    update_cube()
+    if reports:
+        from static_reports import generate_reports
+        # Sve banke: tržišno učešće u izvještajima nepromijenjenih banaka zavisi od sektora
+        generate_reports()
+    return changed
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Periodično provjerava sajt CBCG, preuzima i konvertuje nove bilanse i objavljuje nove podatke"
+    )
+    parser.add_argument(
+        "--url",
+        type=str,
+        default=BASE_URL_STRANICE,
+        help="Stranica sa spiskom PDF-ova (default: sajt CBCG)"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=WATCH_INTERVAL,
+        help=f"Pauza između provjera u sekundama (default: {WATCH_INTERVAL})"
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Uradi jedan ciklus i izađi"
+    )
+    parser.add_argument(
+        "--download-workers",
+        type=int,
+        default=1,
+        help="Broj paralelnih preuzimanja (default: 1)"
+    )
+    parser.add_argument(
+        "--convert-workers",
+        type=int,
+        default=1,
+        help="Broj radnih procesa za konverziju (default: 1)"
+    )
+    parser.add_argument(
+        "--reconcile-every",
+        type=int,
+        default=WATCH_RECONCILE_EVERY,
+        help=(
+            "Puna provjera liste na svakih N ciklusa, između njih samo proba očekivanih URL-ova "
+            f"(0 = uvijek puna provjera; default: {WATCH_RECONCILE_EVERY})"
+        )
+    )
+    parser.add_argument(
+        "--reports",
+        action="store_true",
+        help="Posle objave ponovo nacrtaj statičke izvještaje izmijenjenih banaka (vidi static_reports.py)"
+    )
+    args = parser.parse_args()
+
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        print("\nZaustavljam posle tekućeg ciklusa...")
+        stop.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    # U prvom ciklusu se konvertuje i ono što je ostalo nekonvertovano od ranije
+    catch_up = True
+    cycle = 0
+    while not stop.is_set():
+        started = time.strftime("%Y-%m-%d %H:%M:%S")
+        print(f"\n=== Ciklus {started} ===")
+        start = time.perf_counter()
+        try:
+            run_cycle(
+                args.url,
+                download_workers=args.download_workers,
+                convert_workers=args.convert_workers,
+                catch_up=catch_up,
+                reports=args.reports,
+                # Prvi ciklus je uvijek puna provjera (dok proces nije radio mogle su se pojaviti nove banke ili šifre)
+                full_crawl=args.reconcile_every <= 0 or cycle % args.reconcile_every == 0,
+            )
+            catch_up = False
+        except Exception:
+            # Proces mora preživjeti grešku jednog ciklusa (mreža, oštećen PDF...)
+            traceback.print_exc()
+        print(f"Ciklus završen za {time.perf_counter() - start:.1f}s")
+        cycle += 1
+
+        if args.once:
+            break
+        stop.wait(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+# src/workers.py
+#
+# Jednostavan pool radnih procesa za konverziju PDF-ova.
+# Za razliku od multiprocessing.Pool, svaki radnik ima svoj Pipe, pa roditelj
+# tačno zna koji zadatak koji radnik obrađuje i može pojedinačnog radnika
+# zamijeniti novim (npr. kada pređe zadatu granicu memorije, zaglavi se ili padne).
+
+import multiprocessing
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from multiprocessing.connection import wait
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def current_rss_bytes() -> Optional[int]:
+    """
+    Trenutna rezidentna memorija procesa (RSS) u bajtovima.
+    Na Linux-u se čita iz /proc; drugdje se koristi maksimum iz getrusage.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is not None:
+        # ru_maxrss je u KB na Linux-u, u bajtovima na macOS-u
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if peak > 1 << 32 else peak * 1024
+    return None
+
+
+@dataclass
+class TaskResult:
+    """Rezultat jednog zadatka: vraćena vrijednost ili opis greške."""
+    payload: Any
+    result: Any = None
+    error: Optional[str] = None
+    worker_rss: Optional[int] = None
+    # True ako je radnik ubijen (prekoračeno vrijeme) ili je pao
+    worker_lost: bool = False
+
+
+@dataclass
+class PoolStats:
+    tasks: int = 0
+    errors: int = 0
+    workers_started: int = 0
+    workers_recycled: int = 0
+    workers_killed: int = 0
+    workers_crashed: int = 0
+    peak_rss: int = 0
+
+    def print_summary(self):
+        print(f"  Radnih procesa pokrenuto: {self.workers_started} (recikliranih zbog memorije: {self.workers_recycled})")
+        if self.workers_killed or self.workers_crashed:
+            print(f"  Ubijenih zbog prekoračenog vremena: {self.workers_killed}, palih: {self.workers_crashed}")
+        if self.peak_rss:
+            print(f"  Najveći RSS radnika posle fajla: {self.peak_rss / (1024 * 1024):.1f} MB")
+
+
+def _worker_main(conn, func: Callable[[Any], Any], max_memory_bytes: Optional[int]):
+    """Petlja radnog procesa: prima zadatke preko Pipe-a dok ne dobije None."""
+    while True:
+        try:
+            payload = conn.recv()
+        except EOFError:
+            break
+        if payload is None:
+            break
+
+        try:
+            result, error = func(payload), None
+        except Exception as e:
+            result, error = None, f"{type(e).__name__}: {e}"
+
+        rss = current_rss_bytes()
+        recycle = bool(max_memory_bytes and rss and rss > max_memory_bytes)
+        conn.send((result, error, rss, recycle))
+        if recycle:
+            # Izađi da bi roditelj pokrenuo novi proces sa "čistom" memorijom
+            break
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, ctx, func: Callable[[Any], Any], max_memory_bytes: Optional[int]):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, func, max_memory_bytes),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.payload: Any = None
+        self.busy = False
+        self.started_at = 0.0
+
+    def submit(self, payload: Any):
+        self.payload = payload
+        self.busy = True
+        self.started_at = time.monotonic()
+        self.conn.send(payload)
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class WorkerPool:
+    """
+    Pool od `workers` procesa koji izvršava `func(payload)` za svaki zadatak.
+    Ako je zadat max_memory_mb, radnik čiji RSS posle zadatka pređe granicu
+    se gasi i zamjenjuje novim, pa vršna memorija po radniku ostaje ograničena
+    bez obzira na veličinu ulaznih fajlova.
+    Ako je zadat timeout, radnik koji zadatak obrađuje duže od toga se ubija;
+    zadatak se vraća sa greškom i worker_lost=True, a ostali nastavljaju.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[Any], Any],
+        workers: int = 1,
+        max_memory_mb: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.func = func
+        self.workers = max(1, workers)
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024) if max_memory_mb else None
+        self.timeout = timeout
+        self.stats = PoolStats()
+        self._ctx = multiprocessing.get_context()
+
+    def _start_worker(self) -> _Worker:
+        self.stats.workers_started += 1
+        return _Worker(self._ctx, self.func, self.max_memory_bytes)
+
+    def _finish(self, worker: _Worker) -> Tuple[TaskResult, bool]:
+        """Čita odgovor radnika; vraća (rezultat, da li radnika treba zamijeniti)."""
+        payload = worker.payload
+        worker.busy = False
+        worker.payload = None
+        try:
+            result, error, rss, recycle = worker.conn.recv()
+        except (EOFError, OSError):
+            worker.process.join(timeout=1)
+            self.stats.workers_crashed += 1
+            error = f"radni proces je pao (exit code {worker.process.exitcode})"
+            return TaskResult(payload, error=error, worker_lost=True), True
+
+        if rss:
+            self.stats.peak_rss = max(self.stats.peak_rss, rss)
+        if recycle:
+            self.stats.workers_recycled += 1
+        return TaskResult(payload, result=result, error=error, worker_rss=rss), recycle
+
+    def _wait_timeout(self, busy: List[_Worker]) -> Optional[float]:
+        """Koliko najduže čekati na odgovor prije nego što neki zadatak prekorači vrijeme."""
+        if self.timeout is None or not busy:
+            return None
+        oldest = min(w.started_at for w in busy)
+        return max(0.0, oldest + self.timeout - time.monotonic()) + 0.05
+
+    def _kill(self, worker: _Worker, elapsed: float) -> TaskResult:
+        payload = worker.payload
+        worker.busy = False
+        worker.payload = None
+        worker.kill()
+        self.stats.workers_killed += 1
+        error = f"prekoračeno vrijeme ({elapsed:.1f}s, granica {self.timeout:g}s)"
+        return TaskResult(payload, error=error, worker_lost=True)
+
+    def imap_unordered(self, tasks: Iterable[Any]) -> Iterator[TaskResult]:
+        """Izvršava zadatke i vraća rezultate redosledom kojim se završavaju."""
+        pending: Deque[Any] = deque(tasks)
+        workers: List[_Worker] = [self._start_worker() for _ in range(min(self.workers, len(pending)) or 1)]
+        try:
+            while pending or any(w.busy for w in workers):
+                for i, worker in enumerate(workers):
+                    if not worker.busy and pending:
+                        if not worker.process.is_alive():
+                            worker.stop()
+                            workers[i] = worker = self._start_worker()
+                        worker.submit(pending.popleft())
+
+                busy = [w for w in workers if w.busy]
+                ready = wait([w.conn for w in busy] + [w.process.sentinel for w in busy], self._wait_timeout(busy))
+                now = time.monotonic()
+                for i, worker in enumerate(workers):
+                    if not worker.busy:
+                        continue
+                    if worker.conn in ready or worker.process.sentinel in ready:
+                        task_result, replace = self._finish(worker)
+                    elif self.timeout is not None and now - worker.started_at > self.timeout:
+                        task_result, replace = self._kill(worker, now - worker.started_at), True
+                    else:
+                        continue
+                    self.stats.tasks += 1
+                    if task_result.error:
+                        self.stats.errors += 1
+                    if replace:
+                        worker.stop()
+                        workers[i] = self._start_worker()
+                    yield task_result
+        finally:
+            for worker in workers:
+                worker.stop()